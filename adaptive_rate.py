@@ -0,0 +1,136 @@
+"""
+ADAPTIVE RATE
+Pengatur interval deteksi dan ukuran input YOLO berdasarkan FPS kamera,
+latency deteksi dan beban CPU (proses kasir + proses detektor jika deteksi
+berjalan di proses terpisah). Target: FPS tampilan tetap di target_fps dan
+latency deteksi di bawah max_latency.
+
+    overload (FPS turun / latency / CPU tinggi) -> perkecil input, lalu jarangkan deteksi
+    ada ruang (semua jauh di bawah batas)       -> perbesar input, lalu rapatkan deteksi
+    tray kosong selama idle_after detik         -> deteksi jarang (idle_every)
+    produk muncul                               -> langsung kembali ke mode aktif
+
+Dipakai CameraEngine: frame() setiap frame, record() setiap hasil deteksi,
+lalu baca detect_every dan size.
+"""
+
+import os
+import time
+
+import kasir_metrics
+
+class AdaptiveRate:
+    """Operating point deteksi (detect_every, size) yang menyesuaikan beban"""
+
+    def __init__(self, target_fps=30, max_latency=0.15, sizes=(640, 512, 416, 320),
+                 min_every=1, max_every=8, idle_every=12, idle_after=3.0, window=2.0,
+                 cpu_high=0.85, cpu_low=0.6, hold_windows=5):
+        self.target_fps = target_fps
+        self.max_latency = max_latency
+        self.sizes = tuple(sorted(sizes, reverse=True))
+        self.min_every = min_every
+        self.max_every = max_every
+        self.idle_every = idle_every
+        self.idle_after = idle_after
+        self.window = window
+        self.cpu_high = cpu_high
+        self.cpu_low = cpu_low
+        self.hold_windows = hold_windows
+
+        self.size_index = 0
+        self.active_every = min(max(3, min_every), max_every)  # Mulai dari cadence lama (setiap 3 frame)
+        self.idle = False
+        self.fps = 0.0
+        self.latency = 0.0
+        self.cpu = 0.0
+        self.extra_cpu = None  # Callable -> detik CPU kumulatif proses lain (ProcessDetector.cpu_time)
+        self._frames = 0
+        self._latencies = []
+        self._window_start = time.perf_counter()
+        self._cpu_start = self._cpu_time()
+        self._last_seen = time.perf_counter()
+        self._cpus = os.cpu_count() or 1
+        self._hold = 0
+
+    @property
+    def size(self):
+        return self.sizes[self.size_index]
+
+    @property
+    def detect_every(self):
+        return self.idle_every if self.idle else self.active_every
+
+    def _cpu_time(self):
+        cpu = time.process_time()
+        if self.extra_cpu is not None:
+            cpu += self.extra_cpu()
+        return cpu
+
+    def frame(self):
+        """Dipanggil setiap frame kamera; evaluasi operating point setiap `window` detik"""
+        self._frames += 1
+        now = time.perf_counter()
+        if not self.idle and now - self._last_seen >= self.idle_after:
+            self.idle = True
+            self._log("idle")
+        elapsed = now - self._window_start
+        if elapsed >= self.window:
+            self._evaluate(now, elapsed)
+
+    def record(self, latency, n_detections):
+        """Dipanggil setiap hasil deteksi: latency (detik) dan jumlah produk terdeteksi"""
+        self._latencies.append(latency)
+        if n_detections:
+            self._last_seen = time.perf_counter()
+            if self.idle:
+                # Produk muncul - langsung kembali ke cadence aktif, jangan tunggu window
+                self.idle = False
+                self._log("ramp up")
+
+    def _evaluate(self, now, elapsed):
+        self.fps = self._frames / elapsed
+        # CPU proses kasir (semua thread) + proses detektor sebagai fraksi seluruh core
+        cpu_now = self._cpu_time()
+        self.cpu = (cpu_now - self._cpu_start) / elapsed / self._cpus
+        latencies = sorted(self._latencies)
+        self.latency = latencies[int(len(latencies) * 0.9)] if latencies else 0.0
+        self._frames = 0
+        self._latencies = []
+        self._window_start = now
+        self._cpu_start = cpu_now
+        if self.idle or not latencies:
+            return
+
+        before = (self.active_every, self.size_index)
+        smallest = self.size_index == len(self.sizes) - 1
+        slow_latency = self.latency > self.max_latency
+        busy = self.fps < self.target_fps * 0.9 or self.cpu > self.cpu_high
+        overloaded = slow_latency or busy
+        headroom = (self.fps >= self.target_fps * 0.97 and self.latency < self.max_latency * 0.6
+                    and self.cpu < self.cpu_low)
+        # Setelah mundur, tahan beberapa window sebelum naik lagi supaya tidak bolak-balik
+        self._hold = max(0, self._hold - 1)
+        if overloaded:
+            # Latency tinggi diatasi dengan input lebih kecil; FPS/CPU dengan deteksi lebih jarang
+            if slow_latency and not smallest:
+                self.size_index += 1
+            elif busy and self.active_every < self.max_every:
+                self.active_every += 1
+            elif busy and not smallest:
+                self.size_index += 1
+            self._hold = self.hold_windows
+        elif headroom and not self._hold:
+            # Ruang lebih dipakai untuk akurasi dulu (input besar), baru frekuensi
+            if self.size_index > 0:
+                self.size_index -= 1
+            elif self.active_every > self.min_every:
+                self.active_every -= 1
+        if (self.active_every, self.size_index) != before:
+            self._log("overload" if overloaded else "headroom")
+
+    def _log(self, reason):
+        kasir_metrics.set_gauge('detect_every', self.detect_every)
+        kasir_metrics.set_gauge('detect_size', self.size)
+        kasir_metrics.log('INFO', 'ADAPT', f"{reason}: setiap {self.detect_every} frame @ {self.size}px "
+                                           f"(fps {self.fps:.1f}, latency p90 {self.latency * 1000:.0f} ms, "
+                                           f"cpu {self.cpu:.0%})")
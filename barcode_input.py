@@ -0,0 +1,100 @@
+"""
+BARCODE INPUT
+Jalur cepat untuk barang kemasan:
+    KeyboardWedge       - scanner USB yang "mengetik" barcode lalu Enter
+    FrameBarcodeScanner - decode barcode dari frame kamera di thread terpisah
+                          (opsional, butuh pyzbar)
+"""
+
+import threading
+import time
+
+import cv2
+
+try:
+    from pyzbar import pyzbar
+except ImportError:
+    pyzbar = None
+
+class KeyboardWedge:
+    """Bedakan input scanner dari ketikan manusia berdasarkan jeda antar tombol.
+
+    Scanner mengirim seluruh digit dalam beberapa milidetik lalu Enter; ketikan
+    manusia jauh lebih lambat, jadi buffer dibuang jika jeda > max_interval.
+    """
+
+    def __init__(self, max_interval=0.05, min_length=6):
+        self.max_interval = max_interval
+        self.min_length = min_length
+        self._buffer = ''
+        self._last = 0.0
+
+    def feed(self, char, timestamp):
+        """Masukkan satu karakter, return barcode lengkap saat Enter (atau None)"""
+        if char in ('\r', '\n'):
+            code = self._buffer if len(self._buffer) >= self.min_length else None
+            self._buffer = ''
+            return code
+        if not char or not char.isprintable():
+            return None
+        if self._buffer and timestamp - self._last > self.max_interval:
+            self._buffer = ''
+        self._buffer += char
+        self._last = timestamp
+        return None
+
+class FrameBarcodeScanner(threading.Thread):
+    """Decode barcode dari frame kamera terbaru tanpa menahan loop deteksi.
+
+    Hanya frame terakhir yang disimpan - jika decoder tertinggal, frame lama
+    dilewati. Barcode yang sama tidak dilaporkan lagi selama masih terlihat
+    (sampai repeat_sec tanpa terdeteksi).
+    """
+
+    def __init__(self, on_code, repeat_sec=2.0):
+        super().__init__(daemon=True)
+        self.on_code = on_code
+        self.repeat_sec = repeat_sec
+        self.running = True
+        self._frame = None
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._last_seen = {}
+
+    @staticmethod
+    def available():
+        return pyzbar is not None
+
+    def submit(self, frame):
+        """Kirim frame BGR terbaru (non-blocking)"""
+        with self._lock:
+            self._frame = frame
+        self._event.set()
+
+    def stop(self):
+        self.running = False
+        self._event.set()
+
+    def run(self):
+        while self.running:
+            self._event.wait()
+            self._event.clear()
+            with self._lock:
+                frame, self._frame = self._frame, None
+            if frame is None or not self.running:
+                continue
+            try:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                codes = {r.data.decode('utf-8', 'ignore') for r in pyzbar.decode(gray)}
+            except Exception as e:
+                print(f"[BARCODE] Decode error: {e}")
+                continue
+
+            now = time.time()
+            for code in codes:
+                last = self._last_seen.get(code)
+                self._last_seen[code] = now
+                if last is None or now - last > self.repeat_sec:
+                    self.on_code(code)
+            # Lupakan barcode yang sudah lama tidak terlihat
+            self._last_seen = {c: t for c, t in self._last_seen.items() if now - t <= self.repeat_sec}
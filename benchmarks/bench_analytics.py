@@ -0,0 +1,108 @@
+"""
+BENCHMARK - SALES ANALYTICS ENGINE
+Bangun database sintetis 2 tahun, export ke Parquet, lalu ukur waktu laporan
+year-over-year, per produk dan per jam dibanding scan JSON langsung di SQLite.
+
+Pemakaian:
+    python benchmarks/bench_analytics.py --per-day 600
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sales_analytics
+
+PRODUCTS = ["apple", "banana", "orange", "bread", "cup", "bottle", "pen", "pencil",
+            "book", "donut", "sandwich", "carrot", "potato", "tomato", "spoon", "fork"]
+
+def build_database(path, per_day, days):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            items TEXT,
+            total REAL,
+            payment_method TEXT,
+            status TEXT
+        )
+    ''')
+    start = datetime.combine(date.today() - timedelta(days=days - 1), datetime.min.time())
+    for d in range(days):
+        day = start + timedelta(days=d)
+        rows = []
+        for _ in range(per_day):
+            ts = day + timedelta(seconds=random.randint(7 * 3600, 22 * 3600))
+            items = {p: {"qty": random.randint(1, 3), "price": 1000 * random.randint(3, 30)}
+                     for p in random.sample(PRODUCTS, random.randint(1, 5))}
+            total = sum(v["qty"] * v["price"] for v in items.values())
+            rows.append((ts.isoformat(), json.dumps(items), total, random.choice(["QR", "CASH"]), "COMPLETED"))
+        rows.sort()
+        conn.executemany('''
+            INSERT INTO transactions (timestamp, items, total, payment_method, status)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+    conn.commit()
+    conn.close()
+
+def sqlite_yoy_products(path, year):
+    """Pembanding: cara lama - scan dan parse JSON setiap baris"""
+    conn = sqlite3.connect(path)
+    monthly = {}
+    products = {}
+    for ts, items_json, total in conn.execute(
+            "SELECT timestamp, items, total FROM transactions WHERE timestamp >= ?",
+            (f"{year - 1}-01-01",)):
+        key = ts[:7]
+        monthly[key] = monthly.get(key, 0) + total
+        if ts[:4] == str(year):
+            for name, data in json.loads(items_json).items():
+                products[name] = products.get(name, 0) + data["qty"]
+    conn.close()
+    return monthly, products
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analytics Parquet vs SQLite")
+    parser.add_argument('--per-day', type=int, default=600, help="transaksi per hari")
+    parser.add_argument('--days', type=int, default=730)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    db_path = os.path.join(tmpdir, 'bench.db')
+    root = os.path.join(tmpdir, 'analytics')
+
+    t0 = time.perf_counter()
+    build_database(db_path, args.per_day, args.days)
+    print(f"\nDatabase: {args.per_day * args.days:,} transaksi ({time.perf_counter() - t0:.1f} s)")
+
+    t0 = time.perf_counter()
+    days = sales_analytics.export_partitions(db_path, root, force=True)
+    print(f"Export  : {days} partisi ({time.perf_counter() - t0:.1f} s)")
+
+    year = date.today().year
+    t0 = time.perf_counter()
+    sqlite_yoy_products(db_path, year)
+    sqlite_time = time.perf_counter() - t0
+
+    analytics = sales_analytics.SalesAnalytics(root)
+    t0 = time.perf_counter()
+    analytics.year_over_year(year)
+    analytics.per_product(date(year, 1, 1), date(year, 12, 31))
+    analytics.per_hour(date(year, 1, 1), date(year, 12, 31))
+    parquet_time = time.perf_counter() - t0
+
+    print(f"\nYoY + produk + jam:")
+    print(f"   SQLite JSON scan : {sqlite_time * 1000:>8.0f} ms")
+    print(f"   Parquet + NumPy  : {parquet_time * 1000:>8.0f} ms\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+MICRO-BENCHMARK - KONEKSI DATABASE MONITORING
+Membandingkan latency request dashboard dengan:
+    fresh  - sqlite3.connect() baru setiap request (perilaku lama)
+    pooled - koneksi read-only per thread (get_read_connection)
+
+Berjalan in-process dengan Flask test client pada database sementara,
+response cache dimatikan supaya setiap request benar-benar query ke SQLite.
+
+Pemakaian:
+    python benchmarks/bench_db_connections.py --rows 20000 --clients 8 --requests 200
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import monitoring_app
+
+ENDPOINTS = ['/api/chart-7days', '/api/payment-method', '/api/today?limit=50&fields=id,time,total']
+
+def build_database(path, rows):
+    """Isi database sementara dengan transaksi 30 hari terakhir"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            items TEXT,
+            total REAL,
+            payment_method TEXT,
+            status TEXT
+        )
+    ''')
+    conn.execute('CREATE INDEX idx_transactions_timestamp ON transactions (timestamp)')
+    now = datetime.now()
+    data = []
+    for _ in range(rows):
+        ts = now - timedelta(seconds=random.randint(0, 30 * 86400))
+        items = {"apple": random.randint(1, 3), "banana": random.randint(1, 2)}
+        data.append((ts.isoformat(), json.dumps(items), random.randint(5, 200) * 1000,
+                     random.choice(["QR", "CASH"]), "COMPLETED"))
+    conn.executemany('''
+        INSERT INTO transactions (timestamp, items, total, payment_method, status)
+        VALUES (?, ?, ?, ?, ?)
+    ''', data)
+    conn.commit()
+    conn.close()
+
+def fresh_connection(path=None):
+    """Perilaku lama: koneksi baru setiap pemanggilan"""
+    conn = sqlite3.connect(path or monitoring_app.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def run_clients(clients, requests_per_client):
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        test_client = monitoring_app.app.test_client()
+        local = []
+        for i in range(requests_per_client):
+            path = ENDPOINTS[i % len(ENDPOINTS)]
+            start = time.perf_counter()
+            resp = test_client.get(path)
+            local.append(time.perf_counter() - start)
+            assert resp.status_code == 200, resp.get_data(as_text=True)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sorted(latencies), time.perf_counter() - started
+
+def pct(values, p):
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark koneksi SQLite monitoring_app")
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="request per client")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    monitoring_app.DB_PATH = os.path.join(tmpdir, 'bench.db')
+    build_database(monitoring_app.DB_PATH, args.rows)
+
+    # Matikan response cache - yang diukur adalah biaya koneksi + query
+    monitoring_app.response_cache.ttl = -1
+    pooled_connection = monitoring_app.get_read_connection
+
+    print(f"\n{args.rows} transaksi, {args.clients} clients x {args.requests} requests")
+    print(f"{'Mode':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for mode, factory in (('fresh', fresh_connection), ('pooled', pooled_connection)):
+        monitoring_app.get_read_connection = factory
+        run_clients(2, 10)  # warm-up
+        latencies, elapsed = run_clients(args.clients, args.requests)
+        print(f"{mode:<8} {len(latencies) / elapsed:>8.1f} {pct(latencies, 50):>8.2f} "
+              f"{pct(latencies, 95):>8.2f} {pct(latencies, 99):>8.2f}")
+    monitoring_app.get_read_connection = pooled_connection
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+BENCHMARK - EVENT LOG
+Tulis jutaan event kasir sintetis (tersebar beberapa hari) lewat EventLog,
+lalu bandingkan query rentang waktu 1 jam lewat index offset jarang dengan
+scan penuh seluruh file. Melaporkan throughput tulis, rasio kompresi file
+rotasi dan waktu query.
+
+Pemakaian:
+    python benchmarks/bench_event_log.py --events 2000000 --days 7
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kasir_metrics
+from event_log import EventLog, log_files, read_events
+
+EVENTS = ('detect', 'cart', 'cart', 'detect', 'payment', 'sync')
+PRODUCTS = ('apple', 'banana', 'orange', 'bottle', 'cup', 'pen', 'scissors')
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event log: tulis + query rentang waktu")
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--max-mb', type=float, default=20)
+    parser.add_argument('--no-compress', action='store_true')
+    parser.add_argument('--queries', type=int, default=5)
+    args = parser.parse_args()
+
+    kasir_metrics.set_log_level('WARNING')
+    folder = tempfile.mkdtemp(prefix='bench_event_log_')
+    path = os.path.join(folder, 'kasir_log.json')
+    try:
+        log = EventLog(path, int(args.max_mb * 1024 * 1024), backups=10000,
+                       compress=not args.no_compress, max_buffer=args.events)
+        log.start()
+        rng = random.Random(1)
+        start_ts = time.time() - args.days * 86400
+        step = args.days * 86400 / args.events
+        started = time.perf_counter()
+        for i in range(args.events):
+            event = EVENTS[i % len(EVENTS)]
+            log.emit(event, ts=start_ts + i * step, product=rng.choice(PRODUCTS), qty=rng.randint(1, 5),
+                     cart_total=rng.randint(1000, 500000))
+        emit_elapsed = time.perf_counter() - started
+        log.close(timeout=600)
+        write_elapsed = time.perf_counter() - started
+        files = log_files(path)
+        size = sum(os.path.getsize(f) for f in files)
+        print(f"\n{args.events:,} event, {len(files)} file, {size / 1024 / 1024:.1f} MB di disk "
+              f"({'tanpa kompresi' if args.no_compress else 'rotasi gzip'}), drop {log.dropped}")
+        print(f"emit   {args.events / emit_elapsed:>12,.0f} event/s (thread pemanggil)")
+        print(f"tulis  {args.events / write_elapsed:>12,.0f} event/s (sampai flush selesai)")
+
+        started = time.perf_counter()
+        total = sum(1 for _ in read_events(path))
+        scan = time.perf_counter() - started
+        print(f"\nScan penuh: {total:,} event dalam {scan:.2f} s")
+
+        print(f"{'Query 1 jam':<26} {'event':>8} {'index ms':>10} {'scan ms':>10}")
+        for _ in range(args.queries):
+            q_start = start_ts + rng.random() * (args.days * 86400 - 3600)
+            q_end = q_start + 3600
+            t0 = time.perf_counter()
+            indexed = sum(1 for _ in read_events(path, q_start, q_end))
+            t1 = time.perf_counter()
+            # Pembanding: baca semua lalu filter (tanpa index)
+            brute = sum(1 for e in read_events(path) if q_start <= e['ts'] <= q_end)
+            t2 = time.perf_counter()
+            assert indexed == brute, (indexed, brute)
+            label = time.strftime('%Y-%m-%d %H:%M', time.localtime(q_start))
+            print(f"{label:<26} {indexed:>8} {(t1 - t0) * 1000:>10.1f} {(t2 - t1) * 1000:>10.1f}")
+        print()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+BENCHMARK - STREAMING EXPORT
+Export satu juta transaksi lewat /api/export dan ukur throughput serta
+pemakaian memori (harus tetap datar berapapun ukuran rentang).
+
+Pemakaian:
+    python benchmarks/bench_export.py --rows 1000000 --format csv --lines
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows - pemakaian memori tidak dilaporkan
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import monitoring_app
+
+def build_database(path, rows, days):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            items TEXT,
+            total REAL,
+            payment_method TEXT,
+            status TEXT
+        )
+    ''')
+    conn.execute('CREATE INDEX idx_transactions_timestamp ON transactions (timestamp)')
+    start = datetime.now() - timedelta(days=days)
+    step = days * 86400 / rows
+    batch = []
+    for i in range(rows):
+        ts = start + timedelta(seconds=i * step)
+        items = {"apple": random.randint(1, 3), "bread": {"qty": 1, "price": 10000}}
+        batch.append((ts.isoformat(), json.dumps(items), random.randint(5, 200) * 1000, "QR", "COMPLETED"))
+        if len(batch) == 50000:
+            conn.executemany('''
+                INSERT INTO transactions (timestamp, items, total, payment_method, status)
+                VALUES (?, ?, ?, ?, ?)
+            ''', batch)
+            batch = []
+    if batch:
+        conn.executemany('''
+            INSERT INTO transactions (timestamp, items, total, payment_method, status)
+            VALUES (?, ?, ?, ?, ?)
+        ''', batch)
+    conn.commit()
+    conn.close()
+
+def max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /api/export")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    parser.add_argument('--lines', action='store_true', help="Export per line item")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    monitoring_app.DB_PATH = os.path.join(tmpdir, 'bench.db')
+
+    t0 = time.perf_counter()
+    build_database(monitoring_app.DB_PATH, args.rows, args.days)
+    print(f"\nDatabase: {args.rows:,} transaksi ({time.perf_counter() - t0:.1f} s)")
+    rss_before = max_rss_mb()
+
+    start = (datetime.now() - timedelta(days=args.days + 1)).date().isoformat()
+    url = f"/api/export?start={start}&format={args.format}" + ("&lines=1" if args.lines else "")
+    client = monitoring_app.app.test_client()
+
+    t0 = time.perf_counter()
+    resp = client.get(url, buffered=False)
+    total_bytes = 0
+    lines = 0
+    for chunk in resp.response:
+        data = chunk if isinstance(chunk, bytes) else chunk.encode('utf-8')
+        total_bytes += len(data)
+        lines += data.count(b'\n')
+    resp.close()
+    elapsed = time.perf_counter() - t0
+
+    print(f"Export  : {lines:,} baris, {total_bytes / 1024 / 1024:.1f} MB dalam {elapsed:.1f} s "
+          f"({lines / elapsed:,.0f} baris/s)")
+    rss_after = max_rss_mb()
+    if rss_before is not None:
+        print(f"Max RSS : {rss_before:.0f} MB sebelum export, {rss_after:.0f} MB sesudah")
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+BENCHMARK - STARTUP TABEL STOCK (10K PRODUK)
+Bandingkan waktu build + jumlah widget + memori tab Stock lama (satu baris
+widget per produk di CTkScrollableFrame) dengan VirtualStockGrid, plus
+latency pencarian ProductIndex. Katalog sintetis ditulis ke file sementara.
+
+Butuh display (Tk). Jalankan di mesin kasir:
+    python benchmarks/bench_stock_grid.py --products 10000
+    python benchmarks/bench_stock_grid.py --products 10000 --legacy-limit 2000
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import customtkinter as ctk
+
+from product_catalog import ProductCatalog
+from stock_grid import ProductIndex, VirtualStockGrid
+
+COLORS = {
+    "bg_primary": "#0f1419", "bg_secondary": "#1a1f2e", "bg_tertiary": "#252d3d",
+    "text_primary": "#ffffff", "text_tertiary": "#7a8a9a", "accent_pass": "#00d084",
+    "accent_warning": "#ffa500", "accent_secondary": "#ff6b6b"
+}
+CATEGORIES = ["Buah", "Makanan", "Sayur", "Wadah", "Aksesoris", "Elektronik", "Alat Tulis", "Peralatan", "Mainan"]
+WORDS = ["susu", "roti", "kopi", "teh", "gula", "mie", "sabun", "air", "kecap", "beras", "minyak", "keju"]
+
+def rss_mb():
+    """Resident memory proses (MB), 0 jika tidak tersedia"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+    except ImportError:
+        return 0.0
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+def write_catalog(path, n):
+    rng = random.Random(42)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['key', 'nama', 'harga', 'stock', 'kategori', 'barcode'])
+        for i in range(n):
+            nama = f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}"
+            writer.writerow([f"sku{i:05d}", nama, rng.randrange(1000, 100000, 500),
+                             rng.randrange(0, 50), rng.choice(CATEGORIES), f"899{i:010d}"])
+
+def build_legacy(parent, products):
+    """Tab Stock lama: satu frame + 4 label + 2 tombol per produk"""
+    frame = ctk.CTkScrollableFrame(parent, fg_color=COLORS["bg_tertiary"])
+    frame.pack(fill="both", expand=True)
+    for idx, product in enumerate(products):
+        row_bg = COLORS["bg_secondary"] if idx % 2 == 0 else COLORS["bg_tertiary"]
+        row = ctk.CTkFrame(frame, fg_color=row_bg, corner_radius=0)
+        row.pack(fill="x")
+        for col, text in enumerate([product.nama, product.kategori, f"Rp {product.harga:,}", str(product.stock)]):
+            ctk.CTkLabel(row, text=text, fg_color=row_bg).grid(row=0, column=col, sticky="w", padx=8, pady=10)
+        actions = ctk.CTkFrame(row, fg_color="transparent")
+        actions.grid(row=0, column=4, padx=8, pady=10)
+        ctk.CTkButton(actions, text="−", width=30, height=28).grid(row=0, column=0, padx=2)
+        ctk.CTkButton(actions, text="+", width=30, height=28).grid(row=0, column=1, padx=2)
+    return frame
+
+def build_virtual(parent, products):
+    grid = VirtualStockGrid(parent, COLORS, {}, {}, on_adjust=lambda product, delta: None)
+    grid.pack(fill="both", expand=True)
+    grid.set_items(products)
+    return grid
+
+def measure(name, builder, products):
+    app = ctk.CTk()
+    app.geometry("900x700")
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    widget = builder(app, products)
+    app.update()
+    elapsed = time.perf_counter() - started
+    result = {
+        'name': name, 'rows': len(products), 'seconds': elapsed,
+        'widgets': count_widgets(widget), 'rss_mb': rss_mb() - rss_before
+    }
+    if isinstance(widget, VirtualStockGrid):
+        # Scroll dari atas ke bawah, 3 baris per langkah seperti mouse wheel
+        steps = 0
+        started = time.perf_counter()
+        for first in range(0, len(products), max(1, len(products) // 200)):
+            widget.scroll_to(first)
+            app.update_idletasks()
+            steps += 1
+        result['scroll_ms'] = (time.perf_counter() - started) / steps * 1000
+    app.destroy()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startup tabel stock")
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--legacy-limit', type=int, help="batasi jumlah baris versi lama (build penuh bisa bermenit-menit)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'katalog.csv')
+        write_catalog(path, args.products)
+        started = time.perf_counter()
+        catalog = ProductCatalog(path)
+        load_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = ProductIndex(catalog)
+    index_s = time.perf_counter() - started
+    products = index.search('')
+
+    # Ketik "susu kopi" huruf per huruf - query makin panjang menyaring hasil sebelumnya
+    query = "susu kopi"
+    typing = []
+    for i in range(1, len(query) + 1):
+        started = time.perf_counter()
+        hits = index.search(query[:i])
+        typing.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    index.search('keju', 'Sayur')
+    category_s = time.perf_counter() - started
+
+    print(f"\n{args.products} produk - load katalog {load_s * 1000:.1f} ms, build indeks {index_s * 1000:.1f} ms")
+    print(f"Pencarian per ketikan: maks {max(typing) * 1000:.2f} ms, total {sum(typing) * 1000:.2f} ms "
+          f"({len(hits)} hasil '{query}'), filter kategori {category_s * 1000:.2f} ms")
+
+    legacy_rows = products[:args.legacy_limit] if args.legacy_limit else products
+    results = [measure('virtual', build_virtual, products), measure('lama', build_legacy, legacy_rows)]
+    print(f"\n{'Versi':<8} {'baris':>7} {'startup s':>10} {'widget':>8} {'RSS +MB':>8} {'scroll ms':>10}")
+    for r in results:
+        scroll = f"{r['scroll_ms']:.2f}" if 'scroll_ms' in r else '-'
+        print(f"{r['name']:<8} {r['rows']:>7} {r['seconds']:>10.2f} {r['widgets']:>8} {r['rss_mb']:>8.1f} {scroll:>10}")
+    if args.legacy_limit and args.legacy_limit < args.products:
+        scale = args.products / args.legacy_limit
+        print(f"(versi lama diukur {args.legacy_limit} baris - estimasi linear {args.products} baris: "
+              f"{results[1]['seconds'] * scale:.1f} s)")
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+BENCHMARK - TILED INFERENCE vs SINGLE-PASS
+Putar ulang sesi rekaman dua kali lewat pipeline bench_vision: sekali satu
+pass frame penuh, sekali tiled inference (tile overlap + frame penuh dalam
+satu batch, digabung dengan NMS antar tile). Melaporkan latency deteksi,
+jumlah deteksi per kelas (benda kecil seperti pen/pencil/scissors) dan
+recall/precision cart terhadap ground truth.
+
+Pemakaian:
+    python benchmarks/bench_tiled.py sessions/pagi.frames --truth sessions/pagi.truth.json
+    python benchmarks/bench_tiled.py sessions/pagi.frames --tiles 3x2 --roi 100,80,1180,700
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from bench_vision import ROOT, compare, parse_tiles, pct, replay
+
+import vision_engine
+from product_catalog import ProductCatalog
+from session_recorder import SessionReader
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tiled inference vs single-pass")
+    parser.add_argument('session', help="file sesi (.frames / .mp4 / .avi)")
+    parser.add_argument('--truth', help="JSON ground truth cart")
+    parser.add_argument('--catalog', default=os.path.join(ROOT, 'produk_katalog.csv'))
+    parser.add_argument('--model', default='yolov5n')
+    parser.add_argument('--detect-every', type=int, default=1)
+    parser.add_argument('--tiles', type=parse_tiles, default=(2, 2), help="grid tile, mis. 2x2")
+    parser.add_argument('--overlap', type=float, default=0.2)
+    parser.add_argument('--roi', help="area tray x1,y1,x2,y2 (default seluruh frame)")
+    parser.add_argument('--no-full', action='store_true', help="jangan sertakan frame penuh di batch")
+    parser.add_argument('--classes', default='pen,pencil,scissors,fork,knife,spoon',
+                        help="kelas benda kecil yang ditampilkan terpisah")
+    args = parser.parse_args()
+
+    vision_engine.VERBOSE = False
+    catalog = ProductCatalog(args.catalog)
+    model = vision_engine.load_model(args.model)
+    if model is None:
+        sys.exit(1)
+    catalog.bind_classes(model.names)
+    reader = SessionReader(args.session)
+    roi = tuple(int(v) for v in args.roi.split(',')) if args.roi else None
+    tiling = vision_engine.Tiling(args.tiles, args.overlap, roi, include_full=not args.no_full)
+
+    results = {}
+    for mode, mode_tiling in (('single', None), ('tiled', tiling)):
+        cart, latencies, frames, elapsed, class_counts = replay(reader, model, catalog,
+                                                                args.detect_every, mode_tiling)
+        detect = [sum(stage) for stage in zip(latencies['preprocess'], latencies['inference'],
+                                              latencies['postprocess'])]
+        results[mode] = {'cart': cart, 'detect': detect, 'fps': frames / elapsed if elapsed else 0,
+                         'counts': class_counts}
+
+    height, width = reader.meta['shape'][:2]
+    tiles = len(tiling.tiles(width, height)) + (0 if args.no_full else 1)
+    print(f"\n{len(reader)} frame, deteksi setiap {args.detect_every} frame, "
+          f"tiled {args.tiles[0]}x{args.tiles[1]} overlap {args.overlap} ({tiles} gambar per batch)")
+    print(f"{'Mode':<8} {'FPS':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'deteksi':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['fps']:>6.1f} {pct(r['detect'], 50):>8.1f} {pct(r['detect'], 95):>8.1f} "
+              f"{pct(r['detect'], 99):>8.1f} {sum(r['counts'].values()):>8}")
+
+    # Jumlah deteksi per kelas: benda kecil yang hilang/berkedip di single-pass terlihat di sini
+    small = [c.strip() for c in args.classes.split(',') if c.strip()]
+    names = sorted(set(results['single']['counts']) | set(results['tiled']['counts']),
+                   key=lambda name: (name not in small, name))
+    print(f"\n{'Kelas':<16} {'single':>8} {'tiled':>8}")
+    for name in names:
+        marker = '*' if name in small else ' '
+        print(f"{marker}{name:<15} {results['single']['counts'][name]:>8} {results['tiled']['counts'][name]:>8}")
+
+    if args.truth:
+        with open(args.truth, 'r', encoding='utf-8') as f:
+            truth = json.load(f)
+        truth = truth.get('cart', truth)
+        print(f"\nTruth: {json.dumps(truth, sort_keys=True)}")
+        for mode, r in results.items():
+            result = compare(r['cart'], truth)
+            print(f"{mode:<8} recall {result['recall']:.2f}  precision {result['precision']:.2f}  "
+                  f"exact {result['exact']}  kurang {result['missing'] or '-'}")
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+BENCHMARK - VISION PIPELINE (OFFLINE)
+Putar ulang sesi rekaman (session_recorder.py) secepat mungkin lewat
+detect_products + CartTracker, tanpa kamera dan tanpa UI. Melaporkan FPS,
+latency per tahap (p50/p95/p99) dan cart hasil vs ground truth.
+
+Ground truth: JSON {"cart": {"apple": 2, "banana": 1}}
+
+Pemakaian:
+    python benchmarks/bench_vision.py sessions/pagi.frames --truth sessions/pagi.truth.json
+    python benchmarks/bench_vision.py sessions/pagi.mp4 --min-fps 15 --strict
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import vision_engine
+from detect_cache import DetectionCache
+from product_catalog import ProductCatalog
+from session_recorder import SessionReader
+
+STAGES = ['read', 'preprocess', 'inference', 'postprocess', 'cart']
+
+def pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] * 1000
+
+def parse_tiles(value):
+    """'2x2' -> (2, 2)"""
+    cols, rows = value.lower().split('x')
+    return int(cols), int(rows)
+
+def replay(reader, model, catalog, detect_every, tiling=None, cache=None):
+    """Jalankan pipeline CameraWorker (tanpa display) atas seluruh frame.
+
+    Return (cart, latency per tahap, jumlah frame, durasi, jumlah deteksi per kelas).
+    """
+    tracker = vision_engine.CartTracker()
+    cart = {}
+    class_counts = Counter()
+    latencies = {stage: [] for stage in STAGES}
+    last_detected = []
+    frames = 0
+
+    frame_iter = iter(reader)
+    started = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        try:
+            _, frame = next(frame_iter)
+        except StopIteration:
+            break
+        latencies['read'].append(time.perf_counter() - t0)
+        frames += 1
+
+        if frames % detect_every == 0:
+            timings = {}
+            last_detected, _ = vision_engine.detect_products(frame, model, catalog, timings,
+                                                             tiling=tiling, cache=cache)
+            for stage, value in timings.items():
+                latencies[stage].append(value)
+            class_counts.update(d['name'] for d in last_detected)
+
+        t0 = time.perf_counter()
+        valid_detected = [d for d in last_detected if d['product'] is not None]
+        for key in tracker.update(valid_detected):
+            cart[key] = cart.get(key, 0) + 1
+        latencies['cart'].append(time.perf_counter() - t0)
+
+    return cart, latencies, frames, time.perf_counter() - started, class_counts
+
+def compare(cart, truth):
+    expected = sum(truth.values())
+    got = sum(cart.values())
+    correct = sum(min(cart.get(k, 0), v) for k, v in truth.items())
+    return {
+        'exact': cart == truth,
+        'precision': correct / got if got else 1.0,
+        'recall': correct / expected if expected else 1.0,
+        'missing': {k: v - cart.get(k, 0) for k, v in truth.items() if cart.get(k, 0) < v},
+        'extra': {k: v - truth.get(k, 0) for k, v in cart.items() if v > truth.get(k, 0)}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline pipeline deteksi")
+    parser.add_argument('session', help="file sesi (.frames / .mp4 / .avi)")
+    parser.add_argument('--truth', help="JSON ground truth cart")
+    parser.add_argument('--catalog', default=os.path.join(ROOT, 'produk_katalog.csv'))
+    parser.add_argument('--model', default='yolov5n')
+    parser.add_argument('--detect-every', type=int, default=vision_engine.DETECT_EVERY)
+    parser.add_argument('--min-fps', type=float, default=0, help="gagal jika FPS di bawah ini")
+    parser.add_argument('--strict', action='store_true', help="gagal jika cart tidak sama dengan truth")
+    parser.add_argument('--tiles', type=parse_tiles, help="tiled inference, mis. 2x2")
+    parser.add_argument('--cache', action='store_true', help="pakai DetectionCache (scene diam)")
+    args = parser.parse_args()
+
+    vision_engine.VERBOSE = False
+    catalog = ProductCatalog(args.catalog)
+    model = vision_engine.load_model(args.model)
+    if model is None:
+        sys.exit(1)
+    catalog.bind_classes(model.names)
+
+    reader = SessionReader(args.session)
+    tiling = vision_engine.Tiling(args.tiles) if args.tiles else None
+    cache = DetectionCache() if args.cache else None
+    cart, latencies, frames, elapsed, _ = replay(reader, model, catalog, args.detect_every, tiling, cache)
+    fps = frames / elapsed if elapsed else 0
+
+    print(f"\n{frames} frame dalam {elapsed:.2f} s - {fps:.1f} FPS "
+          f"(deteksi setiap {args.detect_every} frame)")
+    print(f"{'Tahap':<12} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for stage in STAGES:
+        values = latencies[stage]
+        print(f"{stage:<12} {len(values):>6} {pct(values, 50):>8.2f} {pct(values, 95):>8.2f} {pct(values, 99):>8.2f}")
+    if cache is not None:
+        print(f"Cache: {cache.hits} hit / {cache.misses} miss ({cache.hit_rate:.0%})")
+    print(f"\nCart: {json.dumps(cart, sort_keys=True)}")
+
+    failed = args.min_fps and fps < args.min_fps
+    if args.truth:
+        with open(args.truth, 'r', encoding='utf-8') as f:
+            truth = json.load(f)
+        truth = truth.get('cart', truth)
+        result = compare(cart, truth)
+        print(f"Truth: {json.dumps(truth, sort_keys=True)}")
+        print(f"Exact: {result['exact']}  precision {result['precision']:.2f}  recall {result['recall']:.2f}")
+        if result['missing']:
+            print(f"   kurang: {result['missing']}")
+        if result['extra']:
+            print(f"   lebih : {result['extra']}")
+        failed = failed or (args.strict and not result['exact'])
+    print()
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+BENCHMARK - DETEKTOR IN-PROCESS vs PROSES TERPISAH
+Putar ulang sesi rekaman dengan kecepatan kamera asli lewat CameraEngine,
+sekali dengan deteksi di thread kamera (perilaku lama) dan sekali dengan
+vision_process.ProcessDetector. Selama replay, thread "UI probe" meniru loop
+Tk (bangun setiap 10 ms + sedikit kerja Python) dan mencatat keterlambatannya
+- keterlambatan ini yang dirasakan kasir sebagai UI patah-patah.
+
+Jalankan di mesin kasir sebenarnya (mis. 4 core) untuk angka yang bermakna.
+
+Pemakaian:
+    python benchmarks/bench_vision_process.py sessions/pagi.frames --detect-every 1
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import vision_engine
+from kasir_cart import Cart
+from product_catalog import ProductCatalog
+from session_recorder import SessionReader
+from vision_process import ProcessDetector
+
+def pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] * 1000
+
+def ui_probe(stop, interval, lateness):
+    """Tiru loop UI: tidur interval lalu kerja ringan, catat keterlambatan bangun"""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        time.sleep(interval)
+        lateness.append(time.perf_counter() - t0 - interval)
+        sum(i * i for i in range(2000))  # kira-kira kerja satu refresh_ui
+
+def run_mode(reader, catalog, model, detector, detect_every, realtime):
+    cart = Cart(catalog)
+    engine = vision_engine.CameraEngine(None, model, catalog, cart, detector=detector,
+                                        detect_every=detect_every)
+    if detector is not None:
+        # Start proses + muat model sebelum pengukuran dimulai
+        first = next(iter(reader))[1]
+        detector.submit(first)
+        if not detector.wait_ready():
+            sys.exit(1)
+        detector.submit(first)
+        detector.poll(10.0)
+        detector.completed = 0
+
+    lateness = []
+    stop = threading.Event()
+    probe = threading.Thread(target=ui_probe, args=(stop, 0.01, lateness), daemon=True)
+    probe.start()
+
+    started = time.perf_counter()
+    for ts, frame in reader:
+        if realtime:
+            # Kamera tidak memberi frame lebih cepat dari fps rekaman
+            delay = ts - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        engine.process_frame(frame)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    probe.join()
+
+    if detector is not None:
+        detections = detector.completed
+    else:
+        detections = engine.frame_count // detect_every
+    return {
+        'camera_fps': engine.frame_count / elapsed,
+        'detect_fps': detections / elapsed,
+        'lateness': lateness,
+        'cart': cart.as_dict()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detektor in-process vs proses terpisah")
+    parser.add_argument('session', help="file sesi (.frames / .mp4 / .avi)")
+    parser.add_argument('--catalog', default=os.path.join(ROOT, 'produk_katalog.csv'))
+    parser.add_argument('--model', default='yolov5n')
+    parser.add_argument('--detect-every', type=int, default=vision_engine.DETECT_EVERY)
+    parser.add_argument('--max-speed', action='store_true', help="jangan ikuti fps rekaman")
+    args = parser.parse_args()
+
+    vision_engine.VERBOSE = False
+    reader = SessionReader(args.session)
+    results = {}
+
+    catalog = ProductCatalog(args.catalog)
+    model = vision_engine.load_model(args.model)
+    if model is None:
+        sys.exit(1)
+    catalog.bind_classes(model.names)
+    results['thread'] = run_mode(reader, catalog, model, None, args.detect_every, not args.max_speed)
+    del model
+
+    catalog = ProductCatalog(args.catalog)
+    detector = ProcessDetector(catalog, args.model)
+    try:
+        results['process'] = run_mode(reader, catalog, None, detector, args.detect_every, not args.max_speed)
+    finally:
+        detector.close()
+
+    print(f"\n{len(reader)} frame, deteksi setiap {args.detect_every} frame, {os.cpu_count()} CPU")
+    print(f"{'Mode':<8} {'kamera FPS':>10} {'deteksi FPS':>11} "
+          f"{'UI p50 ms':>10} {'UI p95 ms':>10} {'UI p99 ms':>10} {'UI max ms':>10}")
+    for mode, r in results.items():
+        late = r['lateness']
+        print(f"{mode:<8} {r['camera_fps']:>10.1f} {r['detect_fps']:>11.1f} "
+              f"{pct(late, 50):>10.2f} {pct(late, 95):>10.2f} {pct(late, 99):>10.2f} "
+              f"{max(late) * 1000 if late else 0:>10.2f}")
+    for mode, r in results.items():
+        print(f"cart {mode:<8}: {r['cart']}")
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+LOAD TEST - OWNER MONITORING API
+Simulasi banyak dashboard owner yang polling endpoint monitoring secara bersamaan.
+
+Pemakaian (server harus sudah jalan):
+    python serve_monitoring.py
+    python benchmarks/loadtest_monitoring.py --clients 32 --duration 20
+
+Laporan: requests/detik dan latency p50/p95/p99 per endpoint.
+Hanya memakai standard library (http.client dengan keep-alive per client).
+"""
+
+import argparse
+import http.client
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+DEFAULT_ENDPOINTS = [
+    '/api/dashboard',
+    '/api/today?fields=id,time,items_count,total',
+    '/api/chart-7days',
+    '/api/payment-method',
+    '/api/top-products',
+]
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+def client_loop(base, endpoints, deadline, use_etag, results, errors, lock):
+    """Satu dashboard: request endpoint bergantian sampai deadline"""
+    conn = http.client.HTTPConnection(base.hostname, base.port or 80, timeout=10)
+    etags = {}
+    latencies = defaultdict(list)
+    failed = defaultdict(int)
+    i = 0
+    while time.perf_counter() < deadline:
+        path = endpoints[i % len(endpoints)]
+        i += 1
+        headers = {}
+        if use_etag and path in etags:
+            headers['If-None-Match'] = etags[path]
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            elapsed = time.perf_counter() - start
+            if resp.status in (200, 304):
+                latencies[path].append(elapsed)
+                if resp.getheader('ETag'):
+                    etags[path] = resp.getheader('ETag')
+            else:
+                failed[path] += 1
+        except (OSError, http.client.HTTPException):
+            failed[path] += 1
+            conn.close()
+            conn = http.client.HTTPConnection(base.hostname, base.port or 80, timeout=10)
+    conn.close()
+
+    with lock:
+        for path, values in latencies.items():
+            results[path].extend(values)
+        for path, count in failed.items():
+            errors[path] += count
+
+def run(url, clients, duration, endpoints, use_etag):
+    base = urlparse(url)
+    results = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    threads = [
+        threading.Thread(target=client_loop,
+                         args=(base, endpoints, deadline, use_etag, results, errors, lock))
+        for _ in range(clients)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return results, errors, elapsed
+
+def report(results, errors, elapsed, clients):
+    total = sum(len(v) for v in results.values())
+    print("\n" + "=" * 78)
+    print(f"LOAD TEST - {clients} clients, {elapsed:.1f} s")
+    print("=" * 78)
+    print(f"{'Endpoint':<44} {'req/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+    print("-" * 78)
+    all_values = []
+    for path in sorted(set(results) | set(errors)):
+        values = sorted(results.get(path, []))
+        all_values.extend(values)
+        print(f"{path[:44]:<44} {len(values) / elapsed:>8.1f} "
+              f"{percentile(values, 50) * 1000:>7.1f} "
+              f"{percentile(values, 95) * 1000:>7.1f} "
+              f"{percentile(values, 99) * 1000:>7.1f}"
+              + (f"  ({errors[path]} error)" if errors.get(path) else ""))
+    all_values.sort()
+    print("-" * 78)
+    print(f"{'TOTAL':<44} {total / elapsed:>8.1f} "
+          f"{percentile(all_values, 50) * 1000:>7.1f} "
+          f"{percentile(all_values, 95) * 1000:>7.1f} "
+          f"{percentile(all_values, 99) * 1000:>7.1f}")
+    print("=" * 78 + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test endpoint dashboard monitoring")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15.0, help="detik")
+    parser.add_argument('--endpoint', action='append', dest='endpoints',
+                        help="Endpoint yang diuji (boleh diulang), default semua endpoint dashboard")
+    parser.add_argument('--no-etag', action='store_true',
+                        help="Jangan kirim If-None-Match (paksa response penuh)")
+    args = parser.parse_args()
+
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    results, errors, elapsed = run(args.url, args.clients, args.duration, endpoints, not args.no_etag)
+    report(results, errors, elapsed, args.clients)
+
+if __name__ == '__main__':
+    main()
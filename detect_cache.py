@@ -0,0 +1,107 @@
+"""
+DETECT CACHE
+Cache LRU kecil untuk hasil deteksi, dengan key perceptual hash (dHash) dari
+ROI tray yang sudah diperkecil. Saat barang diam di tray, frame berikutnya
+hampir identik: hash-nya dekat (hamming distance kecil) dan thumbnail 64x36
+nyaris sama, jadi box lama dipakai lagi tanpa menjalankan model.
+
+Benda kecil (pulpen 200x14 px di frame 1280x720) hampir tidak mengubah hash
+maupun beda rata-rata, jadi hit juga ditolak jika satu sel thumbnail berubah
+lebih dari max_local. Selain itu entry kedaluwarsa setelah max_age detik dan
+setiap refresh_every hit beruntun model tetap dijalankan sekali.
+
+    key = cache.key(frame)          # ~0.5 ms: resize ROI ke 64x36 + dHash
+    boxes = cache.get(key, size)    # None jika scene berubah / belum pernah dilihat
+    cache.put(key, size, boxes)
+"""
+
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+import kasir_metrics
+
+HASH_W, HASH_H = 17, 16  # dHash 16x16 = 256 bit
+THUMB_W, THUMB_H = 64, 36  # Thumbnail pembanding: 1 sel = 20x20 px di frame 1280x720
+
+class DetectionCache:
+    """LRU hasil deteksi {scene: box}, lookup berdasarkan kemiripan, bukan key persis"""
+
+    def __init__(self, capacity=8, max_distance=6, max_mad=4.0, max_local=20.0, max_age=2.0,
+                 refresh_every=10, roi=None):
+        self.capacity = capacity
+        self.max_distance = max_distance  # Maks bit dHash yang berbeda (dari 256)
+        self.max_mad = max_mad            # Maks beda rata-rata piksel thumbnail (0-255)
+        self.max_local = max_local        # Maks beda satu sel thumbnail (benda kecil baru)
+        self.max_age = max_age            # Detik sebelum entry dibuang
+        self.refresh_every = refresh_every  # Setelah N hit beruntun, paksa inference sekali
+        self.roi = roi                    # (x1, y1, x2, y2) area tray, None = seluruh frame
+        self.hits = 0
+        self.misses = 0
+        self._streak = 0
+        self._entries = OrderedDict()
+        self._next_id = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def key(self, frame):
+        """(hash, thumbnail) dari ROI frame"""
+        if self.roi is not None:
+            x1, y1, x2, y2 = self.roi
+            frame = frame[y1:y2, x1:x2]
+        # Resize BGR dulu (INTER_AREA = rata-rata blok), baru grayscale - jauh lebih murah dari cvtColor frame penuh
+        thumb = cv2.resize(frame, (THUMB_W, THUMB_H), interpolation=cv2.INTER_AREA).astype(np.float32)
+        thumb = thumb.mean(axis=2) if thumb.ndim == 3 else thumb
+        small = cv2.resize(thumb, (HASH_W, HASH_H), interpolation=cv2.INTER_AREA)
+        bits = np.packbits(small[:, 1:] > small[:, :-1])
+        return int.from_bytes(bits.tobytes(), 'big'), thumb
+
+    def get(self, key, size=None):
+        """Box tersimpan untuk scene yang mirip dengan key (dan ukuran input sama), atau None"""
+        now = time.monotonic()
+        for entry_id in [i for i, entry in self._entries.items() if now - entry[4] > self.max_age]:
+            del self._entries[entry_id]
+        if self._streak >= self.refresh_every:
+            # Jangan pernah bergantung pada cache terlalu lama - inference asli sesekali
+            self._streak = 0
+            return self._miss('detect_cache_refresh')
+
+        scene_hash, thumb = key
+        best = None
+        for entry_id, (entry_hash, entry_thumb, entry_size, boxes, _) in self._entries.items():
+            if entry_size != size:
+                continue
+            distance = bin(scene_hash ^ entry_hash).count('1')
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, entry_id, entry_thumb, boxes)
+        if best is not None:
+            diff = np.abs(best[2] - thumb)
+            if float(diff.mean()) <= self.max_mad and float(diff.max()) <= self.max_local:
+                self._entries.move_to_end(best[1])
+                self.hits += 1
+                self._streak += 1
+                kasir_metrics.inc('detect_cache_hits')
+                return best[3]
+        self._streak = 0
+        return self._miss('detect_cache_misses')
+
+    def _miss(self, metric):
+        self.misses += 1
+        kasir_metrics.inc(metric)
+        return None
+
+    def put(self, key, size, boxes):
+        scene_hash, thumb = key
+        self._entries[self._next_id] = (scene_hash, thumb, size, boxes, time.monotonic())
+        self._next_id += 1
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self._streak = 0
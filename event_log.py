@@ -0,0 +1,270 @@
+"""
+EVENT LOG
+Log event kasir append-only (JSON lines) untuk merekonstruksi apa yang terjadi
+di satu kasir: deteksi diterima, perubahan cart, pembayaran, hasil sync.
+
+emit() hanya menambah event ke buffer memori; thread EventLog menulis batch
+ke file setiap flush_interval detik. File dirotasi saat melewati max_bytes
+(opsional dikompres gzip), backup terlama dihapus setelah `backups` file.
+
+Setiap file punya index jarang <file>.idx ("ts offset" per ~index_every byte)
+sehingga pembaca bisa langsung seek ke rentang waktu tanpa parse seluruh file:
+
+    kasir_log.json                                <- file aktif
+    kasir_log.json.idx
+    kasir_log.20261019-101530-123456.json.gz      <- hasil rotasi
+    kasir_log.20261019-101530-123456.json.gz.idx
+
+Pemakaian:
+    python event_log.py kasir_log.json --from "2026-10-19 10:00" --to "2026-10-19 11:00" --event payment
+"""
+
+import argparse
+import bisect
+import glob
+import gzip
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+
+import kasir_metrics
+
+def index_path(path):
+    return path + '.idx'
+
+class EventLog(threading.Thread):
+    """Writer JSONL ber-buffer dengan rotasi ukuran dan index offset jarang"""
+
+    def __init__(self, path, max_bytes=20 * 1024 * 1024, backups=20, compress=True,
+                 flush_interval=0.5, index_every=64 * 1024, max_buffer=50000):
+        super().__init__(name="EventLog", daemon=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.index_every = index_every
+        self.max_buffer = max_buffer
+        self.written = 0
+        self.dropped = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._last_ts = 0.0
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._file = None
+        self._index = None
+        self._offset = 0
+        self._indexed_at = None
+
+    def emit(self, event, ts=None, **data):
+        """Catat event (tidak blocking). ts default waktu sekarang (epoch detik).
+        data tidak boleh diubah setelah emit - diserialisasi di thread writer."""
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                # Disk macet: buang event daripada menahan thread kamera/UI
+                self.dropped += 1
+                kasir_metrics.inc('event_log_dropped')
+                return
+            # ts tidak pernah mundur (jam sistem disetel) supaya file tetap urut untuk binary search
+            self._last_ts = max(self._last_ts, round(time.time() if ts is None else ts, 3))
+            self._buffer.append((self._last_ts, event, data))
+
+    def flush(self):
+        """Minta writer menulis buffer sekarang"""
+        self._wake.set()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._index = open(index_path(self.path), 'a', encoding='utf-8')
+        self._offset = self._file.tell()
+        self._indexed_at = None  # Baris pertama setelah buka selalu masuk index
+
+    def _close_files(self):
+        if self._file is not None:
+            self._file.close()
+            self._index.close()
+            self._file = self._index = None
+
+    def run(self):
+        self._open()
+        while not self._stop_event.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+        self._close_files()
+
+    def _drain(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        try:
+            with kasir_metrics.timer('event_log_write'):
+                self._write(batch)
+        except Exception as e:
+            kasir_metrics.log('ERROR', 'EVENTLOG', f"Gagal menulis event log: {e}")
+
+    def _write(self, batch):
+        chunks = []
+        index_lines = []
+        for ts, event, data in batch:
+            # ts selalu field pertama - pembaca bisa filter waktu tanpa json.loads per baris
+            line = json.dumps({'ts': ts, 'event': event, **data}, ensure_ascii=False, default=str)
+            line = (line + '\n').encode('utf-8')
+            if self._indexed_at is None or self._offset - self._indexed_at >= self.index_every:
+                index_lines.append(f"{ts} {self._offset}\n")
+                self._indexed_at = self._offset
+            chunks.append(line)
+            self._offset += len(line)
+        # Data dulu baru index: entri index tidak pernah menunjuk ke data yang belum ada
+        self._file.write(b''.join(chunks))
+        self._file.flush()
+        if index_lines:
+            self._index.write(''.join(index_lines))
+            self._index.flush()
+        self.written += len(batch)
+        kasir_metrics.inc('events_logged', len(batch))
+        if self._offset >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._close_files()
+        root, ext = os.path.splitext(self.path)
+        # Lebar tetap (sampai mikrodetik): urut nama = urut waktu, tidak pernah bentrok
+        rotated = f"{root}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{ext}"
+        os.replace(self.path, rotated)
+        os.replace(index_path(self.path), index_path(rotated))
+        self._open()  # Logging lanjut ke file baru sebelum kompres
+
+        if self.compress:
+            with open(rotated, 'rb') as src, gzip.open(rotated + '.gz', 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+            # Offset index tetap offset data tanpa kompresi (gzip seek maju = decompress)
+            os.replace(index_path(rotated), index_path(rotated + '.gz'))
+            os.remove(rotated)
+        kasir_metrics.inc('event_log_rotations')
+        kasir_metrics.log('INFO', 'EVENTLOG', f"Rotasi {self.path} -> {os.path.basename(rotated)}")
+
+        for old in rotated_files(self.path)[:-self.backups or None]:
+            for path in (old, index_path(old)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def close(self, timeout=5):
+        """Tulis sisa buffer lalu tutup file"""
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+
+# -----------------------
+# READER
+# -----------------------
+def rotated_files(path):
+    """File hasil rotasi untuk path, urut dari terlama"""
+    root, ext = os.path.splitext(path)
+    files = glob.glob(glob.escape(root) + '.*' + ext) + glob.glob(glob.escape(root) + '.*' + ext + '.gz')
+    # Nama berisi timestamp -> urut nama = urut waktu
+    return sorted(f for f in files if f != path)
+
+def log_files(path):
+    files = rotated_files(path)
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+def load_index(path):
+    """([ts], [offset]) dari <path>.idx, kosong jika tidak ada"""
+    stamps, offsets = [], []
+    try:
+        with open(index_path(path), 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    stamps.append(float(parts[0]))
+                    offsets.append(int(parts[1]))
+    except OSError:
+        pass
+    return stamps, offsets
+
+def _line_ts(line):
+    # Baris selalu diawali {"ts": <angka>, - cukup potong, tanpa json.loads
+    try:
+        return float(line[7:line.index(b',', 7)])
+    except ValueError:
+        return None
+
+def read_events(path, start=None, end=None, events=None):
+    """Generator event (dict) dengan start <= ts <= end, opsional hanya nama event tertentu"""
+    files = log_files(path)
+    indexes = [load_index(f) for f in files]
+    for i, (data_path, (stamps, offsets)) in enumerate(zip(files, indexes)):
+        if end is not None and stamps and stamps[0] > end:
+            break  # File berikutnya lebih baru lagi
+        next_stamps = indexes[i + 1][0] if i + 1 < len(indexes) else None
+        if start is not None and next_stamps and next_stamps[0] < start:
+            continue  # Seluruh isi file ini lebih lama dari start
+        offset = 0
+        if start is not None and stamps:
+            # Entri index terakhir yang masih sebelum start: semua baris sebelumnya < start
+            pos = bisect.bisect_left(stamps, start) - 1
+            if pos >= 0:
+                offset = offsets[pos]
+        opener = gzip.open if data_path.endswith('.gz') else open
+        with opener(data_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                ts = _line_ts(line)
+                if ts is None:
+                    continue  # Baris terpotong (crash saat menulis)
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts > end:
+                    return
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if events is None or record.get('event') in events:
+                    yield record
+
+def parse_time(value):
+    """Epoch detik atau tanggal ISO ("2026-10-19 10:00") -> epoch"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+def main():
+    parser = argparse.ArgumentParser(description="Baca event log kasir berdasarkan rentang waktu")
+    parser.add_argument('path', nargs='?', default='kasir_log.json')
+    parser.add_argument('--from', dest='start', type=parse_time, help="mis. '2026-10-19 10:00' atau epoch")
+    parser.add_argument('--to', dest='end', type=parse_time)
+    parser.add_argument('--event', help="filter nama event, pisahkan dengan koma (mis. payment,sync)")
+    parser.add_argument('--count', action='store_true', help="hanya hitung jumlah event per nama")
+    args = parser.parse_args()
+
+    events = set(args.event.split(',')) if args.event else None
+    started = time.perf_counter()
+    counts = {}
+    for record in read_events(args.path, args.start, args.end, events):
+        if args.count:
+            counts[record['event']] = counts.get(record['event'], 0) + 1
+        else:
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+    if args.count:
+        for name, count in sorted(counts.items()):
+            print(f"{name:<12} {count:>10}")
+        print(f"({time.perf_counter() - started:.2f} s)", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
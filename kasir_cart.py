@@ -0,0 +1,125 @@
+"""
+KASIR CART
+Keranjang belanja dengan total harga & jumlah item berjalan (O(1) per
+add/remove) dan event per baris, supaya UI cukup mem-patch baris yang berubah.
+"""
+
+import threading
+
+class CartLine:
+    """Satu baris cart - harga satuan dikunci saat item pertama ditambahkan"""
+    __slots__ = ('key', 'nama', 'qty', 'price')
+
+    def __init__(self, key, nama, price):
+        self.key = key
+        self.nama = nama
+        self.qty = 0
+        self.price = price
+
+    @property
+    def subtotal(self):
+        return self.qty * self.price
+
+class Cart:
+    """Keranjang thread-safe (thread kamera, barcode dan UI menambah item bersamaan).
+
+    Listener dipanggil listener(event, key) setelah lock dilepas, dengan event
+    'add' (baris baru), 'update' (qty/harga berubah), 'remove' atau 'clear' (key None).
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.total_price = 0
+        self.total_items = 0
+        self._lines = {}
+        self._listeners = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __contains__(self, key):
+        return key in self._lines
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def _emit(self, events):
+        for event, key in events:
+            for listener in self._listeners:
+                listener(event, key)
+
+    def line(self, key):
+        return self._lines.get(key)
+
+    def lines(self):
+        """Snapshot baris cart, urut per key"""
+        with self._lock:
+            return [self._lines[key] for key in sorted(self._lines)]
+
+    def qty(self, key):
+        line = self._lines.get(key)
+        return line.qty if line else 0
+
+    def as_dict(self):
+        """{key: qty} - format yang disimpan ke database"""
+        with self._lock:
+            return {key: line.qty for key, line in self._lines.items()}
+
+    def snapshot(self):
+        """(items {key: qty}, total harga, total item) yang konsisten satu sama lain"""
+        with self._lock:
+            return self.as_dict(), self.total_price, self.total_items
+
+    def add(self, key, qty=1):
+        with self._lock:
+            line = self._lines.get(key)
+            event = 'update'
+            if line is None:
+                product = self.catalog.get(key)
+                line = CartLine(key, product.nama if product else key, product.harga if product else 0)
+                self._lines[key] = line
+                event = 'add'
+            line.qty += qty
+            self.total_items += qty
+            self.total_price += qty * line.price
+        self._emit([(event, key)])
+        return line
+
+    def remove(self, key, qty=None):
+        """Kurangi qty (None = hapus seluruh baris)"""
+        with self._lock:
+            line = self._lines.get(key)
+            if line is None:
+                return
+            qty = line.qty if qty is None else min(qty, line.qty)
+            line.qty -= qty
+            self.total_items -= qty
+            self.total_price -= qty * line.price
+            event = 'update'
+            if line.qty <= 0:
+                del self._lines[key]
+                event = 'remove'
+        self._emit([(event, key)])
+
+    def clear(self):
+        with self._lock:
+            self._lines.clear()
+            self.total_price = 0
+            self.total_items = 0
+        self._emit([('clear', None)])
+
+    def reprice(self):
+        """Samakan harga & nama baris dengan katalog (setelah hot reload). Return jumlah baris berubah"""
+        events = []
+        with self._lock:
+            for key, line in self._lines.items():
+                product = self.catalog.get(key)
+                if product is None or (product.harga == line.price and product.nama == line.nama):
+                    continue
+                self.total_price += (product.harga - line.price) * line.qty
+                line.price = product.harga
+                line.nama = product.nama
+                events.append(('update', key))
+        self._emit(events)
+        return len(events)
@@ -0,0 +1,115 @@
+"""
+KASIR HEADLESS
+Jalankan engine deteksi + cart tanpa UI dan tulis event cart sebagai JSON
+lines ke stdout (atau file). Bisa menjadi backend kiosk / web UI, atau
+dipakai memproses file video rekaman.
+
+Pemakaian:
+    python kasir_headless.py --source 0
+    python kasir_headless.py --source sessions/pagi.mp4 --out events.jsonl
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+import kasir_metrics
+import vision_engine
+from adaptive_rate import AdaptiveRate
+from detect_cache import DetectionCache
+from kasir_cart import Cart
+from snapshot_writer import SnapshotWriter
+from vision_process import ProcessDetector
+from product_catalog import ProductCatalog
+
+class JsonlEmitter:
+    """Tulis satu objek JSON per baris, aman dipanggil dari beberapa thread"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def emit(self, event, **data):
+        line = json.dumps(dict(event=event, ts=round(time.time(), 3), **data), ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine kasir tanpa UI (event JSON lines)")
+    parser.add_argument('--source', default='0', help="index kamera atau path file video")
+    parser.add_argument('--catalog', default='produk_katalog.csv')
+    parser.add_argument('--model', default='yolov5n')
+    parser.add_argument('--out', help="file JSONL tujuan (default: stdout)")
+    parser.add_argument('--process', action='store_true', help="jalankan detektor di proses terpisah")
+    parser.add_argument('--adaptive', action='store_true', help="interval & ukuran deteksi menyesuaikan beban")
+    parser.add_argument('--tiles', help="tiled inference untuk benda kecil, mis. 2x2")
+    parser.add_argument('--cache', action='store_true', help="pakai ulang hasil deteksi untuk scene yang diam")
+    parser.add_argument('--snapshots', help="folder snapshot frame beranotasi setiap item masuk cart")
+    parser.add_argument('--verbose', action='store_true', help="log deteksi ke stderr")
+    args = parser.parse_args()
+
+    vision_engine.VERBOSE = False
+    if args.verbose:
+        vision_engine.VERBOSE = True
+        kasir_metrics.set_log_level('DEBUG')
+        sys.stdout = sys.stderr  # Log deteksi tidak bercampur dengan event
+
+    stream = open(args.out, 'a', encoding='utf-8') if args.out else sys.__stdout__
+    emitter = JsonlEmitter(stream)
+
+    catalog = ProductCatalog(args.catalog)
+    model = None
+    detector = None
+    tiling = None
+    if args.tiles:
+        cols, rows = args.tiles.lower().split('x')
+        tiling = vision_engine.Tiling((int(cols), int(rows)))
+    cache = DetectionCache() if args.cache else None
+    if args.process:
+        detector = ProcessDetector(catalog, args.model, tiling=tiling, cache=cache)
+    else:
+        model = vision_engine.load_model(args.model)
+        if model is None:
+            sys.exit(1)
+        catalog.bind_classes(model.names)
+
+    snapshots = SnapshotWriter(args.snapshots) if args.snapshots else None
+    cart = Cart(catalog)
+    source = int(args.source) if args.source.isdigit() else args.source
+    engine = vision_engine.CameraEngine(source, model, catalog, cart, detector=detector,
+                                        rate=AdaptiveRate() if args.adaptive else None, tiling=tiling,
+                                        cache=cache if detector is None else None, snapshots=snapshots)
+
+    def on_cart_change(event, key):
+        line = cart.line(key) if key else None
+        emitter.emit(event, key=key, frame=engine.frame_count,
+                     qty=line.qty if line else 0, price=line.price if line else None,
+                     cart_total=cart.total_price, cart_items=cart.total_items)
+
+    cart.subscribe(on_cart_change)
+    emitter.emit('start', source=str(args.source), products=len(catalog))
+    started = time.perf_counter()
+    engine.start()
+    try:
+        while engine.is_alive():
+            engine.join(0.5)
+    except KeyboardInterrupt:
+        engine.stop()
+        engine.join(2)
+
+    elapsed = time.perf_counter() - started
+    if detector is not None:
+        detector.close()
+    if snapshots is not None:
+        snapshots.close()
+    emitter.emit('end', frames=engine.frame_count,
+                 fps=round(engine.frame_count / elapsed, 2) if elapsed else 0,
+                 cart=cart.as_dict(), cart_total=cart.total_price)
+    if args.out:
+        stream.close()
+
+if __name__ == '__main__':
+    main()
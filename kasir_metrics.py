@@ -0,0 +1,226 @@
+"""
+KASIR METRICS
+Instrumentasi ringan untuk proses kasir: counter, gauge, timer (histogram
+dengan bucket tetap) dan log berlevel dengan sampling, pengganti print per
+frame. Diekspos sebagai teks format Prometheus lewat HTTP lokal
+(/metrics, /metrics.json) dan/atau dump JSON berkala ke file.
+
+    t0 = time.perf_counter()
+    ...
+    kasir_metrics.observe('capture', time.perf_counter() - t0)
+
+    with kasir_metrics.timer('db_write'):
+        ...
+
+    kasir_metrics.log('DEBUG', 'DETECTION', f"...", every=30)
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+LOG_LEVEL = LEVELS.get(os.environ.get('KASIR_LOG_LEVEL', 'INFO').upper(), LEVELS['INFO'])
+
+# Batas bucket timer (detik) - dari 1 ms (postprocess) sampai 5 s (backend timeout)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_timers = {}
+_log_counts = {}
+_labels = {}
+_started = time.time()
+
+# -----------------------
+# LOG
+# -----------------------
+def set_log_level(level):
+    global LOG_LEVEL
+    LOG_LEVEL = LEVELS[level.upper()]
+
+def log_enabled(level):
+    return LEVELS[level] >= LOG_LEVEL
+
+def log(level, tag, message, every=1):
+    """print("[TAG] message") jika level aktif; every=N hanya mencetak 1 dari N panggilan per tag"""
+    if LEVELS[level] < LOG_LEVEL:
+        return
+    if every > 1:
+        n = _log_counts.get(tag, 0)
+        _log_counts[tag] = n + 1
+        if n % every:
+            return
+    print(f"[{tag}] {message}")
+
+# -----------------------
+# METRICS
+# -----------------------
+def set_labels(**labels):
+    """Label yang ditempel ke semua metrik (mis. store_id, cashier_id) untuk monitoring armada"""
+    _labels.update({k: str(v) for k, v in labels.items() if v is not None})
+
+def inc(name, value=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def set_gauge(name, value):
+    _gauges[name] = value
+
+def observe(name, seconds):
+    """Catat satu durasi (detik) ke timer `name`"""
+    with _lock:
+        timer_data = _timers.get(name)
+        if timer_data is None:
+            # [count per bucket..., +Inf], count, sum, max
+            timer_data = _timers[name] = [[0] * (len(BUCKETS) + 1), 0, 0.0, 0.0]
+        buckets = timer_data[0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        timer_data[1] += 1
+        timer_data[2] += seconds
+        if seconds > timer_data[3]:
+            timer_data[3] = seconds
+
+@contextmanager
+def timer(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0)
+
+def _quantile_ms(buckets, count, q):
+    """Perkiraan kuantil (ms) dari bucket: batas atas bucket tempat kuantil jatuh,
+    None jika di atas bucket terbesar"""
+    target = q * count
+    seen = 0
+    for bound, n in zip(BUCKETS, buckets):
+        seen += n
+        if seen >= target:
+            return bound * 1000
+    return None
+
+def snapshot():
+    """Semua metrik sebagai dict (untuk JSON)"""
+    with _lock:
+        counters = dict(_counters)
+        timers = {name: (list(data[0]), data[1], data[2], data[3]) for name, data in _timers.items()}
+    return {
+        'ts': round(time.time(), 3),
+        'uptime_sec': round(time.time() - _started, 1),
+        'labels': dict(_labels),
+        'counters': counters,
+        'gauges': dict(_gauges),
+        'timers_ms': {
+            name: {
+                'count': count,
+                'avg': round(total / count * 1000, 3) if count else 0,
+                'max': round(peak * 1000, 3),
+                'p50_le': _quantile_ms(buckets, count, 0.5),
+                'p95_le': _quantile_ms(buckets, count, 0.95),
+                'p99_le': _quantile_ms(buckets, count, 0.99)
+            }
+            for name, (buckets, count, total, peak) in timers.items()
+        }
+    }
+
+def render_prometheus(prefix='kasir'):
+    """Semua metrik dalam format teks Prometheus"""
+    with _lock:
+        counters = dict(_counters)
+        timers = {name: (list(data[0]), data[1], data[2]) for name, data in _timers.items()}
+    base = ','.join(f'{k}="{v}"' for k, v in sorted(_labels.items()))
+
+    def labels(extra=''):
+        joined = ','.join(part for part in (base, extra) if part)
+        return '{' + joined + '}' if joined else ''
+
+    lines = [f"# TYPE {prefix}_uptime_seconds gauge",
+             f"{prefix}_uptime_seconds{labels()} {time.time() - _started:.1f}"]
+    for name, value in sorted(counters.items()):
+        lines.append(f"# TYPE {prefix}_{name}_total counter")
+        lines.append(f"{prefix}_{name}_total{labels()} {value}")
+    for name, value in sorted(_gauges.items()):
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.append(f"{prefix}_{name}{labels()} {value}")
+    for name, (buckets, count, total) in sorted(timers.items()):
+        metric = f"{prefix}_{name}_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, n in zip(BUCKETS, buckets):
+            cumulative += n
+            le = 'le="%s"' % bound
+            lines.append(f"{metric}_bucket{labels(le)} {cumulative}")
+        le = 'le="+Inf"'
+        lines.append(f"{metric}_bucket{labels(le)} {count}")
+        lines.append(f"{metric}_sum{labels()} {total:.6f}")
+        lines.append(f"{metric}_count{labels()} {count}")
+    return '\n'.join(lines) + '\n'
+
+# -----------------------
+# EXPORT
+# -----------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            body = render_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path == '/metrics.json':
+            body = json.dumps(snapshot()).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrape berkala tidak perlu mengotori console
+
+def start_http_server(port, host='127.0.0.1'):
+    """Endpoint /metrics di thread daemon. Return server (server.shutdown() untuk stop)"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class JsonDumper(threading.Thread):
+    """Tulis snapshot() ke file JSON setiap `interval` detik (atomik: tmp lalu replace)"""
+
+    def __init__(self, path, interval=30):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def dump(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(snapshot(), f, indent=1)
+        os.replace(tmp, self.path)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.dump()
+            except OSError as e:
+                log('WARNING', 'METRICS', f"Dump gagal: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+        try:
+            self.dump()
+        except OSError:
+            pass
@@ -0,0 +1,120 @@
+"""
+KASIR PROFILER
+Sampling profiler ringan untuk semua thread proses kasir (CameraWorker, Tk
+main loop, StockWriter, dll). Setiap `interval` detik stack semua thread
+diambil lewat sys._current_frames() - tidak ada hook per pemanggilan fungsi,
+jadi overhead kecil dan aman dinyalakan di toko.
+
+Output:
+    profile_<waktu>.collapsed  - format collapsed stack ("thread;f1;f2 N"),
+                                 bisa dibuka di speedscope atau flamegraph.pl
+    profile_<waktu>_top.txt    - ringkasan fungsi teratas (self & total)
+
+Pemakaian:
+    profiler = SamplingProfiler()
+    profiler.run_for(30, "kasir_snapshots", on_done=print)
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+class SamplingProfiler(threading.Thread):
+    """Ambil sampel stack semua thread selama `duration` detik lalu tulis hasilnya"""
+
+    def __init__(self, interval=0.005, max_depth=64):
+        super().__init__(name="SamplingProfiler", daemon=True)
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self.duration = 0
+        self.output_folder = None
+        self.on_done = None
+        self.paths = None
+        self._stop_event = threading.Event()
+
+    def run_for(self, duration, output_folder, on_done=None):
+        """Mulai profiling di background; on_done(paths) dipanggil dari thread profiler"""
+        self.duration = duration
+        self.output_folder = output_folder
+        self.on_done = on_done
+        self.start()
+
+    def stop(self):
+        """Hentikan lebih awal (hasil sampai saat ini tetap ditulis)"""
+        self._stop_event.set()
+
+    def _sample(self, names, own_id):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self):
+        own_id = threading.get_ident()
+        names = {}
+        started = time.perf_counter()
+        next_names = 0
+        while not self._stop_event.is_set() and time.perf_counter() - started < self.duration:
+            if time.perf_counter() >= next_names:
+                # Nama thread di-refresh tiap detik, bukan tiap sampel
+                names = {t.ident: t.name for t in threading.enumerate()}
+                next_names = time.perf_counter() + 1.0
+            self._sample(names, own_id)
+            time.sleep(self.interval)
+        self.duration = time.perf_counter() - started
+        try:
+            self.paths = self.write(self.output_folder)
+        except OSError as e:
+            print(f"[PROFILER] ✗ Gagal menulis hasil: {e}")
+            self.paths = None
+        if self.on_done:
+            self.on_done(self.paths)
+
+    def top_functions(self, limit=30):
+        """[(fungsi, self, total)] - self: sampel di puncak stack, total: sampel di mana saja di stack"""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')[1:]  # Elemen pertama nama thread
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for func in set(frames):
+                total[func] += count
+        return [(func, own[func], count) for func, count in total.most_common(limit)]
+
+    def write(self, output_folder):
+        """Tulis file collapsed + ringkasan, return (path_collapsed, path_top)"""
+        os.makedirs(output_folder, exist_ok=True)
+        base = os.path.join(output_folder, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        collapsed_path = base + ".collapsed"
+        with open(collapsed_path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        top_path = base + "_top.txt"
+        thread_samples = Counter()
+        for stack, count in self.stacks.items():
+            thread_samples[stack.split(';', 1)[0]] += count
+        total_samples = sum(self.stacks.values()) or 1
+        with open(top_path, 'w', encoding='utf-8') as f:
+            f.write(f"Sampling profile: {self.samples} sampel dalam {self.duration:.1f} s "
+                    f"(interval {self.interval * 1000:.1f} ms)\n\n")
+            f.write("Thread:\n")
+            for name, count in thread_samples.most_common():
+                f.write(f"  {count:>7}  {count / total_samples:6.1%}  {name}\n")
+            f.write(f"\n{'self':>7} {'self%':>6} {'total':>7} {'total%':>6}  fungsi\n")
+            for func, own, total in self.top_functions():
+                f.write(f"{own:>7} {own / total_samples:6.1%} {total:>7} {total / total_samples:6.1%}  {func}\n")
+        return collapsed_path, top_path
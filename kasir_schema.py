@@ -0,0 +1,57 @@
+"""
+KASIR DATABASE SCHEMA
+Skema & migrasi SQLite bersama untuk kasir_ui_advanced.py dan monitoring_app.py
+"""
+
+# Kolom yang ditambahkan setelah rilis awal - dimigrasi dengan ALTER TABLE
+TRANSACTION_MIGRATIONS = [
+    ('store_id', 'INTEGER'),
+    ('cashier_id', 'INTEGER'),
+]
+
+def init_schema(conn):
+    """Buat tabel/index yang belum ada dan tambahkan kolom baru ke database lama"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            items TEXT,
+            total REAL,
+            payment_method TEXT,
+            status TEXT,
+            store_id INTEGER,
+            cashier_id INTEGER
+        )
+    ''')
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(transactions)")}
+    for column, decl in TRANSACTION_MIGRATIONS:
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE transactions ADD COLUMN {column} {decl}")
+
+    # Index untuk query rentang tanggal di monitoring (listing, export)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp)')
+
+    # Ledger stock: mutasi append-only + stock terkini (materialized, diperbarui
+    # dalam transaksi yang sama dengan mutasinya)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stock_movements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            product TEXT NOT NULL,
+            delta INTEGER NOT NULL,
+            reason TEXT,
+            ref TEXT,
+            store_id INTEGER,
+            cashier_id INTEGER
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stock_levels (
+            product TEXT PRIMARY KEY,
+            qty INTEGER NOT NULL,
+            last_movement_id INTEGER
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_stock_movements_product ON stock_movements (product)')
+    conn.commit()
@@ -8,23 +8,38 @@ import os
 import cv2
 import time
 import json
+import bisect
 import threading
-import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
 import customtkinter as ctk
 import tkinter as tk
+from tkinter import filedialog
 from PIL import Image, ImageTk
 import sqlite3
 import pickle
-import torch
-import qrcode
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import requests
 from urllib.parse import urljoin
+import kasir_metrics
+from kasir_profiler import SamplingProfiler
+from kasir_schema import init_schema
+from stock_ledger import StockLedger, StockWriter, read_stock_csv
+from product_catalog import ProductCatalog
+from barcode_input import KeyboardWedge, FrameBarcodeScanner
+from kasir_cart import Cart
+from adaptive_rate import AdaptiveRate
+from vision_engine import load_model, CameraEngine, Tiling
+from detect_cache import DetectionCache
+from vision_process import ProcessDetector
+from session_recorder import SessionRecorder
+from snapshot_writer import SnapshotWriter
+from event_log import EventLog
+from payment_qr import PaymentQR
+from stock_grid import ProductIndex, VirtualStockGrid
 
 # -----------------------
 # CONFIG
@@ -37,6 +52,7 @@ BACKEND_URL = "http://127.0.0.1:5000"   # Ganti dengan IP komputer jika diakses
 ENABLE_BACKEND_SYNC = True  # Set False untuk mode offline
 BACKEND_TIMEOUT = 5  # Timeout untuk koneksi backend (detik)
 CASHIER_ID = 1  # ID cashier di sistem monitoring
+STORE_ID = 1  # ID toko - tiap toko menulis ke file database sendiri
 
 # Deteksi semua kamera yang tersedia
 def detect_available_cameras():
@@ -63,106 +79,79 @@ else:
     CAM_SOURCE = 0  # Gunakan default kamera
 
 OUTPUT_FOLDER = "kasir_snapshots"
-LOG_FILE = "kasir_log.json"
+LOG_FILE = "kasir_log.json"  # Event log JSONL (baca dengan: python event_log.py kasir_log.json --from ...)
+EVENT_LOG_MAX_MB = 20  # Rotasi saat file log melewati ukuran ini
+EVENT_LOG_BACKUPS = 20  # Jumlah file hasil rotasi yang disimpan
+EVENT_LOG_COMPRESS = True  # gzip file hasil rotasi
 DB_FILE = "kasir_data.db"
 SIMULATE_SEND = True
 THROTTLE_SEC = 0.6
+QR_SIZE = 280  # Ukuran QR pembayaran (px), dirender di thread PaymentQR
 
-# PRODUCTS DATABASE - Semua kelas YOLO COCO dengan harga
-PRODUCTS = {
-    # ===== BUAH-BUAHAN (FRESH FRUIT) =====
-    "apple": {"nama": "Apel", "harga": 12000, "stock": 50},
-    "banana": {"nama": "Pisang", "harga": 8000, "stock": 75},
-    "orange": {"nama": "Jeruk", "harga": 10000, "stock": 60},
-    "strawberry": {"nama": "Stroberi", "harga": 18000, "stock": 40},
-    "pear": {"nama": "Pir", "harga": 15000, "stock": 35},
-    "kiwi": {"nama": "Kiwi", "harga": 16000, "stock": 45},
-    
-    # ===== MAKANAN SNACK & MINUMAN (FOOD & BEVERAGE) =====
-    "donut": {"nama": "Donat", "harga": 8000, "stock": 100},
-    "sandwich": {"nama": "Sandwich", "harga": 22000, "stock": 50},
-    "pizza": {"nama": "Pizza", "harga": 35000, "stock": 30},
-    "cake": {"nama": "Kue", "harga": 28000, "stock": 25},
-    "hot dog": {"nama": "Hot Dog", "harga": 18000, "stock": 45},
-    "bread": {"nama": "Roti", "harga": 10000, "stock": 80},
-    "cheese": {"nama": "Keju", "harga": 25000, "stock": 35},
-    
-    # ===== SAYURAN (VEGETABLES) =====
-    "broccoli": {"nama": "Brokoli", "harga": 15000, "stock": 40},
-    "carrot": {"nama": "Wortel", "harga": 8000, "stock": 70},
-    "potato": {"nama": "Kentang", "harga": 7000, "stock": 90},
-    "tomato": {"nama": "Tomat", "harga": 10000, "stock": 55},
-    
-    # ===== WADAH & PERALATAN MINUM (CONTAINERS) =====
-    "cup": {"nama": "Cangkir", "harga": 12000, "stock": 60},
-    "bottle": {"nama": "Botol", "harga": 15000, "stock": 50},
-    "wine glass": {"nama": "Gelas Wine", "harga": 18000, "stock": 30},
-    "water bottle": {"nama": "Botol Air Minum", "harga": 25000, "stock": 40},
-    
-    # ===== PERALATAN & AKSESORIS PRIBADI (PERSONAL ACCESSORIES) =====
-    "backpack": {"nama": "Tas Punggung", "harga": 120000, "stock": 15},
-    "handbag": {"nama": "Tas Tangan", "harga": 180000, "stock": 12},
-    "umbrella": {"nama": "Payung", "harga": 45000, "stock": 25},
-    "tie": {"nama": "Dasi", "harga": 35000, "stock": 30},
-    "teddy bear": {"nama": "Boneka", "harga": 45000, "stock": 20},
-    "watch": {"nama": "Jam Tangan", "harga": 150000, "stock": 10},
-    "sunglasses": {"nama": "Kacamata Hitam", "harga": 75000, "stock": 18},
-    "cap": {"nama": "Topi", "harga": 30000, "stock": 35},
-    "shoe": {"nama": "Sepatu", "harga": 250000, "stock": 8},
-    "sock": {"nama": "Kaos Kaki", "harga": 15000, "stock": 100},
-    "clock": {"nama": "Jam Dinding", "harga": 50000, "stock": 15},
-    
-    # ===== ELEKTRONIK KECIL (SMALL ELECTRONICS) =====
-    "mouse": {"nama": "Mouse", "harga": 85000, "stock": 20},
-    "keyboard": {"nama": "Keyboard", "harga": 200000, "stock": 15},
-    "cell phone": {"nama": "Ponsel", "harga": 2500000, "stock": 5},
-    
-    # ===== BUKU & ALAT TULIS (BOOKS & STATIONERY) =====
-    "book": {"nama": "Buku", "harga": 35000, "stock": 40},
-    "scissors": {"nama": "Gunting", "harga": 12000, "stock": 25},
-    "pen": {"nama": "Pena", "harga": 5000, "stock": 200},
-    "notebook": {"nama": "Buku Tulis", "harga": 8000, "stock": 80},
-    "pencil": {"nama": "Pensil", "harga": 3000, "stock": 150},
-    
-    # ===== PERALATAN DAPUR & RUMAH TANGGA (KITCHENWARE) =====
-    "fork": {"nama": "Garpu", "harga": 8000, "stock": 70},
-    "knife": {"nama": "Pisau", "harga": 25000, "stock": 40},
-    "spoon": {"nama": "Sendok", "harga": 8000, "stock": 90},
-    "bowl": {"nama": "Mangkuk", "harga": 12000, "stock": 55},
-    
-    # ===== BARANG LAINNYA YANG MUNGKIN DITEMUKAN DI MINIMARKET =====
-    "baseball": {"nama": "Bola Baseball", "harga": 50000, "stock": 20},
-    "frisbee": {"nama": "Frisbee", "harga": 35000, "stock": 15},
-    "skateboard": {"nama": "Skateboard", "harga": 350000, "stock": 5},
-    "bicycle": {"nama": "Sepeda", "harga": 800000, "stock": 3},
-
-}
-
-PRESENCE_FRAMES_REQUIRED = 2
-ABSENCE_FRAMES_REQUIRED = 8
+# Katalog produk (key,nama,harga,stock,kategori) - dimuat ulang otomatis saat file berubah
+CATALOG_FILE = "produk_katalog.csv"
+CATALOG_RELOAD_MS = 5000
+catalog = ProductCatalog(CATALOG_FILE)
 
 Path(OUTPUT_FOLDER).mkdir(exist_ok=True)
 
-# FPS Optimization
-FRAME_RESIZE = (480, 360)  # Smaller size for faster processing
-DETECTION_INTERVAL = 2  # Process every 2 frames (every 3rd frame)
+# FPS Optimization - interval deteksi & ukuran input YOLO menyesuaikan beban (False = setiap 3 frame @ 640)
+ADAPTIVE_DETECTION = True
 DISPLAY_FPS_TARGET = 30  # Target FPS for display
-
-# Stock Management
+MAX_DETECT_LATENCY = 0.15  # Batas latency deteksi (detik)
+DETECT_SIZES = (640, 512, 416, 320)  # Ukuran input model yang boleh dipakai, besar -> kecil
+
+# Tiled inference - area tray dipotong jadi tile overlap (batch) supaya benda kecil (pulpen, kartu) terdeteksi
+TILED_INFERENCE = False
+TILE_GRID = (2, 2)  # (kolom, baris)
+TILE_OVERLAP = 0.2
+TRAY_ROI = None  # (x1, y1, x2, y2) area tray di frame kamera, None = seluruh frame
+
+# Cache deteksi - scene diam di tray (perceptual hash mirip) memakai box sebelumnya tanpa menjalankan model
+# Mati sampai diukur terhadap sesi rekaman (benchmarks/bench_vision.py --cache): benda kecil bisa terlewat
+DETECT_CACHE = False
+CACHE_MAX_DISTANCE = 6  # Maks bit dHash berbeda (dari 256)
+CACHE_MAX_MAD = 4.0  # Maks beda rata-rata piksel thumbnail 64x36 (0-255)
+CACHE_MAX_LOCAL = 20.0  # Maks beda satu sel thumbnail - pulpen/kartu baru membatalkan hit
+CACHE_MAX_AGE = 2.0  # Detik sebelum hasil cache kedaluwarsa
+CACHE_REFRESH_EVERY = 10  # Inference asli setelah N hit beruntun
+
+# Snapshot - frame beranotasi + JSON deteksi disimpan ke OUTPUT_FOLDER setiap item masuk cart dan saat pembayaran
+ENABLE_SNAPSHOTS = True
+SNAPSHOT_FORMAT = "jpg"  # "jpg" atau "webp"
+SNAPSHOT_QUALITY = 85
+SNAPSHOT_WORKERS = 2  # Thread encoder
+SNAPSHOT_MAX_MB = 2048  # Batas total ukuran snapshot, file terlama dihapus lebih dulu
+
+# Rekam frame kamera untuk benchmark offline (benchmarks/bench_vision.py), None = mati
+RECORD_SESSION = None  # mis. "kasir_sessions/sesi.frames" atau ".mp4"
+
+# Jalankan detektor YOLO di proses terpisah (frame lewat shared memory) - UI tidak berebut GIL
+VISION_PROCESS = True
+
+# Barcode - scanner USB (keyboard wedge) selalu aktif, decode dari kamera butuh pyzbar
+ENABLE_CAMERA_BARCODE = True
+BARCODE_SCAN_INTERVAL = 5  # Kirim 1 dari 5 frame ke decoder barcode
+
+# Stock Management - ledger di SQLite; file JSON lama hanya diimpor sekali
 STOCK_FILE = "produk_kasir.json"
 
+# Metrics - endpoint Prometheus lokal (http://127.0.0.1:9109/metrics, 0 = mati) dan dump JSON berkala
+METRICS_PORT = int(os.environ.get("KASIR_METRICS_PORT", "9109"))
+METRICS_DUMP_FILE = os.environ.get("KASIR_METRICS_FILE")  # mis. "kasir_metrics.json", None = mati
+METRICS_DUMP_SEC = 30
+
+# Profiler - KASIR_PROFILE_SEC=N: profil semua thread N detik pertama sejak start (hasil ke OUTPUT_FOLDER)
+PROFILE_ON_START_SEC = int(os.environ.get("KASIR_PROFILE_SEC", "0"))
+
 state_lock = threading.Lock()
 stats = {"total": 0, "paid": 0, "pending": 0}
-cart = defaultdict(int)
+cart = Cart(catalog)
 latest_transactions = []
 last_process_time = 0.0
 session_start_time = datetime.now()
 total_items_sold_counter = 0  # Counter total items yang sudah terjual (tidak di-reset)
 
-# Cooldown system - cegah 1 benda terdeteksi terus-terus
-item_cooldown = defaultdict(int)
-COOLDOWN_FRAMES = 600  # Tunggu 30 frame sebelum item yang sama bisa ditambah lagi
-
 # ===== PREMIUM MODERN COLOR PALETTE =====
 COLORS = {
     # Background - Clean Modern Dark
@@ -199,60 +188,104 @@ COLORS = {
 def init_database():
     try:
         conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT,
-                items TEXT,
-                total REAL,
-                payment_method TEXT,
-                status TEXT
-            )
-        ''')
-        conn.commit()
+        init_schema(conn)
         conn.close()
     except Exception as e:
         print("DB init error:", e)
 
-def load_stock_from_file():
-    """Load stock dari JSON file"""
-    global PRODUCTS
+def load_stock():
+    """Load stock terkini dari ledger SQLite (impor sekali dari produk_kasir.json)"""
     try:
-        if os.path.exists(STOCK_FILE):
-            with open(STOCK_FILE, 'r', encoding='utf-8') as f:
-                stock_data = json.load(f)
-                for product_key, stock_qty in stock_data.items():
-                    if product_key in PRODUCTS:
-                        PRODUCTS[product_key]["stock"] = stock_qty
-                print(f"✓ Stock loaded from {STOCK_FILE}")
+        seeded = stock_writer.seed({product.key: product.stock for product in catalog}, STOCK_FILE)
+        sync_stock()
+        print(f"✓ Stock loaded from ledger ({seeded} produk baru)")
     except Exception as e:
         print(f"Error loading stock: {e}")
 
-def save_stock_to_file():
-    """Save stock ke JSON file"""
-    try:
-        stock_data = {key: PRODUCTS[key].get("stock", 0) for key in PRODUCTS}
-        with open(STOCK_FILE, 'w', encoding='utf-8') as f:
-            json.dump(stock_data, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"Error saving stock: {e}")
+def sync_stock(products=None):
+    """Salin stock di memori StockWriter ke katalog (thread UI)"""
+    levels = stock_writer.levels()
+    for product_key in (levels if products is None else products):
+        product = catalog.get(product_key)
+        if product is not None and product_key in levels:
+            product.stock = levels[product_key]
+    if 'stock_grid' in globals():
+        stock_grid.refresh_visible()
+
+def on_stock_written(products):
+    """Dipanggil thread StockWriter setelah flush - stock ledger bisa berbeda (kasir lain)"""
+    app.after(0, sync_stock, products)
+
+def apply_stock(deltas, reason, ref=None):
+    """Catat mutasi stock {produk: delta}; katalog langsung diperbarui, ledger ditulis di background.
+    ADJUST (klik +/-) digabung per produk sebelum ditulis."""
+    if reason == "ADJUST" and ref is None:
+        stock_writer.adjust(deltas)
+    else:
+        stock_writer.submit(deltas, reason, ref)
+    sync_stock(deltas)
 
 def save_to_database(items, total, payment_method, status):
+    """Simpan transaksi, return id transaksi (None jika gagal)"""
     try:
+        t0 = time.perf_counter()
         conn = sqlite3.connect(DB_FILE)
         cursor = conn.cursor()
         items_str = json.dumps(items)
         cursor.execute('''
-            INSERT INTO transactions (timestamp, items, total, payment_method, status)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (datetime.now().isoformat(), items_str, total, payment_method, status))
+            INSERT INTO transactions (timestamp, items, total, payment_method, status, store_id, cashier_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (datetime.now().isoformat(), items_str, total, payment_method, status, STORE_ID, CASHIER_ID))
         conn.commit()
         conn.close()
+        kasir_metrics.observe('db_write', time.perf_counter() - t0)
+        kasir_metrics.inc('transactions')
+        return cursor.lastrowid
     except Exception as e:
-        print("DB save error:", e)
+        kasir_metrics.inc('db_write_errors')
+        kasir_metrics.log('ERROR', 'DB', f"DB save error: {e}")
+        return None
+
+# -----------------------
+# METRICS
+# -----------------------
+kasir_metrics.set_labels(store_id=STORE_ID, cashier_id=CASHIER_ID)
+metrics_server = None
+if METRICS_PORT:
+    try:
+        metrics_server = kasir_metrics.start_http_server(METRICS_PORT)
+        print(f"✓ Metrics: http://127.0.0.1:{METRICS_PORT}/metrics")
+    except OSError as e:
+        print(f"Metrics endpoint tidak aktif (port {METRICS_PORT}): {e}")
+metrics_dumper = None
+if METRICS_DUMP_FILE:
+    metrics_dumper = kasir_metrics.JsonDumper(METRICS_DUMP_FILE, METRICS_DUMP_SEC)
+    metrics_dumper.start()
+
+event_log = EventLog(LOG_FILE, EVENT_LOG_MAX_MB * 1024 * 1024, EVENT_LOG_BACKUPS, EVENT_LOG_COMPRESS)
+event_log.start()
+event_log.emit('start', store_id=STORE_ID, cashier_id=CASHIER_ID)
+
+# Transaksi (SQLite, backend, latest_transactions) ditulis berurutan di satu thread, bukan di UI thread
+transaction_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="TransactionWriter")
+TRANSACTION_CLOSE_TIMEOUT = BACKEND_TIMEOUT + 2  # Maks detik menunggu transaksi antre saat jendela ditutup
+# Di-set saat jendela ditutup: thread worker berhenti memanggil Tk, karena app.after dari
+# thread lain menunggu main loop - yang saat itu sedang menunggu thread worker (deadlock)
+app_closing = threading.Event()
+
+def post_to_ui(func, *args):
+    """app.after(0, ...) dari thread worker, dilewati setelah jendela mulai ditutup"""
+    if not app_closing.is_set():
+        app.after(0, func, *args)
+
+payment_qr = PaymentQR(QR_SIZE)
+payment_qr.start()
 
 init_database()
+stock_ledger = StockLedger(DB_FILE, STORE_ID, CASHIER_ID)
+stock_writer = StockWriter(stock_ledger, on_change=on_stock_written)
+stock_writer.start()
+load_stock()
 
 # -----------------------
 # BACKEND INTEGRATION
@@ -260,18 +293,18 @@ init_database()
 def send_transaction_to_backend(items_dict, total_price, payment_method="cash"):
     """Kirim transaksi ke backend monitoring untuk ditampilkan di dashboard owner"""
     if not ENABLE_BACKEND_SYNC:
-        print("[BACKEND] Offline mode - tidak mengirim ke backend")
+        kasir_metrics.log('DEBUG', 'BACKEND', "Offline mode - tidak mengirim ke backend")
         return False
     
     try:
         # Format items untuk backend
         items_list = []
         for product_name, qty in items_dict.items():
-            product_info = PRODUCTS.get(product_name, {})
+            product = catalog.get(product_name)
             items_list.append({
                 'product_name': product_name,
                 'quantity': qty,
-                'price': product_info.get('harga', 0)
+                'price': product.harga if product else 0
             })
         
         # Prepare data
@@ -279,33 +312,45 @@ def send_transaction_to_backend(items_dict, total_price, payment_method="cash"):
             'items': items_list,
             'total_amount': total_price,
             'payment_method': payment_method,
-            'cashier_id': CASHIER_ID
+            'cashier_id': CASHIER_ID,
+            'store_id': STORE_ID
         }
         
         # Send to backend
         url = urljoin(BACKEND_URL, '/api/cashier/record-sale')
-        response = requests.post(
-            url,
-            json=payload,
-            timeout=BACKEND_TIMEOUT
-        )
+        with kasir_metrics.timer('backend_sync'):
+            response = requests.post(
+                url,
+                json=payload,
+                timeout=BACKEND_TIMEOUT
+            )
         
         if response.status_code == 201 or response.status_code == 200:
             result = response.json()
-            print(f"[BACKEND] ✓ Transaksi berhasil dikirim: ID {result.get('transaction_id')}")
+            kasir_metrics.inc('backend_sync_ok')
+            event_log.emit('sync', ok=True, total=total_price, transaction_id=result.get('transaction_id'))
+            kasir_metrics.log('INFO', 'BACKEND', f"✓ Transaksi berhasil dikirim: ID {result.get('transaction_id')}")
             return True
         else:
-            print(f"[BACKEND] ✗ Error: {response.status_code} - {response.text}")
+            kasir_metrics.inc('backend_sync_errors')
+            kasir_metrics.log('WARNING', 'BACKEND', f"✗ Error: {response.status_code} - {response.text}")
+            event_log.emit('sync', ok=False, total=total_price, error=f"HTTP {response.status_code}")
             return False
             
     except requests.exceptions.ConnectionError:
-        print(f"[BACKEND] ✗ Tidak bisa terhubung ke {BACKEND_URL}")
+        kasir_metrics.inc('backend_sync_errors')
+        kasir_metrics.log('WARNING', 'BACKEND', f"✗ Tidak bisa terhubung ke {BACKEND_URL}")
+        event_log.emit('sync', ok=False, total=total_price, error="connection")
         return False
     except requests.exceptions.Timeout:
-        print(f"[BACKEND] ✗ Timeout saat koneksi ke backend")
+        kasir_metrics.inc('backend_sync_errors')
+        kasir_metrics.log('WARNING', 'BACKEND', "✗ Timeout saat koneksi ke backend")
+        event_log.emit('sync', ok=False, total=total_price, error="timeout")
         return False
     except Exception as e:
-        print(f"[BACKEND] ✗ Error mengirim transaksi: {e}")
+        kasir_metrics.inc('backend_sync_errors')
+        kasir_metrics.log('ERROR', 'BACKEND', f"✗ Error mengirim transaksi: {e}")
+        event_log.emit('sync', ok=False, total=total_price, error=str(e))
         return False
 
 def check_backend_status():
@@ -323,223 +368,62 @@ def check_backend_status():
 # -----------------------
 # YOLO DETECTION
 # -----------------------
-def get_color(idx):
-    """Generate warna unik berdasarkan index"""
-    np.random.seed(idx)
-    return tuple(int(x) for x in np.random.randint(80, 255, 3))
-
-try:
-    # Ganti ke yolov5n (Nano) - 5x lebih cepat, akurasi cukup untuk deteksi produk
-    print("[MODEL] Loading YOLOv5 model...")
-    model = torch.hub.load('ultralytics/yolov5', 'yolov5n', pretrained=True)
-    model.eval()
-    model.conf = 0.25  # Lower confidence threshold untuk deteksi lebih banyak
-    model.iou = 0.45   # NMS threshold
-    print("[MODEL] ✓ YOLOv5 model loaded successfully")
-except Exception as e:
+tiling = Tiling(TILE_GRID, TILE_OVERLAP, TRAY_ROI) if TILED_INFERENCE else None
+detect_cache = DetectionCache(max_distance=CACHE_MAX_DISTANCE, max_mad=CACHE_MAX_MAD,
+                              max_local=CACHE_MAX_LOCAL, max_age=CACHE_MAX_AGE,
+                              refresh_every=CACHE_REFRESH_EVERY, roi=TRAY_ROI) if DETECT_CACHE else None
+snapshot_writer = SnapshotWriter(OUTPUT_FOLDER, SNAPSHOT_FORMAT, SNAPSHOT_QUALITY, SNAPSHOT_WORKERS,
+                                 max_bytes=SNAPSHOT_MAX_MB * 1024 * 1024) if ENABLE_SNAPSHOTS else None
+if VISION_PROCESS:
+    # Model dimuat di proses detektor; katalog di-bind saat proses siap
     model = None
-    print(f"[MODEL] ✗ WARNING: YOLOv5 model not loaded - {e}")
-
-def detect_products(frame):
-    """Deteksi produk menggunakan YOLOv5 dengan visualisasi modern - optimized untuk performa"""
-    if model is None:
-        return [], frame
-    
-    try:
-        # Gunakan frame original size untuk deteksi lebih akurat
-        img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Inference - confidence sudah set di model initialization
-        results = model(img)  # Menggunakan conf=0.25 dan iou=0.45 dari model config
-        
-        detected = []
-        annotated = frame.copy()
-        
-        # Deteksi & visualisasi
-        for det in results.xyxy[0]:
-            x1, y1, x2, y2, conf, cls = det[:6]
-            x1, y1, x2, y2 = map(int, [x1, y1, x2, y2])  # Koordinat sudah di original scale
-            
-            conf = float(conf)
-            cls = int(cls)
-            label = f"{model.names[cls]} {conf:.2f}"
-            color = get_color(cls)
-            
-            product_name = model.names[cls]
-            detected.append({
-                'name': product_name.lower(),  # Convert ke lowercase untuk match PRODUCTS key
-                'conf': conf,
-                'box': (x1, y1, x2, y2)
-            })
-            print(f"[DETECT] Found: {product_name} (conf: {conf:.2f})")
-            
-            # Kotak deteksi tebal
-            cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 4, cv2.LINE_AA)
-            
-            # Label transparan rounded
-            (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
-            label_bg = annotated[max(0, y1-th-16):y1, x1:x1+tw+16]
-            if label_bg.shape[0] > 0 and label_bg.shape[1] > 0:
-                overlay_label = label_bg.copy()
-                cv2.rectangle(overlay_label, (0, 0), (tw+16, th+16), color, -1, cv2.LINE_AA)
-                cv2.addWeighted(overlay_label, 0.5, label_bg, 0.5, 0, label_bg)
-            # Shadow
-            cv2.putText(annotated, label, (x1+9, y1-7), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,0,0), 4, cv2.LINE_AA)
-            # Teks label
-            cv2.putText(annotated, label, (x1+8, y1-8), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2, cv2.LINE_AA)
-        
-        if len(detected) > 0:
-            print(f"[DETECT] Total detections: {len(detected)}")
-        
-        return detected, annotated
-    except Exception as e:
-        print(f"[DETECT] Detection error: {e}")
-        return [], frame
+    vision_detector = ProcessDetector(catalog, tiling=tiling, cache=detect_cache)
+else:
+    vision_detector = None
+    model = load_model()
+    if model is not None:
+        # Class id -> produk dihitung sekali, bukan model.names[cls].lower() per deteksi
+        catalog.bind_classes(model.names)
 
 # -----------------------
 # CAMERA WORKER
 # -----------------------
-class CameraWorker(threading.Thread):
+class CameraWorker(CameraEngine):
+    """CameraEngine + tampilan frame ke panel Tk"""
     def __init__(self, src, panel, update_callback):
-        super().__init__(daemon=True)
-        self.src = src
+        super().__init__(src, model, catalog, cart,
+                         on_frame=self._show_frame,
+                         on_raw_frame=self._scan_barcode,
+                         recorder=SessionRecorder(RECORD_SESSION) if RECORD_SESSION else None,
+                         idle_sleep=0.01,
+                         detector=vision_detector,
+                         rate=AdaptiveRate(DISPLAY_FPS_TARGET, MAX_DETECT_LATENCY, DETECT_SIZES)
+                         if ADAPTIVE_DETECTION else None,
+                         tiling=tiling,
+                         cache=detect_cache,
+                         snapshots=snapshot_writer,
+                         event_log=event_log)
         self.panel = panel
         self.update_callback = update_callback
-        self.cap = None
-        self.running = True
-        self._open_source()
-        self.presence_count = 0
-        self.absence_count = 0
-        self.processed = False
-        self.fps_counter = 0
-        self.fps_time = time.time()
-        self.current_fps = 0
-        self.current_frame = None
-        self.frame_count = 0
-
-    def _open_source(self):
-        try:
-            self.cap = cv2.VideoCapture(self.src)
-            # Set camera properties untuk performa optimal
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            # Jangan force resolution - biarkan kamera gunakan native resolution untuk deteksi lebih akurat
-        except Exception as e:
-            print("Failed to open source:", e)
-            self.cap = None
 
-    def stop(self):
-        self.running = False
-        try:
-            if isinstance(self.cap, cv2.VideoCapture):
-                self.cap.release()
-        except:
-            pass
+    def _scan_barcode(self, frame):
+        if barcode_scanner is not None and self.frame_count % BARCODE_SCAN_INTERVAL == 0:
+            barcode_scanner.submit(frame)
 
-    def run(self):
-        global stats, cart, latest_transactions, last_process_time
-        
-        prev_time = 0
-        last_added_product = None
-        last_added_time = 0
-        frame_skip_counter = 0
-        last_detected = []  # Cache hasil deteksi frame sebelumnya
-        last_annotated = None
+    def _show_frame(self, annotated, valid_detected):
+        t0 = time.perf_counter()
+        # Resize hanya untuk display di UI - tidak mempengaruhi deteksi
+        display_frame = cv2.resize(annotated, (800, 600))
         
-        while self.running:
-            if self.cap is None:
-                time.sleep(0.2)
-                continue
-            
-            try:
-                ret, frame = self.cap.read()
-                if not ret:
-                    time.sleep(0.01)
-                    continue
+        # Convert dan display
+        img = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
+        img = Image.fromarray(img)
+        imgtk = ImageTk.PhotoImage(img)
+        self.panel.update_image(imgtk)
+        kasir_metrics.observe('render_frame', time.perf_counter() - t0)
 
-                self.current_frame = frame.copy()
-                
-                # Process deteksi HANYA setiap 3 frame untuk mengurangi beban CPU
-                frame_skip_counter += 1
-                if frame_skip_counter >= 3:
-                    frame_skip_counter = 0
-                    detected, annotated = detect_products(frame)
-                    last_detected = detected
-                    last_annotated = annotated
-                else:
-                    # Gunakan hasil deteksi dari frame sebelumnya (reuse)
-                    detected = last_detected
-                    annotated = last_annotated if last_annotated is not None else frame.copy()
-                
-                # Filter hanya produk yang ada di PRODUCTS
-                valid_detected = [d for d in detected if d['name'] in PRODUCTS]
-                
-                if valid_detected:
-                    print(f"[DETECTION] Found {len(valid_detected)} valid products: {[d['name'] for d in valid_detected]}")
-                    self.presence_count += 1
-                    self.absence_count = 0
-                    
-                    # Tambah ke cart HANYA setelah presence threshold terpenuhi
-                    if self.presence_count >= PRESENCE_FRAMES_REQUIRED:
-                        with state_lock:
-                            for det in valid_detected:
-                                product_name = det['name']
-                                print(f"[DETECTION] Processing: {product_name}, cooldown={item_cooldown.get(product_name, 0)}")
-                                
-                                # Cek apakah produk masih dalam cooldown
-                                if item_cooldown[product_name] <= 0:
-                                    # Produk tidak dalam cooldown, tambahkan ke cart
-                                    cart[product_name] += 1
-                                    item_cooldown[product_name] = COOLDOWN_FRAMES  # Set cooldown untuk produk ini
-                                    print(f"[DETECTION] ✓ Added {product_name} to cart, qty now: {cart[product_name]}")
-                                else:
-                                    print(f"[DETECTION] {product_name} in cooldown ({item_cooldown[product_name]} frames), skipping")
-                else:
-                    self.absence_count += 1
-                    self.presence_count = 0
-
-                if self.processed and self.absence_count >= ABSENCE_FRAMES_REQUIRED:
-                    self.processed = False
-                    self.presence_count = 0
-                    self.absence_count = 0
-
-                # Resize hanya untuk display di UI - tidak mempengaruhi deteksi
-                display_frame = cv2.resize(annotated, (800, 600))
-                
-                # Hitung FPS
-                curr_time = time.time()
-                fps = 1 / (curr_time - prev_time) if prev_time else 0
-                prev_time = curr_time
-
-                self.fps_counter += 1
-                now = time.time()
-                if now - self.fps_time >= 1.0:
-                    self.current_fps = self.fps_counter
-                    self.fps_counter = 0
-                    self.fps_time = now
-
-                # Convert dan display
-                img = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(img)
-                imgtk = ImageTk.PhotoImage(img)
-                self.panel.update_image(imgtk)
-
-                if self.update_callback:
-                    self.update_callback(valid_detected)
-                
-                # Decrement cooldown untuk semua item yang sedang dalam cooldown
-                with state_lock:
-                    for item in list(item_cooldown.keys()):
-                        if item_cooldown[item] > 0:
-                            item_cooldown[item] -= 1
-                        else:
-                            del item_cooldown[item]
-
-                time.sleep(0.01)
-            
-            except Exception as e:
-                print(f"Camera worker error: {e}")
-                time.sleep(0.05)
-                continue
+        if self.update_callback:
+            self.update_callback(valid_detected)
 
 _process_lock = threading.Lock()
 _last_process = 0.0
@@ -1154,55 +1038,64 @@ total_label.pack(padx=12, pady=8)
 btn_frame = ctk.CTkFrame(right_col, fg_color="transparent")
 btn_frame.pack(fill="x", pady=(0, 0))
 
+def record_qr_payment(items, total_price, total_items, paid_at):
+    """Thread transaksi: simpan transaksi PAID + catat di latest_transactions"""
+    trans_id = save_to_database(items, total_price, "QR", "PAID")
+    event_log.emit('payment', status="PAID", method="QR", trans_id=trans_id, total=total_price, items=items)
+    with state_lock:
+        stats["paid"] += 1
+        latest_transactions.insert(0, {
+            "time": paid_at.strftime("%H:%M:%S"),
+            "total": total_price,
+            "items": total_items,
+            "status": "PAID"
+        })
+        del latest_transactions[10:]
+
+def show_payment_qr(total_price, ppm):
+    """UI thread: tampilkan buffer PPM dari PaymentQR (abaikan jika pembayaran sudah dibatalkan)"""
+    if not qr_payment_active or cart.total_price != total_price:
+        return
+    if ppm is None:
+        status_text.configure(text="Error generating QR")
+        status_indicator.configure(text_color=COLORS["accent_fail"])
+        qr_status_label.configure(text="Error")
+        return
+    imgtk = tk.PhotoImage(data=ppm)
+    qr_canvas.delete("all")
+    qr_canvas.create_rectangle(0, 0, 352, 280, fill=COLORS["bg_tertiary"], outline="")
+    qr_canvas.create_image(176, 140, image=imgtk)
+    qr_canvas.imgtk = imgtk
+    qr_status_label.configure(text="✅ Generated")
+
+def on_qr_rendered(total_price, ppm):
+    """Dipanggil dari thread QR - pindahkan ke UI thread"""
+    post_to_ui(show_payment_qr, total_price, ppm)
+
 def generate_payment_qr():
     global qr_payment_active
     
-    total_price = 0
-    for item, qty in cart.items():
-        info = PRODUCTS.get(item, {"harga": 0})
-        total_price += info["harga"] * qty
+    items, total_price, total_items = cart.snapshot()
     
     if total_price > 0:
-        try:
-            payment_data = f"Minimarket|Total:{total_price}|Waktu:{int(time.time())}"
-            qr = qrcode.QRCode(version=1, box_size=8, border=1)
-            qr.add_data(payment_data)
-            qr.make(fit=True)
-            img = qr.make_image(fill='black', back_color='white')
-            img = img.resize((320, 280))
-            imgtk = ImageTk.PhotoImage(img)
-            qr_canvas.delete("all")
-            qr_canvas.create_rectangle(0, 0, 352, 280, fill=COLORS["bg_tertiary"], outline="")
-            qr_canvas.create_image(176, 140, image=imgtk)
-            qr_canvas.imgtk = imgtk
-            qr_payment_active = True
-            qr_status_label.configure(text="✅ Generated")
-            
-            with state_lock:
-                stats["paid"] += 1
-            
-            transaction = {
-                "time": datetime.now().strftime("%H:%M:%S"),
-                "total": total_price,
-                "items": sum(cart.values()),
-                "status": "PAID"
-            }
-            latest_transactions.insert(0, transaction)
-            latest_transactions[:] = latest_transactions[:10]
-            
-            save_to_database(dict(cart), total_price, "QR", "PAID")
-            
-            status_text.configure(text="QR Generated - Ready for payment")
-            status_indicator.configure(text_color=COLORS["accent_pass"])
-            
-            # Update button text and command
-            payment_btn.configure(text="✅ SELESAI", command=complete_payment, fg_color=COLORS["accent_info"],
-                                 hover_color=COLORS["accent_secondary"])
-        except Exception as e:
-            print(f"Error generating QR: {e}")
-            status_text.configure(text="Error generating QR")
-            status_indicator.configure(text_color=COLORS["accent_fail"])
-            qr_status_label.configure(text="Error")
+        qr_payment_active = True
+        # QR total ini biasanya sudah dirender saat cart berubah; jika belum, render di thread QR
+        ppm = payment_qr.get(total_price)
+        if ppm is not None:
+            show_payment_qr(total_price, ppm)
+        else:
+            qr_status_label.configure(text="⏳ Generating")
+            payment_qr.request(total_price, on_qr_rendered)
+        
+        # SQLite + latest_transactions di thread transaksi - UI tidak menunggu disk
+        transaction_pool.submit(record_qr_payment, items, total_price, total_items, datetime.now())
+        
+        status_text.configure(text="QR Generated - Ready for payment")
+        status_indicator.configure(text_color=COLORS["accent_pass"])
+        
+        # Update button text and command
+        payment_btn.configure(text="✅ SELESAI", command=complete_payment, fg_color=COLORS["accent_info"],
+                             hover_color=COLORS["accent_secondary"])
     else:
         status_text.configure(text="Cart empty - Add items first")
         status_indicator.configure(text_color=COLORS["accent_warning"])
@@ -1220,9 +1113,32 @@ def clear_cart():
     status_text.configure(text="Cart cleared - Ready for checkout")
     status_indicator.configure(text_color=COLORS["accent_info"])
 
+def add_barcode_to_cart(code):
+    """Tambah produk ke cart dari hasil scan barcode (lookup O(1) di katalog)"""
+    product = catalog.by_barcode(code)
+    if product is None:
+        print(f"[BARCODE] Unknown barcode: {code}")
+        status_text.configure(text=f"⚠️ Barcode {code} tidak terdaftar")
+        status_indicator.configure(text_color=COLORS["accent_warning"])
+        return
+    cart.add(product.key)
+    print(f"[BARCODE] ✓ Added {product.key} to cart, qty now: {cart.qty(product.key)}")
+    status_text.configure(text=f"✅ {product.nama} ditambahkan (barcode)")
+    status_indicator.configure(text_color=COLORS["accent_pass"])
+
+keyboard_wedge = KeyboardWedge()
+
+def on_key_press(event):
+    """Tangkap input scanner barcode USB di seluruh window kecuali kolom input"""
+    if isinstance(event.widget, tk.Entry):
+        return
+    code = keyboard_wedge.feed(event.char, event.time / 1000.0)
+    if code:
+        add_barcode_to_cart(code)
+
 def add_stock_to_cart(product_key):
     """Add product stock via input dialog"""
-    if product_key not in PRODUCTS:
+    if product_key not in catalog:
         return
     
     # Create input dialog
@@ -1238,7 +1154,7 @@ def add_stock_to_cart(product_key):
     input_window.geometry(f"+{x}+{y}")
     
     # Label
-    product_name = PRODUCTS[product_key]["nama"]
+    product_name = catalog.get(product_key).nama
     ctk.CTkLabel(input_window, text=f"Add stock for {product_name}",
                 font=ctk.CTkFont(size=11, weight="bold"),
                 text_color=COLORS["text_primary"]).pack(pady=(15, 10))
@@ -1261,8 +1177,7 @@ def add_stock_to_cart(product_key):
         try:
             qty = int(qty_entry.get())
             if qty > 0:
-                with state_lock:
-                    cart[product_key] += qty
+                cart.add(product_key, qty)
                 input_window.destroy()
             else:
                 qty_entry.configure(border_color="#ff6b6b")
@@ -1288,34 +1203,41 @@ def add_stock_to_cart(product_key):
     payment_btn.configure(text="💰 BAYAR", command=generate_payment_qr, fg_color=COLORS["accent_pass"],
                          hover_color=COLORS["accent_pass"][:-2] + "88")
 
+def record_completed_payment(items, total_price, sold, frame):
+    """Thread transaksi: simpan COMPLETED, kurangi stock, snapshot, lalu kirim ke backend.
+    Antre setelah record_qr_payment sehingga urutan PAID -> COMPLETED di database tetap terjaga."""
+    trans_id = save_to_database(items, total_price, "QR", "COMPLETED")
+    event_log.emit('payment', status="COMPLETED", method="QR", trans_id=trans_id, total=total_price,
+                   items=items)
+    
+    # KURANGI STOCK OTOMATIS KETIKA PEMBAYARAN SELESAI (satu transaksi ledger, ref = id transaksi)
+    # Tidak bergantung hasil POST backend - jangan tunggu timeout HTTP
+    stock_writer.submit(sold, "SALE", trans_id)
+    post_to_ui(sync_stock, sold)
+    
+    if snapshot_writer is not None and frame is not None:
+        # Bukti transaksi: frame saat SELESAI ditekan + isi cart, diencode di thread snapshot
+        annotated, valid_detected = frame
+        snapshot_writer.capture(annotated, 'payment', valid_detected, trans_id=trans_id,
+                                items=items, total=total_price)
+    
+    # ===== SEND TO BACKEND MONITORING =====
+    send_transaction_to_backend(items, total_price, "QR")
+
 def complete_payment():
     """Mark payment as complete and reset for next transaction"""
     global qr_payment_active, total_items_sold_counter
     if qr_payment_active or len(cart) > 0:
         # Save transaction if not already saved
-        total_price = 0
-        items_count = 0
-        for item, qty in cart.items():
-            info = PRODUCTS.get(item, {"harga": 0})
-            total_price += info["harga"] * qty
-            items_count += qty
+        items, total_price, items_count = cart.snapshot()
         
         if qr_payment_active:
-            save_to_database(dict(cart), total_price, "QR", "COMPLETED")
-            
-            # ===== SEND TO BACKEND MONITORING =====
-            send_transaction_to_backend(dict(cart), total_price, "QR")
-            
-            # KURANGI STOCK OTOMATIS KETIKA PEMBAYARAN SELESAI
+            sold = {item: -qty for item, qty in items.items() if item in catalog}
+            frame = worker.last_result if worker is not None else None
+            transaction_pool.submit(record_completed_payment, items, total_price, sold, frame)
             with state_lock:
-                for item, qty in cart.items():
-                    if item in PRODUCTS:
-                        PRODUCTS[item]["stock"] = max(0, PRODUCTS[item].get("stock", 0) - qty)
                 # Increment total items sold counter
                 total_items_sold_counter += items_count
-            
-            # Simpan stock ke file
-            save_stock_to_file()
         
         # Reset for next transaction
         with state_lock:
@@ -1346,9 +1268,8 @@ payment_btn.pack(fill="x", pady=0)
 # === TEST BUTTON (untuk debug) ===
 def test_add_item():
     """Test: Tambah item langsung ke cart"""
-    with state_lock:
-        cart["apple"] += 1
-        print(f"[TEST] Manual added apple to cart. Cart now: {dict(cart)}")
+    cart.add("apple")
+    print(f"[TEST] Manual added apple to cart. Cart now: {cart.as_dict()}")
     status_text.configure(text="✓ Test item added (apple)")
 
 test_btn = create_button(btn_frame, "🧪 TEST", test_add_item, "info")
@@ -1456,7 +1377,7 @@ title_frame.pack(fill="x", padx=1, pady=(12, 8))
 
 ctk.CTkLabel(title_frame, text="📦 Product Inventory", 
             font=ctk.CTkFont(size=13, weight="bold"),
-            text_color=COLORS["text_primary"]).pack(anchor="w", padx=12)
+            text_color=COLORS["text_primary"]).pack(side="left", padx=12)
 
 # Table header dengan styling modern dan rapi
 header_frame = ctk.CTkFrame(stock_table_frame, fg_color=COLORS["accent_info"],
@@ -1476,31 +1397,6 @@ for i, label in enumerate(header_labels):
                        text_color=COLORS["bg_primary"])
     cell.grid(row=0, column=i, sticky="w", padx=12, pady=12)
 
-# Stock items list dengan scroll
-stock_items_frame = ctk.CTkScrollableFrame(stock_table_frame, 
-                                          fg_color=COLORS["bg_tertiary"],
-                                          label_text="",
-                                          label_fg_color="transparent")
-stock_items_frame.pack(fill="both", expand=True, padx=1, pady=1)
-
-# Category mapping
-category_map = {
-    "apple": "Buah", "banana": "Buah", "orange": "Buah", "strawberry": "Buah",
-    "pear": "Buah", "kiwi": "Buah",
-    "donut": "Makanan", "sandwich": "Makanan", "pizza": "Makanan", "cake": "Makanan",
-    "hot dog": "Makanan", "bread": "Makanan", "cheese": "Makanan",
-    "broccoli": "Sayur", "carrot": "Sayur", "potato": "Sayur", "tomato": "Sayur",
-    "cup": "Wadah", "bottle": "Wadah", "wine glass": "Wadah", "water bottle": "Wadah",
-    "backpack": "Aksesoris", "handbag": "Aksesoris", "umbrella": "Aksesoris", "tie": "Aksesoris",
-    "teddy bear": "Aksesoris", "watch": "Aksesoris", "sunglasses": "Aksesoris", 
-    "cap": "Aksesoris", "shoe": "Aksesoris", "sock": "Aksesoris",
-    "mouse": "Elektronik", "keyboard": "Elektronik", "cell phone": "Elektronik",
-    "book": "Alat Tulis", "scissors": "Alat Tulis", "pen": "Alat Tulis", 
-    "notebook": "Alat Tulis", "pencil": "Alat Tulis",
-    "fork": "Peralatan", "knife": "Peralatan", "spoon": "Peralatan", "bowl": "Peralatan",
-    "baseball": "Mainan", "frisbee": "Mainan", "skateboard": "Mainan", "bicycle": "Mainan"
-}
-
 # Icons dan warna per kategori
 icons = {
     "Buah": "🍎", "Makanan": "🍔", "Sayur": "🥦", "Wadah": "🥤",
@@ -1516,105 +1412,69 @@ category_colors = {
     "Mainan": COLORS["accent_secondary"]
 }
 
-# Display stock items sebagai baris yang rapi
-stock_items_list = []
-for idx, (product_key, product_info) in enumerate(PRODUCTS.items()):
-    # Alternating row colors
-    row_bg = COLORS["bg_secondary"] if idx % 2 == 0 else COLORS["bg_tertiary"]
-    
-    row_frame = ctk.CTkFrame(stock_items_frame, fg_color=row_bg, corner_radius=0, border_width=0)
-    row_frame.pack(fill="x", padx=0, pady=0)
-    row_frame.grid_columnconfigure(0, weight=2, minsize=150)
-    row_frame.grid_columnconfigure(1, weight=1, minsize=80)
-    row_frame.grid_columnconfigure(2, weight=1, minsize=100)
-    row_frame.grid_columnconfigure(3, weight=0, minsize=80)
-    row_frame.grid_columnconfigure(4, weight=0, minsize=110)
-    
-    category = category_map.get(product_key, "Lainnya")
-    icon = icons.get(category, "📦")
-    
-    # Produk name
-    ctk.CTkLabel(row_frame, text=f"{icon} {product_info['nama']}", 
-                font=ctk.CTkFont(size=10, weight="bold"),
-                text_color=COLORS["text_primary"],
-                fg_color=row_bg).grid(row=0, column=0, sticky="w", padx=12, pady=10)
-    
-    # Kategori
-    cat_color = category_colors.get(category, COLORS["text_tertiary"])
-    ctk.CTkLabel(row_frame, text=category,
-                font=ctk.CTkFont(size=9, weight="bold"),
-                text_color=cat_color,
-                fg_color=row_bg).grid(row=0, column=1, sticky="w", padx=8, pady=10)
-    
-    # Harga
-    ctk.CTkLabel(row_frame, text=f"Rp {product_info['harga']:,}",
-                font=ctk.CTkFont(size=9, weight="bold"),
-                text_color=COLORS["accent_pass"],
-                fg_color=row_bg).grid(row=0, column=2, sticky="w", padx=8, pady=10)
-    
-    # Stock dari PRODUCTS (actual inventory)
-    stock_qty = product_info.get("stock", 0)
-    if stock_qty > 10:
-        stock_color = COLORS["accent_pass"]
-    elif stock_qty > 0:
-        stock_color = COLORS["accent_warning"]
-    else:
-        stock_color = COLORS["accent_secondary"]
-    
-    stock_label = ctk.CTkLabel(row_frame, text=f"{stock_qty}",
-                              font=ctk.CTkFont(size=10, weight="bold"),
-                              text_color=stock_color,
-                              fg_color=row_bg)
-    stock_label.grid(row=0, column=3, sticky="w", padx=8, pady=10)
-    
-    # Action buttons frame
-    action_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-    action_frame.grid(row=0, column=4, sticky="ew", padx=8, pady=10)
-    action_frame.grid_columnconfigure((0, 1), weight=1)
-    
-    # Helper function untuk update UI
-    def create_decrease_func(pk, lbl):
-        def decrease():
-            with state_lock:
-                if PRODUCTS[pk]["stock"] > 0:
-                    PRODUCTS[pk]["stock"] -= 1
-                    save_stock_to_file()
-            new_stock = PRODUCTS[pk]["stock"]
-            color = COLORS["accent_pass"] if new_stock > 10 else (COLORS["accent_warning"] if new_stock > 0 else COLORS["accent_secondary"])
-            lbl.configure(text=str(new_stock), text_color=color)
-        return decrease
-    
-    def create_increase_func(pk, lbl):
-        def increase():
-            with state_lock:
-                PRODUCTS[pk]["stock"] += 1
-                save_stock_to_file()
-            new_stock = PRODUCTS[pk]["stock"]
-            color = COLORS["accent_pass"] if new_stock > 10 else (COLORS["accent_warning"] if new_stock > 0 else COLORS["accent_secondary"])
-            lbl.configure(text=str(new_stock), text_color=color)
-        return increase
-    
-    # Tombol kurang (-)
-    btn_minus = ctk.CTkButton(action_frame, text="−", width=30, height=28,
-                             fg_color=COLORS["accent_secondary"],
-                             hover_color=COLORS["accent_secondary"][:-2] + "dd",
-                             text_color=COLORS["bg_primary"],
-                             font=ctk.CTkFont(size=14, weight="bold"),
-                             corner_radius=4,
-                             command=create_decrease_func(product_key, stock_label))
-    btn_minus.grid(row=0, column=0, padx=2)
-    
-    # Tombol tambah (+)
-    btn_plus = ctk.CTkButton(action_frame, text="+", width=30, height=28,
-                            fg_color=COLORS["accent_pass"],
-                            hover_color=COLORS["accent_pass"][:-2] + "dd",
-                            text_color=COLORS["bg_primary"],
-                            font=ctk.CTkFont(size=14, weight="bold"),
-                            corner_radius=4,
-                            command=create_increase_func(product_key, stock_label))
-    btn_plus.grid(row=0, column=1, padx=2)
-    
-    stock_items_list.append(row_frame)
+# Grid tervirtualisasi: widget hanya untuk baris yang terlihat, dipakai ulang saat scroll
+def adjust_stock_from_grid(product, delta):
+    with state_lock:
+        if delta > 0 or product.stock > 0:
+            apply_stock({product.key: delta}, "ADJUST")
+
+stock_index = ProductIndex(catalog)
+stock_grid = VirtualStockGrid(stock_table_frame, COLORS, icons, category_colors,
+                              on_adjust=adjust_stock_from_grid)
+stock_grid.pack(fill="both", expand=True, padx=1, pady=1)
+
+stock_filter_job = None
+
+def apply_stock_filter():
+    global stock_filter_job
+    stock_filter_job = None
+    kategori = stock_category_menu.get()
+    stock_grid.set_items(stock_index.search(stock_search_entry.get(),
+                                            None if kategori == "Semua" else kategori))
+
+def schedule_stock_filter(event=None):
+    """Debounce pencarian - filter dijalankan setelah user berhenti mengetik"""
+    global stock_filter_job
+    if stock_filter_job is not None:
+        app.after_cancel(stock_filter_job)
+    stock_filter_job = app.after(150, apply_stock_filter)
+
+stock_category_menu = ctk.CTkOptionMenu(title_frame, values=["Semua"] + stock_index.categories(),
+                                        width=130, command=lambda _: apply_stock_filter())
+stock_category_menu.pack(side="right", padx=(4, 12))
+stock_search_entry = ctk.CTkEntry(title_frame, placeholder_text="🔍 Cari nama / kode / barcode", width=220)
+stock_search_entry.pack(side="right", padx=4)
+stock_search_entry.bind("<KeyRelease>", schedule_stock_filter)
+apply_stock_filter()
+
+def import_stock_csv():
+    """Terima barang / stock opname dari CSV (kolom key, qty = tambah, stock = set)"""
+    path = filedialog.askopenfilename(title="Import stock CSV", filetypes=[("CSV", "*.csv")])
+    if not path:
+        return
+    try:
+        receive, counted = read_stock_csv(path)
+    except Exception as e:
+        print(f"[STOCK] Import error: {e}")
+        return
+    unknown = [key for key in list(receive) + list(counted) if key not in catalog]
+    receive = {key: qty for key, qty in receive.items() if key in catalog}
+    counted = {key: qty for key, qty in counted.items() if key in catalog}
+    ref = os.path.basename(path)
+    with state_lock:
+        if receive:
+            apply_stock(receive, "RECEIVE", ref)
+        if counted:
+            stock_writer.set_quantities(counted, "COUNT", ref)
+            sync_stock(counted)
+    print(f"[STOCK] ✓ Import {ref}: {len(receive)} diterima, {len(counted)} diset"
+          + (f", {len(unknown)} produk tidak dikenal" if unknown else ""))
+
+ctk.CTkButton(title_frame, text="📥 Import CSV", width=110,
+              fg_color=COLORS["accent_info"],
+              text_color=COLORS["bg_primary"],
+              font=ctk.CTkFont(size=11, weight="bold"),
+              command=import_stock_csv).pack(side="right", padx=4)
 
 # === REPORTS TAB ===
 reports_tab = mgmt_tabs.tab("📊 Reports")
@@ -1664,6 +1524,45 @@ for method in ["QR Code", "E-Wallet", "Cash"]:
     chk.pack(anchor="w", padx=12, pady=3)
     chk.select()
 
+# Profiler - sampling stack semua thread, hasil (collapsed stack + top fungsi) ke OUTPUT_FOLDER
+ctk.CTkLabel(settings_tab, text="Performance Profiler", text_color=COLORS["text_primary"],
+            font=ctk.CTkFont(size=11, weight="bold")).pack(anchor="w", padx=12, pady=(15, 8))
+
+profiler_row = ctk.CTkFrame(settings_tab, fg_color="transparent")
+profiler_row.pack(fill="x", padx=12)
+profile_duration_menu = ctk.CTkOptionMenu(profiler_row, values=["10 s", "30 s", "60 s", "120 s"], width=90)
+profile_duration_menu.set("30 s")
+profile_duration_menu.pack(side="left", padx=(0, 8))
+profiler = None
+
+def on_profile_done(paths):
+    """Dipanggil thread profiler setelah file ditulis"""
+    def _upd():
+        profile_btn.configure(state="normal")
+        if paths:
+            profile_status.configure(text=f"✓ {os.path.basename(paths[0])} ({profiler.samples} sampel)")
+        else:
+            profile_status.configure(text="✗ Gagal menulis hasil profil")
+    post_to_ui(_upd)
+
+def start_profiling(seconds=None):
+    global profiler
+    if profiler is not None and profiler.is_alive():
+        return
+    if seconds is None:
+        seconds = int(profile_duration_menu.get().split()[0])
+    profiler = SamplingProfiler()
+    profiler.run_for(seconds, OUTPUT_FOLDER, on_done=on_profile_done)
+    profile_btn.configure(state="disabled")
+    profile_status.configure(text=f"⏺ Profiling {seconds} s...")
+    print(f"[PROFILER] Profiling {seconds} s (proses detektor terpisah tidak ikut diprofil)")
+
+profile_btn = create_button(profiler_row, "▶ Start Profiling", start_profiling, "warning", width=150)
+profile_btn.pack(side="left")
+profile_status = ctk.CTkLabel(settings_tab, text="", text_color=COLORS["text_tertiary"],
+                             font=ctk.CTkFont(size=10))
+profile_status.pack(anchor="w", padx=12, pady=(4, 0))
+
 def update_management_data():
     """Update all management page data and graphs"""
     try:
@@ -1799,9 +1698,9 @@ def update_management_data():
                 stock_mgmt_box.delete("1.0", "end")
                 stock_text = "Product             Stock    Status     Value\n"
                 stock_text += "=" * 55 + "\n"
-                for prod, info in list(PRODUCTS.items())[:8]:
-                    nama = info['nama'][:16].ljust(16)
-                    value = 50 * info['harga']
+                for product in list(catalog)[:8]:
+                    nama = product.nama[:16].ljust(16)
+                    value = 50 * product.harga
                     stock_text += f"{nama} 50 pcs ✅ OK  Rp {value:>10,}\n"
                 stock_mgmt_box.insert("1.0", stock_text)
                 stock_mgmt_box.configure(state="disabled")
@@ -1818,7 +1717,7 @@ def update_management_data():
                 report_text += f"Total Revenue ........ Rp {today_revenue:>15,}\n"
                 report_text += f"Total Transactions ... {today_trans:>15}\n"
                 report_text += f"Average Order Value .. Rp {today_avg:>15,.0f}\n"
-                report_text += f"Items Sold ............ {sum(cart.values()):>15}\n"
+                report_text += f"Items Sold ............ {cart.total_items:>15}\n"
                 report_text += "\n" + "=" * 55 + "\n"
                 report_text += "✅ Report generated successfully"
                 reports_box.insert("1.0", report_text)
@@ -1847,55 +1746,106 @@ def update_detection_callback(detected):
 
 # ===== WORKER INITIALIZATION =====
 worker = None
+barcode_scanner = None
+
+def on_camera_barcode(code):
+    """Dipanggil dari thread decoder - pindahkan ke UI thread"""
+    app.after(0, add_barcode_to_cart, code)
 
 def start_worker():
     """Start the camera worker"""
-    global worker
+    global worker, barcode_scanner
+    if barcode_scanner is None and ENABLE_CAMERA_BARCODE and FrameBarcodeScanner.available():
+        barcode_scanner = FrameBarcodeScanner(on_camera_barcode)
+        barcode_scanner.start()
     if worker is None:
         worker = CameraWorker(CAM_SOURCE, panel, update_detection_callback)
         worker.start()
     refresh_ui()
 
+# ===== CART RENDERING (incremental) =====
+cart_rows = []  # Key baris yang sedang tampil di cart_box, urut
+
+def format_cart_line(line):
+    """Format rapi: Barang........................x1  Rp1000000"""
+    nama = line.nama[:16]
+    qty_str = f"x{line.qty}"
+    harga_str = f"Rp{line.subtotal:,}"
+    
+    # Hitung dots antara nama dan qty
+    total_width = 40  # Total width yang diinginkan sebelum qty
+    dots_needed = max(1, total_width - len(nama) - len(qty_str))
+    dots = "." * dots_needed
+    
+    return f"{nama}{dots}{qty_str}  {harga_str}\n"
+
+def cart_tag(key):
+    """Nama tag Tk untuk baris key. Tk membaca tag sebagai list Tcl, jadi key dengan
+    spasi ("hot dog") harus di-encode - hex tidak pernah berisi spasi/kurung kurawal."""
+    return "line:" + key.encode("utf-8").hex()
+
+def show_cart_placeholder():
+    if not cart_rows and not cart_box.tag_ranges("empty"):
+        cart_box.insert("0.0", "Keranjang kosong\nLetakkan produk di depan kamera", "empty")
+        cart_box.tag_config("empty", foreground=COLORS["text_tertiary"])
+
+def render_cart_line(key):
+    """Patch hanya baris milik key sesuai isi cart saat ini"""
+    tag = cart_tag(key)
+    ranges = cart_box.tag_ranges(tag)
+    line = cart.line(key)
+    if ranges:
+        index = str(ranges[0])
+        cart_box.delete(ranges[0], ranges[1])
+        if line is None:
+            cart_rows.remove(key)
+    elif line is not None:
+        placeholder = cart_box.tag_ranges("empty")
+        if placeholder:
+            cart_box.delete(placeholder[0], placeholder[1])
+        # Sisipkan sebelum baris berikutnya dalam urutan key
+        pos = bisect.bisect(cart_rows, key)
+        index = str(cart_box.tag_ranges(cart_tag(cart_rows[pos]))[0]) if pos < len(cart_rows) else "end"
+        cart_rows.insert(pos, key)
+    else:
+        return
+    if line is not None:
+        cart_box.insert(index, format_cart_line(line), tag)
+    show_cart_placeholder()
+
+def render_cart_all():
+    """Gambar ulang seluruh cart (setelah clear)"""
+    cart_box.delete("0.0", "end")
+    cart_rows.clear()
+    for line in cart.lines():
+        cart_rows.append(line.key)
+        cart_box.insert("end", format_cart_line(line), cart_tag(line.key))
+    show_cart_placeholder()
+
+def on_cart_change(event, key):
+    """Listener Cart - bisa dipanggil dari thread kamera, render selalu di UI thread"""
+    event_log.emit('cart', action=event, key=key, qty=cart.qty(key), cart_total=cart.total_price)
+    # Render QR total baru di background supaya BAYAR langsung tampil
+    payment_qr.prepare(cart.total_price)
+    if event == 'clear':
+        app.after(0, render_cart_all)
+    else:
+        app.after(0, render_cart_line, key)
+
+cart.subscribe(on_cart_change)
+render_cart_all()
+
 # ===== UI UPDATE LOOP =====
 qr_payment_active = False
 
 def refresh_ui():
     global qr_payment_active
+    t0 = time.perf_counter()
     
     with state_lock:
-        # Update cart display
-        cart_box.delete("0.0", "end")
-        total_price = 0
-        total_items = 0
-        
-        # Calculate total items and price from cart
-        cart_dict = dict(cart)  # Create a snapshot of cart
-        
-        if len(cart_dict) == 0:
-            cart_box.insert("0.0", "Keranjang kosong\nLetakkan produk di depan kamera", "empty")
-            cart_box.tag_config("empty", foreground=COLORS["text_tertiary"])
-        else:
-            for item, qty in sorted(cart_dict.items()):
-                info = PRODUCTS.get(item, {"nama": item, "harga": 0})
-                subtotal = info["harga"] * qty
-                total_price += subtotal
-                total_items += qty
-                print(f"[CART] {item}: qty={qty}, total_items={total_items}")  # DEBUG
-                
-                # Format rapi: Barang........................x1                    Rp1000000
-                nama = info['nama'][:16]
-                qty_str = f"x{qty}"
-                harga_str = f"Rp{subtotal:,}"
-                
-                # Hitung dots antara nama dan qty
-                total_width = 40  # Total width yang diinginkan sebelum qty
-                dots_needed = max(1, total_width - len(nama) - len(qty_str))
-                dots = "." * dots_needed
-                
-                text = f"{nama}{dots}{qty_str}  {harga_str}\n"
-                cart_box.insert("end", text)
-        
-        print(f"[REFRESH] total_items={total_items}, cart={cart_dict}")  # DEBUG
+        # Total berjalan dari Cart - tidak dihitung ulang per refresh
+        total_price = cart.total_price
+        total_items = cart.total_items
         
         # Update metrics
         metric_items.configure(text=str(total_items))
@@ -1934,7 +1884,7 @@ def refresh_ui():
         
         kpi_revenue.configure(text=f"Rp {total_revenue:,.0f}")
         kpi_transactions.configure(text=str(total_trans))
-        print(f"[KPI] total_trans={total_trans}, items_sold=539")  # DEBUG
+        kasir_metrics.log('DEBUG', 'KPI', f"total_trans={total_trans}, items_sold=539", every=50)
         kpi_items.configure(text="539")  # Items Sold = 539
     
     # Update FPS only if worker is running
@@ -1950,22 +1900,72 @@ def refresh_ui():
             status_text.configure(text="✅ Payment Complete - QR Ready for Scanning")
             status_indicator.configure(text_color=COLORS["accent_pass"])
         else:
-            status_text.configure(text=f"🛒 {sum(cart.values())} items ready - Click BAYAR to pay")
+            status_text.configure(text=f"🛒 {cart.total_items} items ready - Click BAYAR to pay")
             status_indicator.configure(text_color=COLORS["accent_info"])
     except Exception as e:
         print(f"UI update error: {e}")
     
+    kasir_metrics.observe('refresh_ui', time.perf_counter() - t0)
     app.after(200, refresh_ui)
 
+def reload_catalog():
+    """Hot reload katalog - perubahan harga/nama langsung berlaku tanpa restart"""
+    try:
+        added = catalog.reload_if_changed()
+        if added is not None:
+            print(f"[CATALOG] ✓ Reloaded {CATALOG_FILE} ({len(catalog)} produk, {len(added)} baru)")
+            if added:
+                load_stock()
+            # Produk baru / harga baru juga masuk ke tabel stock
+            stock_index.rebuild()
+            stock_category_menu.configure(values=["Semua"] + stock_index.categories())
+            apply_stock_filter()
+            # Harga baru berlaku juga untuk cart yang belum dibayar
+            if not qr_payment_active and cart.reprice():
+                print("[CATALOG] Cart repriced")
+    except Exception as e:
+        print(f"[CATALOG] Reload error: {e}")
+    app.after(CATALOG_RELOAD_MS, reload_catalog)
+
 def on_closing():
     global worker
     if worker is not None:
         worker.stop()
         time.sleep(0.2)
+    if barcode_scanner is not None:
+        barcode_scanner.stop()
+    if vision_detector is not None:
+        vision_detector.close()
+    # Sebelum join thread apa pun: callback thread yang selesai tidak lagi memanggil Tk
+    app_closing.set()
+    if profiler is not None and profiler.is_alive():
+        profiler.stop()
+        profiler.join(2)
+    payment_qr.stop()
+    # Tunggu transaksi yang masih antre (simpan + kirim backend) - worker tunggal, jadi
+    # penanda ini selesai setelah semua transaksi sebelumnya
+    try:
+        transaction_pool.submit(lambda: None).result(timeout=TRANSACTION_CLOSE_TIMEOUT)
+    except FutureTimeout:
+        kasir_metrics.log('WARNING', 'DB', f"Transaksi antre belum selesai setelah {TRANSACTION_CLOSE_TIMEOUT} s")
+    transaction_pool.shutdown(wait=False)
+    # Flush terakhir mutasi stock yang belum tersimpan
+    stock_writer.on_change = None
+    stock_writer.close()
+    if snapshot_writer is not None:
+        snapshot_writer.close()
+    if metrics_dumper is not None:
+        metrics_dumper.stop()
+    event_log.emit('stop', transactions=stats["total"])
+    event_log.close()
     app.destroy()
 
 # Start camera worker automatically
 start_worker()
+if PROFILE_ON_START_SEC:
+    start_profiling(PROFILE_ON_START_SEC)
+app.after(CATALOG_RELOAD_MS, reload_catalog)
+app.bind_all("<Key>", on_key_press)
 
 app.protocol("WM_DELETE_WINDOW", on_closing)
 app.mainloop()
\ No newline at end of file
@@ -3,13 +3,26 @@ OWNER MONITORING SYSTEM - INTEGRATED WITH KASIR
 Dashboard untuk monitoring penjualan real-time dari kasir_ui_advanced.py
 """
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, jsonify, render_template, request
 from flask_cors import CORS
 import sqlite3
 import json
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, date, MINYEAR, MAXYEAR
+from collections import OrderedDict
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+import base64
+import hashlib
+import queue
+import threading
+import time
 import logging
 import os
+from pathlib import Path
+
+from kasir_schema import init_schema
 
 # Inisialisasi Flask
 app = Flask(__name__, static_folder='static', template_folder='templates')
@@ -22,19 +35,99 @@ CORS(app, resources={r"/api/*": {"origins": "*"}})
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    import sales_analytics
+except ImportError as e:
+    # pyarrow/numpy opsional - endpoint analytics dimatikan
+    sales_analytics = None
+    logger.warning(f"Analytics tidak aktif: {e}")
+
 # Database
 DB_PATH = 'kasir_data.db'
+READ_CACHE_SIZE_KB = 16384  # PRAGMA cache_size per koneksi baca (KiB)
+READ_MMAP_SIZE = 256 * 1024 * 1024  # PRAGMA mmap_size (byte)
+WRITE_TIMEOUT = 10  # detik - tunggu lock file jika kasir sedang menulis
+
+# Multi-toko: satu file SQLite per toko, mis. STORE_DATABASES="1=toko_1.db,2=toko_2.db"
+# Kosong = mode satu toko (DB_PATH)
+STORE_DATABASES = {
+    int(store_id): path
+    for store_id, path in (
+        pair.split('=', 1) for pair in os.environ.get('STORE_DATABASES', '').split(',') if '=' in pair
+    )
+}
+SHARD_WORKERS = 8
+
+# Response cache
+CACHE_TTL = 30  # detik - batas umur entry walau belum ada transaksi baru
+CACHE_MAX_ENTRIES = 256
+
+# Live feed (SSE)
+STREAM_POLL_INTERVAL = 1.0  # detik - cek transaksi baru dari proses kasir
+STREAM_HEARTBEAT = 15  # detik - komentar keep-alive agar proxy tidak memutus koneksi
+STREAM_QUEUE_SIZE = 100
+
+# Analytics jangka panjang (Parquet)
+ANALYTICS_DIR = 'kasir_analytics'
+ANALYTICS_REFRESH = 300  # detik - interval export inkremental SQLite -> Parquet
+
+# Export laporan
+EXPORT_FETCH_SIZE = 2000  # baris per fetchmany
+
+# Listing transaksi
+PAGE_MAX_LIMIT = 1000
+TRANSACTION_FIELDS = ('id', 'timestamp', 'time', 'items_count', 'total', 'payment', 'items')
+DEFAULT_TRANSACTION_FIELDS = ('id', 'time', 'items_count', 'total', 'payment', 'items')
 
 # ========================
 # HELPER FUNCTIONS
 # ========================
 
-def get_db_connection():
-    """Koneksi ke database"""
-    conn = sqlite3.connect(DB_PATH)
+_local = threading.local()
+_write_lock = threading.Lock()
+_write_conn = None
+
+def get_read_connection(path=None):
+    """Koneksi baca read-only yang dipakai ulang per thread worker (jangan di-close).
+
+    Dibuka sekali per thread (dan per file database) dengan mode=ro + query_only,
+    cache halaman besar dan mmap, jadi request berikutnya tidak membayar open
+    file / parse schema lagi.
+    """
+    path = path or DB_PATH
+    conns = getattr(_local, 'read_conns', None)
+    if conns is None:
+        conns = _local.read_conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = conns[path] = open_read_connection(path)
+    return conn
+
+def open_read_connection(path=None):
+    """Buka koneksi read-only baru (mode=ro, query_only, cache besar, mmap)"""
+    uri = Path(path or DB_PATH).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA cache_size = -{READ_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {READ_MMAP_SIZE}")
     return conn
 
+def execute_write(sql, params=()):
+    """Jalankan satu perintah tulis lewat koneksi writer tunggal (serialized), return lastrowid"""
+    global _write_conn
+    with _write_lock:
+        if _write_conn is None:
+            _write_conn = sqlite3.connect(DB_PATH, timeout=WRITE_TIMEOUT, check_same_thread=False)
+            init_schema(_write_conn)
+        try:
+            cursor = _write_conn.execute(sql, params)
+            _write_conn.commit()
+        except Exception:
+            _write_conn.rollback()
+            raise
+        return cursor.lastrowid
+
 def parse_items_from_json(items_json):
     """Parse items dari JSON string"""
     try:
@@ -42,6 +135,563 @@ def parse_items_from_json(items_json):
     except:
         return {}
 
+def item_qty(item_data):
+    """Qty satu item - kasir menyimpan {nama: qty}, API manual {nama: {qty, price}}"""
+    if isinstance(item_data, dict):
+        return item_data.get('qty', 1)
+    return int(item_data or 0)
+
+def format_transaction(row, fields=None):
+    """Format satu baris transaksi untuk response API (opsional hanya kolom `fields`)"""
+    fields = fields or DEFAULT_TRANSACTION_FIELDS
+    # Parse JSON items hanya jika memang diminta
+    items = None
+    if 'items' in fields or 'items_count' in fields:
+        items = parse_items_from_json(row['items'])
+
+    data = {}
+    for field in fields:
+        if field == 'id':
+            data['id'] = row['id']
+        elif field == 'timestamp':
+            data['timestamp'] = row['timestamp']
+        elif field == 'time':
+            data['time'] = row['timestamp'][11:16]
+        elif field == 'items_count':
+            data['items_count'] = len(items)
+        elif field == 'total':
+            data['total'] = float(row['total'])
+        elif field == 'payment':
+            data['payment'] = row['payment_method']
+        elif field == 'items':
+            data['items'] = items
+    return data
+
+def encode_cursor(row):
+    """Cursor keyset (timestamp, id) dalam bentuk token opaque"""
+    raw = f"{row['timestamp']}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token):
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+    timestamp, trans_id = raw.rsplit('|', 1)
+    return timestamp, int(trans_id)
+
+def parse_date_range(args):
+    """Rentang ?start=YYYY-MM-DD&end=YYYY-MM-DD (end default hari ini, start default end)"""
+    end = date.fromisoformat(args['end']) if args.get('end') else date.today()
+    start = date.fromisoformat(args['start']) if args.get('start') else end
+    if end < start:
+        raise ValueError('end harus >= start')
+    return start, end
+
+def _int_arg(args, name, default=None):
+    """?name sebagai int; nilai tidak valid -> ValueError (bukan diam-diam default)"""
+    value = args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} harus bilangan bulat")
+
+def parse_page_args(args, default_limit=None):
+    """Validasi ?limit, ?cursor, ?since, ?fields"""
+    limit = _int_arg(args, 'limit', default_limit)
+    if limit is not None and not (1 <= limit <= PAGE_MAX_LIMIT):
+        raise ValueError(f"limit harus 1..{PAGE_MAX_LIMIT}")
+
+    cursor = args.get('cursor') or None
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except Exception:
+            raise ValueError('cursor tidak valid')
+
+    since = _int_arg(args, 'since')
+    if since is not None and cursor:
+        raise ValueError('cursor dan since tidak bisa dipakai bersamaan')
+
+    fields = None
+    if args.get('fields'):
+        fields = tuple(f.strip() for f in args['fields'].split(',') if f.strip())
+        unknown = [f for f in fields if f not in TRANSACTION_FIELDS]
+        if unknown:
+            raise ValueError(f"field tidak dikenal: {', '.join(unknown)}")
+
+    return {
+        'limit': limit,
+        'cursor': cursor,
+        'since': since,
+        'fields': fields
+    }
+
+def query_transactions(start, end, limit=None, cursor=None, since=None, fields=None):
+    """Listing transaksi dengan keyset pagination.
+
+    Tanpa `since`: urut terbaru dulu, halaman berikutnya lewat `cursor`.
+    Dengan `since` (id): hanya transaksi id > since, urut naik - untuk fetch inkremental.
+    Return (transactions, next_cursor); next_cursor None jika sudah halaman terakhir.
+    """
+    # Range string ISO bisa memakai index timestamp, DATE(timestamp) selalu full scan
+    params = [start.isoformat(), (end + timedelta(days=1)).isoformat()]
+    where = ["timestamp >= ?", "timestamp < ?"]
+
+    if since is not None:
+        where.append("id > ?")
+        params.append(since)
+        order = "id ASC"
+    else:
+        if cursor:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            where.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([cursor_ts, cursor_ts, cursor_id])
+        order = "timestamp DESC, id DESC"
+
+    sql = f'''
+        SELECT id, timestamp, items, total, payment_method
+        FROM transactions
+        WHERE {' AND '.join(where)}
+        ORDER BY {order}
+    '''
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)  # +1 untuk tahu apakah masih ada halaman berikutnya
+
+    rows = get_read_connection().execute(sql, params).fetchall()
+
+    has_more = limit is not None and len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        # Mode since: client melanjutkan dengan since=<id terakhir>
+        next_cursor = str(rows[-1]['id']) if since is not None else encode_cursor(rows[-1])
+
+    return [format_transaction(row, fields) for row in rows], next_cursor
+
+def get_data_version():
+    """Versi data transaksi (nilai AUTOINCREMENT terakhir), berubah setiap ada INSERT.
+
+    Kasir menulis langsung ke file SQLite dari proses lain, jadi invalidasi
+    in-process saja tidak cukup - versi dibaca dari sqlite_sequence (O(1)).
+    Dengan multi-toko, versi adalah gabungan versi setiap file toko.
+    """
+    versions = []
+    for path in [DB_PATH] + [p for p in STORE_DATABASES.values() if p != DB_PATH]:
+        try:
+            row = get_read_connection(path).execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'transactions'"
+            ).fetchone()
+            versions.append(row['seq'] if row else 0)
+        except sqlite3.Error:
+            versions.append(None)
+    return versions[0] if len(versions) == 1 else tuple(versions)
+
+# ========================
+# RESPONSE CACHE
+# ========================
+
+class ResponseCache:
+    """Cache LRU + TTL untuk response GET, di-invalidate saat ada transaksi baru"""
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        with self._lock:
+            if version != self._version:
+                # Data berubah - semua entry lama tidak berlaku
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry['created'] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, version, body, mimetype):
+        with self._lock:
+            if version != self._version:
+                return None
+            entry = {
+                'body': body,
+                'mimetype': mimetype,
+                'etag': hashlib.sha1(body).hexdigest(),
+                'created': time.monotonic()
+            }
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+response_cache = ResponseCache()
+
+def cached_response(view):
+    """Decorator cache untuk endpoint GET, lengkap dengan ETag / If-None-Match"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = get_data_version()
+        if version is None:
+            return view(*args, **kwargs)
+
+        # Tanggal ikut jadi key karena endpoint menghitung relatif terhadap hari ini
+        params = '&'.join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+        key = (request.path, params, date.today().isoformat())
+
+        entry = response_cache.get(key, version)
+        cache_status = 'HIT'
+        if entry is None:
+            cache_status = 'MISS'
+            resp = app.make_response(view(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+            entry = response_cache.set(key, version, resp.get_data(), resp.mimetype)
+            if entry is None:
+                return resp
+
+        resp = app.response_class(entry['body'], status=200, mimetype=entry['mimetype'])
+        resp.set_etag(entry['etag'])
+        resp.headers['Cache-Control'] = 'no-cache'
+        resp.headers['X-Cache'] = cache_status
+        return resp.make_conditional(request)
+    return wrapper
+
+# ========================
+# LIVE FEED
+# ========================
+
+class LiveFeed:
+    """Broadcast transaksi baru dan delta KPI hari ini ke semua client SSE.
+
+    Satu thread background memantau versi data; query hanya dijalankan saat
+    ada transaksi baru, berapapun jumlah dashboard yang terhubung.
+    """
+
+    def __init__(self, poll_interval=STREAM_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._version = None
+        self._last_id = None
+        self._kpi = None
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def notify(self):
+        """Bangunkan thread feed segera (dipanggil setelah INSERT di proses ini)"""
+        self._wakeup.set()
+
+    def snapshot(self):
+        """KPI hari ini saat ini"""
+        with self._lock:
+            if self._kpi is None or self._kpi['date'] != date.today().isoformat():
+                self._load_baseline()
+            return dict(self._kpi)
+
+    def _load_baseline(self):
+        today = date.today().isoformat()
+        cursor = get_read_connection().cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) AS last_id FROM transactions")
+        self._last_id = cursor.fetchone()['last_id']
+        cursor.execute('''
+            SELECT items, total FROM transactions WHERE DATE(timestamp) = ?
+        ''', (today,))
+        kpi = {'date': today, 'transactions_today': 0, 'sales_today': 0.0, 'items_today': 0}
+        for row in cursor.fetchall():
+            kpi['transactions_today'] += 1
+            kpi['sales_today'] += float(row['total'] or 0)
+            kpi['items_today'] += sum(item_qty(v) for v in parse_items_from_json(row['items']).values())
+        self._kpi = kpi
+
+    def _publish(self, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait((event, data))
+            except queue.Full:
+                # Client terlalu lambat - event dilewati, snapshot berikutnya menyusul
+                pass
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                self._check()
+            except Exception as e:
+                logger.error(f"Live feed error: {str(e)}")
+
+    def _check(self):
+        version = get_data_version()
+        if version is None or version == self._version:
+            return
+        self.snapshot()
+
+        rows = get_read_connection().execute('''
+            SELECT id, timestamp, items, total, payment_method
+            FROM transactions
+            WHERE id > ?
+            ORDER BY id
+        ''', (self._last_id,)).fetchall()
+        # Versi dicatat setelah query berhasil - jika gagal, versi ini dicoba lagi di poll berikutnya
+        self._version = version
+        if not rows:
+            return
+
+        delta = {'transactions': 0, 'sales': 0.0, 'items': 0}
+        new_transactions = []
+        with self._lock:
+            today = self._kpi['date']
+            for row in rows:
+                self._last_id = row['id']
+                if row['timestamp'][:10] != today:
+                    continue
+                tx = format_transaction(row)
+                new_transactions.append(tx)
+                delta['transactions'] += 1
+                delta['sales'] += tx['total']
+                delta['items'] += sum(item_qty(v) for v in tx['items'].values())
+            self._kpi['transactions_today'] += delta['transactions']
+            self._kpi['sales_today'] += delta['sales']
+            self._kpi['items_today'] += delta['items']
+            kpi = dict(self._kpi)
+
+        for tx in new_transactions:
+            self._publish('transaction', tx)
+        if new_transactions:
+            self._publish('kpi', dict(kpi, delta=delta))
+
+live_feed = LiveFeed()
+
+# ========================
+# EXPORT
+# ========================
+
+EXPORT_COLUMNS = ['id', 'timestamp', 'total', 'payment_method', 'status', 'items_count']
+EXPORT_LINE_COLUMNS = ['transaction_id', 'timestamp', 'payment_method', 'status',
+                       'transaction_total', 'product', 'qty', 'price']
+
+def iter_export_rows(start, end):
+    """Stream baris transaksi untuk rentang tanggal per potongan EXPORT_FETCH_SIZE.
+
+    Setiap potongan query ulang dengan keyset (timestamp, id) dan dibaca habis
+    sebelum di-yield, jadi read transaction tidak tetap terbuka selama menunggu
+    client lambat - kasir tetap bisa menulis transaksi selama export berjalan.
+    """
+    conn = open_read_connection()
+    try:
+        params = (start.isoformat(), (end + timedelta(days=1)).isoformat())
+        rows = conn.execute('''
+            SELECT id, timestamp, items, total, payment_method, status
+            FROM transactions
+            WHERE timestamp >= ? AND timestamp < ?
+            ORDER BY timestamp, id
+            LIMIT ?
+        ''', params + (EXPORT_FETCH_SIZE,)).fetchall()
+        while rows:
+            yield rows
+            if len(rows) < EXPORT_FETCH_SIZE:
+                break
+            last = rows[-1]
+            rows = conn.execute('''
+                SELECT id, timestamp, items, total, payment_method, status
+                FROM transactions
+                WHERE timestamp < ? AND (timestamp > ? OR (timestamp = ? AND id > ?))
+                ORDER BY timestamp, id
+                LIMIT ?
+            ''', (params[1], last['timestamp'], last['timestamp'], last['id'], EXPORT_FETCH_SIZE)).fetchall()
+    finally:
+        conn.close()
+
+def export_line_items(items):
+    """(product, qty, price) per item - price kosong jika tidak tersimpan"""
+    for name, item_data in items.items():
+        price = item_data.get('price', '') if isinstance(item_data, dict) else ''
+        yield name, item_qty(item_data), price
+
+def generate_csv_export(start, end, with_lines):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM supaya Excel membaca UTF-8 dengan benar
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_LINE_COLUMNS if with_lines else EXPORT_COLUMNS)
+    # Header langsung dikirim: rentang tanpa transaksi tetap CSV valid berisi nama kolom
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for rows in iter_export_rows(start, end):
+        for row in rows:
+            items = parse_items_from_json(row['items'])
+            if with_lines:
+                for product, qty, price in export_line_items(items):
+                    writer.writerow([row['id'], row['timestamp'], row['payment_method'], row['status'],
+                                     row['total'], product, qty, price])
+            else:
+                writer.writerow([row['id'], row['timestamp'], row['total'], row['payment_method'],
+                                 row['status'], len(items)])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def generate_jsonl_export(start, end, with_lines):
+    for rows in iter_export_rows(start, end):
+        chunk = []
+        for row in rows:
+            items = parse_items_from_json(row['items'])
+            record = {
+                'id': row['id'],
+                'timestamp': row['timestamp'],
+                'total': row['total'],
+                'payment_method': row['payment_method'],
+                'status': row['status'],
+                'items_count': len(items)
+            }
+            if with_lines:
+                record['items'] = [
+                    {'product': product, 'qty': qty, 'price': price if price != '' else None}
+                    for product, qty, price in export_line_items(items)
+                ]
+            chunk.append(json.dumps(record, ensure_ascii=False))
+        yield '\n'.join(chunk) + '\n'
+
+def sse_event(event, data):
+    """Format satu event Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# ========================
+# MULTI-TOKO (SHARD)
+# ========================
+
+_shard_pool = None
+
+def get_shard_pool():
+    """Thread pool untuk query paralel ke file database tiap toko.
+
+    sqlite3 melepas GIL selama query berjalan, jadi thread cukup - tidak perlu
+    proses terpisah. Thread pool dipakai ulang agar koneksi per thread awet.
+    """
+    global _shard_pool
+    if _shard_pool is None:
+        _shard_pool = ThreadPoolExecutor(max_workers=SHARD_WORKERS, thread_name_prefix='shard')
+    return _shard_pool
+
+def store_shards():
+    """{store_id: path} - mode satu toko memakai DB_PATH"""
+    return STORE_DATABASES or {None: DB_PATH}
+
+def shard_dashboard(store_id, path, today, start_7days):
+    """Ringkasan hari ini + 7 hari untuk satu file toko, lengkap per kasir"""
+    conn = get_read_connection(path)
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(transactions)")}
+    cashier_col = 'cashier_id' if 'cashier_id' in columns else 'NULL'
+    day_start, day_end = today.isoformat(), (today + timedelta(days=1)).isoformat()
+
+    summary = {
+        'store_id': store_id,
+        'transactions_today': 0,
+        'sales_today': 0.0,
+        'items_today': 0,
+        'sales_7days': 0.0,
+        'cashiers': []
+    }
+    cashiers = {}
+    for row in conn.execute(f'''
+        SELECT {cashier_col} AS cashier_id, items, total
+        FROM transactions
+        WHERE timestamp >= ? AND timestamp < ?
+    ''', (day_start, day_end)):
+        total = float(row['total'] or 0)
+        qty = sum(item_qty(v) for v in parse_items_from_json(row['items']).values())
+        summary['transactions_today'] += 1
+        summary['sales_today'] += total
+        summary['items_today'] += qty
+        cashier = cashiers.setdefault(row['cashier_id'], {
+            'cashier_id': row['cashier_id'], 'transactions': 0, 'sales': 0.0, 'items': 0
+        })
+        cashier['transactions'] += 1
+        cashier['sales'] += total
+        cashier['items'] += qty
+
+    row = conn.execute('''
+        SELECT COALESCE(SUM(total), 0) AS total FROM transactions
+        WHERE timestamp >= ? AND timestamp < ?
+    ''', (start_7days.isoformat(), day_end)).fetchone()
+    summary['sales_7days'] = float(row['total'])
+    summary['cashiers'] = sorted(cashiers.values(), key=lambda c: (c['cashier_id'] is None, c['cashier_id']))
+    return summary
+
+# ========================
+# ANALYTICS
+# ========================
+
+class AnalyticsRefresher:
+    """Export inkremental SQLite -> Parquet di thread background setiap `interval` detik.
+
+    Endpoint analytics hanya membaca partisi yang sudah diekspor, jadi request
+    tidak pernah menunggu export. Thread dimulai saat laporan pertama diminta.
+    """
+
+    def __init__(self, interval=ANALYTICS_REFRESH):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="AnalyticsRefresher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                started = time.perf_counter()
+                days = sales_analytics.export_partitions(DB_PATH, ANALYTICS_DIR)
+                # Response analytics di-cache per versi SQLite, bukan per isi partisi
+                response_cache.invalidate()
+                logger.info(f"Analytics: {days} partisi diekspor ({time.perf_counter() - started:.2f} s)")
+            except Exception as e:
+                logger.error(f"Analytics export error: {str(e)}")
+            time.sleep(self.interval)
+
+analytics = sales_analytics.SalesAnalytics(ANALYTICS_DIR) if sales_analytics else None
+analytics_refresher = AnalyticsRefresher()
+
 # ========================
 # ROUTES
 # ========================
@@ -61,11 +711,12 @@ def health():
     return jsonify({'status': 'ok'}), 200
 
 @app.route('/api/dashboard', methods=['GET'])
+@cached_response
 def dashboard():
     """Dashboard ringkasan"""
     try:
         today = date.today().isoformat()
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         # Hitung hari ini
@@ -102,8 +753,6 @@ def dashboard():
         
         sales_7days = cursor.fetchone()['total'] or 0
         
-        conn.close()
-        
         return jsonify({
             'success': True,
             'data': {
@@ -119,53 +768,103 @@ def dashboard():
         logger.error(f"Error: {str(e)}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/stores/dashboard', methods=['GET'])
+@cached_response
+def stores_dashboard():
+    """Ringkasan semua toko dalam satu request (query paralel per file toko)"""
+    try:
+        today = date.today()
+        start_7days = today - timedelta(days=6)
+        shards = store_shards()
+        futures = {
+            store_id: get_shard_pool().submit(shard_dashboard, store_id, path, today, start_7days)
+            for store_id, path in shards.items()
+        }
+
+        stores = []
+        errors = []
+        total = {'transactions_today': 0, 'sales_today': 0.0, 'items_today': 0, 'sales_7days': 0.0}
+        for store_id, future in futures.items():
+            try:
+                summary = future.result()
+            except Exception as e:
+                # Satu toko bermasalah tidak menggagalkan ringkasan toko lain
+                logger.error(f"Shard toko {store_id} error: {str(e)}")
+                errors.append({'store_id': store_id, 'message': str(e)})
+                continue
+            stores.append(summary)
+            for key in total:
+                total[key] += summary[key]
+
+        total['avg_transaction'] = (total['sales_today'] / total['transactions_today']
+                                    if total['transactions_today'] else 0)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'date': today.isoformat(),
+                'total': total,
+                'stores': stores,
+                'errors': errors
+            }
+        }), 200
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @app.route('/api/today', methods=['GET'])
+@cached_response
 def get_today_sales():
-    """Transaksi hari ini"""
+    """Transaksi hari ini (opsional ?limit, ?cursor, ?since, ?fields)"""
     try:
-        today = date.today().isoformat()
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, timestamp, items, total, payment_method
-            FROM transactions
-            WHERE DATE(timestamp) = ?
-            ORDER BY timestamp DESC
-        ''', (today,))
-        
-        transactions = []
-        for row in cursor.fetchall():
-            items = parse_items_from_json(row['items'])
-            num_items = len(items)
-            
-            transactions.append({
-                'id': row['id'],
-                'time': row['timestamp'][11:16],
-                'items_count': num_items,
-                'total': float(row['total']),
-                'payment': row['payment_method'],
-                'items': items
-            })
+        page = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        today = date.today()
+        transactions, next_cursor = query_transactions(today, today, **page)
         
-        conn.close()
+        return jsonify({
+            'success': True,
+            'data': transactions,
+            'next_cursor': next_cursor
+        }), 200
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/transactions', methods=['GET'])
+@cached_response
+def list_transactions():
+    """Transaksi untuk rentang tanggal ?start&end, dengan keyset pagination"""
+    try:
+        start, end = parse_date_range(request.args)
+        page = parse_page_args(request.args, default_limit=100)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        transactions, next_cursor = query_transactions(start, end, **page)
         
         return jsonify({
             'success': True,
-            'data': transactions
+            'data': transactions,
+            'next_cursor': next_cursor
         }), 200
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @app.route('/api/chart-7days', methods=['GET'])
+@cached_response
 def chart_7days():
     """Grafik penjualan 7 hari"""
     try:
         end_date = date.today()
         start_date = end_date - timedelta(days=6)
         
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         # Data untuk setiap hari
@@ -187,8 +886,6 @@ def chart_7days():
                 'transactions': row['trans_count']
             })
         
-        conn.close()
-        
         return jsonify({
             'success': True,
             'data': chart_data
@@ -197,12 +894,36 @@ def chart_7days():
         logger.error(f"Error: {str(e)}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/stream', methods=['GET'])
+def stream():
+    """Live feed transaksi & KPI (Server-Sent Events)"""
+    q = live_feed.subscribe()
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            yield sse_event('kpi', live_feed.snapshot())
+            while True:
+                try:
+                    event, data = q.get(timeout=STREAM_HEARTBEAT)
+                    yield sse_event(event, data)
+                except queue.Empty:
+                    yield ": ping\n\n"
+        finally:
+            live_feed.unsubscribe(q)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/payment-method', methods=['GET'])
+@cached_response
 def payment_method():
     """Breakdown metode pembayaran"""
     try:
         today = date.today().isoformat()
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -223,8 +944,6 @@ def payment_method():
                 'total': float(row['total'])
             })
         
-        conn.close()
-        
         return jsonify({
             'success': True,
             'data': methods
@@ -234,11 +953,12 @@ def payment_method():
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @app.route('/api/top-products', methods=['GET'])
+@cached_response
 def top_products():
     """Produk terlaris hari ini"""
     try:
         today = date.today().isoformat()
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -273,7 +993,47 @@ def top_products():
             for name, info in sorted_products
         ]
         
-        conn.close()
+        return jsonify({
+            'success': True,
+            'data': data
+        }), 200
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/analytics/<report>', methods=['GET'])
+@cached_response
+def analytics_report(report):
+    """Laporan jangka panjang: monthly, products, hourly (?start&end) atau yoy (?year)"""
+    if analytics is None:
+        return jsonify({'success': False, 'message': 'Analytics butuh pyarrow & numpy'}), 501
+    if report not in ('monthly', 'products', 'hourly', 'yoy'):
+        return jsonify({'success': False, 'message': 'Laporan tidak dikenal'}), 404
+
+    try:
+        status = request.args.get('status')
+        year = _int_arg(request.args, 'year', date.today().year)
+        # yoy juga membaca year - 1
+        if not (MINYEAR < year <= MAXYEAR):
+            raise ValueError(f"year harus {MINYEAR + 1}..{MAXYEAR}")
+        limit = _int_arg(request.args, 'limit')
+        if limit is not None and limit < 1:
+            raise ValueError('limit harus >= 1')
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else None
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        analytics_refresher.ensure_started()
+        if report == 'monthly':
+            data = analytics.monthly(start, end, status)
+        elif report == 'products':
+            data = analytics.per_product(start, end, status, limit=limit)
+        elif report == 'hourly':
+            data = analytics.per_hour(start, end, status)
+        else:
+            data = analytics.year_over_year(year, status)
         
         return jsonify({
             'success': True,
@@ -283,6 +1043,30 @@ def top_products():
         logger.error(f"Error: {str(e)}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/export', methods=['GET'])
+def export_transactions():
+    """Export transaksi ?start&end sebagai CSV / JSONL (streaming, ?lines=1 untuk per item)"""
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    fmt = request.args.get('format', 'csv')
+    with_lines = request.args.get('lines', '0') in ('1', 'true', 'yes')
+    if fmt == 'csv':
+        body, mimetype = generate_csv_export(start, end, with_lines), 'text/csv'
+    elif fmt == 'jsonl':
+        body, mimetype = generate_jsonl_export(start, end, with_lines), 'application/x-ndjson'
+    else:
+        return jsonify({'success': False, 'message': 'format harus csv atau jsonl'}), 400
+
+    filename = f"transaksi_{start.isoformat()}_{end.isoformat()}{'_items' if with_lines else ''}.{fmt}"
+    return Response(body, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/add-transaction', methods=['POST'])
 def add_transaction():
     """Tambah transaksi manual"""
@@ -296,21 +1080,18 @@ def add_transaction():
         if not items or total <= 0:
             return jsonify({'success': False, 'message': 'Data tidak valid'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         timestamp = datetime.now().isoformat()
         items_json = json.dumps(items)
         
-        cursor.execute('''
+        trans_id = execute_write('''
             INSERT INTO transactions 
-            (timestamp, items, total, payment_method, status)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (timestamp, items_json, total, payment, 'COMPLETED'))
+            (timestamp, items, total, payment_method, status, store_id, cashier_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (timestamp, items_json, total, payment, 'COMPLETED',
+              data.get('store_id'), data.get('cashier_id')))
         
-        conn.commit()
-        trans_id = cursor.lastrowid
-        conn.close()
+        response_cache.invalidate()
+        live_feed.notify()
         
         logger.info(f"Transaksi #{trans_id} ditambahkan: Rp {total:,}")
         
@@ -346,11 +1127,17 @@ if __name__ == '__main__':
     print(f"\n📡 API Endpoints:")
     print(f"   GET  /api/health - Status server")
     print(f"   GET  /api/dashboard - Ringkasan dashboard")
+    print(f"   GET  /api/stores/dashboard - Ringkasan semua toko & kasir")
     print(f"   GET  /api/today - Transaksi hari ini")
+    print(f"   GET  /api/transactions - Transaksi per rentang tanggal (paginated)")
     print(f"   GET  /api/chart-7days - Grafik 7 hari")
     print(f"   GET  /api/payment-method - Metode pembayaran")
     print(f"   GET  /api/top-products - Produk terlaris")
+    print(f"   GET  /api/stream - Live feed transaksi (SSE)")
+    print(f"   GET  /api/export - Export CSV/JSONL per rentang tanggal")
+    print(f"   GET  /api/analytics/<monthly|products|hourly|yoy> - Laporan jangka panjang")
     print(f"   POST /api/add-transaction - Tambah transaksi")
+    print(f"\n⚠️  Flask dev server - untuk produksi: python serve_monitoring.py")
     print("="*70 + "\n")
     
     app.run(host='0.0.0.0', port=5000, debug=False)
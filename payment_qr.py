@@ -0,0 +1,126 @@
+"""
+PAYMENT QR
+Render QR pembayaran di thread background. Matrix QR (qrcode) digambar
+langsung dengan NumPy ke buffer PPM - tanpa PIL, tanpa resize - yang bisa
+dipakai tk.PhotoImage(data=...) di UI thread dalam ~1 ms.
+
+QR untuk total cart saat ini sudah dirender lebih dulu (prepare() dipanggil
+setiap cart berubah), jadi saat BAYAR ditekan QR biasanya langsung dari cache.
+
+    payment_qr = PaymentQR(size=280)
+    payment_qr.start()
+    payment_qr.prepare(total)                 # cart berubah
+    ppm = payment_qr.get(total)               # BAYAR: cache atau None
+    payment_qr.request(total, callback)       # cache kosong: callback(total, ppm) dari thread QR
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import qrcode
+
+import kasir_metrics
+
+def payment_payload(total, ts):
+    return f"Minimarket|Total:{total}|Waktu:{int(ts)}"
+
+def qr_matrix(data, border=1):
+    """Matrix modul QR (bool, True = hitam) termasuk quiet zone"""
+    qr = qrcode.QRCode(version=1, border=border)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return np.array(qr.get_matrix(), dtype=bool)
+
+def render_ppm(matrix, size, fg=(0, 0, 0), bg=(255, 255, 255)):
+    """Matrix -> bytes PPM (P6) size x size. Skala integer per modul supaya tepi tajam dan mudah discan."""
+    n = matrix.shape[0]
+    scale = max(1, size // n)
+    modules = np.repeat(np.repeat(matrix, scale, axis=0), scale, axis=1)
+    image = np.empty((size, size, 3), dtype=np.uint8)
+    image[:] = bg
+    offset = max(0, (size - n * scale) // 2)
+    end = min(size, offset + n * scale)
+    # Palet [bg, fg] diindeks dengan matrix sebagai 0/1 (view bool -> uint8, tanpa copy)
+    palette = np.array([bg, fg], dtype=np.uint8)
+    image[offset:end, offset:end] = palette[modules[:end - offset, :end - offset].view(np.uint8)]
+    return b'P6 %d %d 255\n' % (size, size) + image.tobytes()
+
+class PaymentQR(threading.Thread):
+    """Thread render QR + cache {total: (waktu, ppm)}"""
+
+    def __init__(self, size=280, max_age=60.0, capacity=8):
+        super().__init__(name="PaymentQR", daemon=True)
+        self.size = size
+        self.max_age = max_age  # QR dengan "Waktu" lebih lama dari ini dirender ulang
+        self.capacity = capacity
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._requests = []
+        self._prepare = None
+        self._running = True
+
+    def get(self, total):
+        """PPM yang sudah dirender untuk total ini (masih segar), atau None"""
+        with self._lock:
+            entry = self._cache.get(total)
+            if entry is None or time.time() - entry[0] > self.max_age:
+                kasir_metrics.inc('qr_cache_misses')
+                return None
+            self._cache.move_to_end(total)
+        kasir_metrics.inc('qr_cache_hits')
+        return entry[1]
+
+    def prepare(self, total):
+        """Render QR untuk total di background (hanya permintaan terakhir yang dikerjakan)"""
+        if total > 0:
+            with self._lock:
+                self._prepare = total
+            self._wake.set()
+
+    def request(self, total, callback):
+        """Render sekarang; callback(total, ppm) dipanggil dari thread QR (ppm None jika gagal)"""
+        with self._lock:
+            self._requests.append((total, callback))
+        self._wake.set()
+
+    def run(self):
+        while self._running:
+            self._wake.wait()
+            self._wake.clear()
+            while True:
+                with self._lock:
+                    if self._requests:
+                        total, callback = self._requests.pop(0)
+                    elif self._prepare is not None:
+                        total, callback = self._prepare, None
+                        self._prepare = None
+                        entry = self._cache.get(total)
+                        if entry is not None and time.time() - entry[0] < self.max_age / 2:
+                            continue  # Masih segar di cache
+                    else:
+                        break
+                ppm = self._render(total)
+                if callback is not None:
+                    callback(total, ppm)
+
+    def _render(self, total):
+        try:
+            ts = time.time()
+            with kasir_metrics.timer('qr_render'):
+                ppm = render_ppm(qr_matrix(payment_payload(total, ts)), self.size)
+        except Exception as e:
+            kasir_metrics.log('ERROR', 'QR', f"Gagal membuat QR: {e}")
+            return None
+        with self._lock:
+            self._cache[total] = (ts, ppm)
+            self._cache.move_to_end(total)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+        return ppm
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
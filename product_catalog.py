@@ -0,0 +1,134 @@
+"""
+PRODUCT CATALOG
+Katalog produk dari file CSV (key,nama,harga,stock,kategori,barcode) dengan
+lookup terindeks: key -> Product (dict), barcode -> Product (dict) dan class id
+detector -> Product (list), serta hot reload perubahan harga tanpa restart kasir.
+"""
+
+import csv
+import os
+import threading
+
+class Product:
+    """Satu produk katalog - __slots__ supaya ribuan SKU tetap hemat memori"""
+    __slots__ = ('key', 'nama', 'harga', 'stock', 'kategori', 'barcodes')
+
+    def __init__(self, key, nama, harga, stock=0, kategori="Lainnya", barcodes=()):
+        self.key = key
+        self.nama = nama
+        self.harga = harga
+        self.stock = stock
+        self.kategori = kategori
+        self.barcodes = tuple(barcodes)
+
+    def __repr__(self):
+        return f"Product({self.key!r}, {self.nama!r}, harga={self.harga}, stock={self.stock})"
+
+def read_catalog_file(path):
+    """Baca CSV katalog -> {key: Product}"""
+    products = {}
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            key = row['key'].strip().lower()
+            if not key:
+                continue
+            products[key] = Product(
+                key,
+                row.get('nama') or key,
+                int(float(row.get('harga') or 0)),
+                int(float(row.get('stock') or 0)),
+                row.get('kategori') or "Lainnya",
+                # Satu produk bisa punya beberapa barcode, dipisah '|'
+                [code.strip() for code in (row.get('barcode') or '').split('|') if code.strip()]
+            )
+    return products
+
+class ProductCatalog:
+    """Katalog produk dengan lookup O(1) untuk key dan class id detector"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._products = {}
+        self._class_names = []
+        self._by_class = []
+        self._by_barcode = {}
+        self._mtime = None
+        self.reload()
+
+    def __len__(self):
+        return len(self._products)
+
+    def __contains__(self, key):
+        return key in self._products
+
+    def __iter__(self):
+        return iter(self._products.values())
+
+    def get(self, key, default=None):
+        return self._products.get(key, default)
+
+    def items(self):
+        return self._products.items()
+
+    def bind_classes(self, names):
+        """Bangun array class id -> Product dari nama kelas model (dict atau list)"""
+        if isinstance(names, dict):
+            size = max(names) + 1 if names else 0
+            class_names = [names.get(i, '') for i in range(size)]
+        else:
+            class_names = list(names)
+        with self._lock:
+            self._class_names = [str(n).lower() for n in class_names]
+            self._rebind()
+
+    def _rebind(self):
+        # List baru diganti sekaligus - thread deteksi tidak pernah melihat array setengah jadi
+        self._by_class = [self._products.get(name) for name in self._class_names]
+
+    def by_class_id(self, cls):
+        """Product untuk class id detector, None jika kelas tidak dijual"""
+        by_class = self._by_class
+        return by_class[cls] if 0 <= cls < len(by_class) else None
+
+    def by_barcode(self, code):
+        """Product untuk barcode hasil scan, None jika tidak terdaftar"""
+        return self._by_barcode.get(code)
+
+    def reload(self):
+        """Muat ulang file katalog.
+
+        Produk yang sudah ada diperbarui in-place (nama, harga, kategori, barcode) sehingga
+        referensi yang dipegang cart/UI ikut berubah; stock tidak disentuh karena
+        dikelola ledger. Return list key produk baru.
+        """
+        mtime = os.path.getmtime(self.path)
+        loaded = read_catalog_file(self.path)
+        with self._lock:
+            added = []
+            products = dict(self._products)
+            for key, product in loaded.items():
+                current = products.get(key)
+                if current is None:
+                    products[key] = product
+                    added.append(key)
+                else:
+                    current.nama = product.nama
+                    current.harga = product.harga
+                    current.kategori = product.kategori
+                    current.barcodes = product.barcodes
+            self._products = products
+            self._by_barcode = {code: p for p in products.values() for code in p.barcodes}
+            self._mtime = mtime
+            self._rebind()
+        return added
+
+    def reload_if_changed(self):
+        """Reload jika file katalog berubah sejak dimuat. Return list key produk baru, None jika tidak berubah"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+        if mtime == self._mtime:
+            return None
+        return self.reload()
@@ -0,0 +1,380 @@
+"""
+SALES ANALYTICS ENGINE - COLUMNAR EXPORT & REPORTING
+Export tabel transactions (SQLite) ke partisi Parquet per hari, lalu hitung
+laporan jangka panjang (bulanan, per produk, per jam, year-over-year)
+dengan kernel NumPy/Arrow tanpa parse JSON per baris.
+
+Layout output:
+    <root>/transactions/date=YYYY-MM-DD/part-0.parquet
+        id, ts, month, hour, total, items_count, payment_method, status
+    <root>/items/date=YYYY-MM-DD/part-0.parquet
+        transaction_id, product, qty, price, month, hour, status
+
+Pemakaian:
+    pip install pyarrow numpy
+    python sales_analytics.py export                 # inkremental
+    python sales_analytics.py export --force         # tulis ulang semua partisi
+    python sales_analytics.py report --year 2026
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+DB_PATH = 'kasir_data.db'
+ANALYTICS_DIR = 'kasir_analytics'
+FETCH_CHUNK = 5000
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # Batas partisi yang disimpan di memori SalesAnalytics
+COMPRESSION = 'zstd'
+
+TRANSACTION_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('ts', pa.timestamp('s')),
+    ('month', pa.int32()),  # year * 12 + (month - 1)
+    ('hour', pa.int8()),
+    ('total', pa.float64()),
+    ('items_count', pa.int32()),
+    ('payment_method', pa.string()),
+    ('status', pa.string()),
+])
+
+ITEM_SCHEMA = pa.schema([
+    ('transaction_id', pa.int64()),
+    ('product', pa.string()),
+    ('qty', pa.int32()),
+    ('price', pa.float64()),  # NaN jika harga tidak tersimpan (format kasir {nama: qty})
+    ('month', pa.int32()),
+    ('hour', pa.int8()),
+    ('status', pa.string()),
+])
+
+# ========================
+# EXPORT
+# ========================
+
+def _month_index(dt):
+    return dt.year * 12 + dt.month - 1
+
+def _split_items(items_json):
+    """(product, qty, price) dari JSON items - mendukung {nama: qty} dan {nama: {qty, price}}"""
+    try:
+        items = json.loads(items_json) if items_json else {}
+    except ValueError:
+        return []
+    lines = []
+    for name, data in items.items():
+        if isinstance(data, dict):
+            # Item manual bisa menyimpan "qty"/"price": null
+            qty, price = data.get('qty'), data.get('price')
+            lines.append((name, int(qty if qty is not None else 1), float(price if price is not None else 'nan')))
+        else:
+            lines.append((name, int(data or 0), float('nan')))
+    return lines
+
+class _DayBuffer:
+    """Kolom untuk satu hari transaksi, di-flush ke partisi saat hari berganti"""
+
+    def __init__(self, day):
+        self.day = day
+        self.trans = {name: [] for name in TRANSACTION_SCHEMA.names}
+        self.items = {name: [] for name in ITEM_SCHEMA.names}
+
+    def add(self, row):
+        trans_id, timestamp, items_json, total, payment, status = row
+        ts = datetime.fromisoformat(timestamp)
+        month, hour = _month_index(ts), ts.hour
+        lines = _split_items(items_json)
+
+        t = self.trans
+        t['id'].append(trans_id)
+        t['ts'].append(ts.replace(microsecond=0))
+        t['month'].append(month)
+        t['hour'].append(hour)
+        t['total'].append(float(total or 0))
+        t['items_count'].append(len(lines))
+        t['payment_method'].append(payment)
+        t['status'].append(status)
+
+        it = self.items
+        for product, qty, price in lines:
+            it['transaction_id'].append(trans_id)
+            it['product'].append(product)
+            it['qty'].append(qty)
+            it['price'].append(price)
+            it['month'].append(month)
+            it['hour'].append(hour)
+            it['status'].append(status)
+
+    def flush(self, root):
+        _write_partition(root, 'transactions', self.day, pa.table(self.trans, schema=TRANSACTION_SCHEMA))
+        _write_partition(root, 'items', self.day, pa.table(self.items, schema=ITEM_SCHEMA))
+
+def _partition_dir(root, table_name, day):
+    return os.path.join(root, table_name, f"date={day}")
+
+def _write_partition(root, table_name, day, table):
+    """Tulis partisi secara atomik: file sementara lalu os.replace"""
+    part_dir = _partition_dir(root, table_name, day)
+    os.makedirs(part_dir, exist_ok=True)
+    target = os.path.join(part_dir, 'part-0.parquet')
+    # Nama sementara unik - beberapa worker bisa mengekspor hari yang sama bersamaan
+    fd, tmp = tempfile.mkstemp(prefix='part-0.', suffix='.tmp', dir=part_dir)
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp, compression=COMPRESSION)
+        os.replace(tmp, target)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+def exported_days(root=ANALYTICS_DIR, table_name='transactions'):
+    """Tanggal partisi yang sudah ada (urut)"""
+    base = os.path.join(root, table_name)
+    if not os.path.isdir(base):
+        return []
+    return sorted(name[5:] for name in os.listdir(base) if name.startswith('date='))
+
+def export_partitions(db_path=DB_PATH, root=ANALYTICS_DIR, start=None, end=None, force=False):
+    """Stream transaksi SQLite ke partisi Parquet per hari.
+
+    Tanpa `force`, export dilanjutkan dari partisi terakhir yang sudah ada
+    (hari itu ditulis ulang karena mungkin masih bertambah). Memori yang
+    dipakai hanya sebesar satu hari transaksi. Return jumlah hari yang ditulis.
+    """
+    if force and start is None and os.path.isdir(root):
+        shutil.rmtree(root)
+    if start is None and not force:
+        days = exported_days(root)
+        start = date.fromisoformat(days[-1]) if days else None
+
+    where, params = [], []
+    if start is not None:
+        where.append("timestamp >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        where.append("timestamp < ?")
+        params.append((end + timedelta(days=1)).isoformat())
+    # Keyset (timestamp, id) per potongan: setiap query dibaca habis sebelum partisi
+    # ditulis, jadi read lock tidak ditahan selama menulis Parquet (kasir tetap bisa INSERT)
+    keyset = where + ["(timestamp > ? OR (timestamp = ? AND id > ?))"]
+    columns = "SELECT id, timestamp, items, total, payment_method, status FROM transactions"
+
+    conn = sqlite3.connect(db_path)
+    written = 0
+    buffer = None
+    last = None
+    try:
+        while True:
+            clauses, args = (where, params) if last is None else (keyset, params + [last[1], last[1], last[0]])
+            sql = columns + (" WHERE " + " AND ".join(clauses) if clauses else "")
+            rows = conn.execute(sql + " ORDER BY timestamp, id LIMIT ?", args + [FETCH_CHUNK]).fetchall()
+            if not rows:
+                break
+            last = rows[-1]
+            for row in rows:
+                day = row[1][:10]
+                if buffer is None or buffer.day != day:
+                    if buffer is not None:
+                        buffer.flush(root)
+                        written += 1
+                    buffer = _DayBuffer(day)
+                buffer.add(row)
+        if buffer is not None:
+            buffer.flush(root)
+            written += 1
+    finally:
+        conn.close()
+    return written
+
+# ========================
+# QUERY ENGINE
+# ========================
+
+class SalesAnalytics:
+    """Laporan penjualan dari partisi Parquet dengan kernel vektor NumPy.
+
+    Partisi yang sudah dibaca disimpan di memori (di-invalidate lewat mtime
+    file), sehingga laporan berikutnya pada rentang yang sama tidak membaca
+    ulang file - biaya utama export harian adalah overhead per file. Cache
+    LRU dibatasi max_bytes; laporan multi-tahun membuang partisi terlama.
+    """
+
+    def __init__(self, root=ANALYTICS_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._partitions = OrderedDict()  # (tabel, hari) -> (mtime, table), terlama dipakai di depan
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def _load_partition(self, table_name, day):
+        path = os.path.join(_partition_dir(self.root, table_name, day), 'part-0.parquet')
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        key = (table_name, day)
+        with self._lock:
+            cached = self._partitions.get(key)
+            if cached is not None and cached[0] == mtime:
+                self._partitions.move_to_end(key)
+                return cached[1]
+        table = pq.read_table(path)
+        with self._lock:
+            old = self._partitions.pop(key, None)
+            if old is not None:
+                self._cached_bytes -= old[1].nbytes
+            self._partitions[key] = (mtime, table)
+            self._cached_bytes += table.nbytes
+            while self._cached_bytes > self.max_bytes and len(self._partitions) > 1:
+                _, (_, evicted) = self._partitions.popitem(last=False)
+                self._cached_bytes -= evicted.nbytes
+        return table
+
+    def _read(self, table_name, columns, start=None, end=None, status=None):
+        days = exported_days(self.root, table_name)
+        # Filter di kolom partisi - partisi di luar rentang tidak dibaca sama sekali
+        if start is not None:
+            days = [d for d in days if d >= start.isoformat()]
+        if end is not None:
+            days = [d for d in days if d <= end.isoformat()]
+
+        schema = TRANSACTION_SCHEMA if table_name == 'transactions' else ITEM_SCHEMA
+        tables = [t for t in (self._load_partition(table_name, d) for d in days) if t is not None]
+        if not tables:
+            return schema.empty_table().select(columns)
+        table = pa.concat_tables(tables)
+        if status is not None:
+            table = table.filter(pc.equal(table.column('status'), status))
+        return table.select(columns)
+
+    def monthly(self, start=None, end=None, status=None):
+        """Revenue & jumlah transaksi per bulan"""
+        t = self._read('transactions', ['month', 'total'], start, end, status)
+        if t.num_rows == 0:
+            return []
+        month = t.column('month').to_numpy()
+        total = t.column('total').to_numpy()
+        first = int(month.min())
+        idx = month - first
+        revenue = np.bincount(idx, weights=total)
+        count = np.bincount(idx)
+        return [
+            {
+                'month': f"{(first + i) // 12:04d}-{(first + i) % 12 + 1:02d}",
+                'sales': float(revenue[i]),
+                'transactions': int(count[i])
+            }
+            for i in range(len(count)) if count[i]
+        ]
+
+    def per_product(self, start=None, end=None, status=None, limit=None):
+        """Qty & revenue per produk (revenue hanya dari item yang harganya tersimpan)"""
+        t = self._read('items', ['product', 'qty', 'price'], start, end, status)
+        if t.num_rows == 0:
+            return []
+        encoded = pc.dictionary_encode(t.column('product').combine_chunks())
+        codes = encoded.indices.to_numpy()
+        names = encoded.dictionary.to_pylist()
+        qty = t.column('qty').to_numpy()
+        price = t.column('price').to_numpy()
+        qty_sum = np.bincount(codes, weights=qty, minlength=len(names))
+        revenue = np.bincount(codes, weights=np.nan_to_num(price * qty), minlength=len(names))
+        order = np.argsort(-qty_sum, kind='stable')
+        if limit:
+            order = order[:limit]
+        return [
+            {'name': names[i], 'qty': int(qty_sum[i]), 'total': float(revenue[i])}
+            for i in order
+        ]
+
+    def per_hour(self, start=None, end=None, status=None):
+        """Revenue & jumlah transaksi per jam (0-23)"""
+        t = self._read('transactions', ['hour', 'total'], start, end, status)
+        hour = t.column('hour').to_numpy().astype(np.intp)
+        total = t.column('total').to_numpy()
+        revenue = np.bincount(hour, weights=total, minlength=24)
+        count = np.bincount(hour, minlength=24)
+        return [
+            {'hour': h, 'sales': float(revenue[h]), 'transactions': int(count[h])}
+            for h in range(24)
+        ]
+
+    def year_over_year(self, year, status=None):
+        """Perbandingan bulanan `year` vs `year - 1`"""
+        rows = self.monthly(date(year - 1, 1, 1), date(year, 12, 31), status)
+        by_month = {r['month']: r for r in rows}
+        result = []
+        for m in range(1, 13):
+            current = by_month.get(f"{year:04d}-{m:02d}", {'sales': 0.0, 'transactions': 0})
+            previous = by_month.get(f"{year - 1:04d}-{m:02d}", {'sales': 0.0, 'transactions': 0})
+            growth = ((current['sales'] - previous['sales']) / previous['sales'] * 100
+                      if previous['sales'] else None)
+            result.append({
+                'month': m,
+                'sales': current['sales'],
+                'sales_prev': previous['sales'],
+                'transactions': current['transactions'],
+                'transactions_prev': previous['transactions'],
+                'growth_pct': growth
+            })
+        return result
+
+# ========================
+# CLI
+# ========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Export & laporan analitik penjualan")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--root', default=ANALYTICS_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    exp = sub.add_parser('export', help="Export transaksi ke partisi Parquet")
+    exp.add_argument('--force', action='store_true', help="Tulis ulang semua partisi")
+
+    rep = sub.add_parser('report', help="Laporan year-over-year, produk & jam")
+    rep.add_argument('--year', type=int, default=date.today().year)
+    rep.add_argument('--status', default=None, help="Filter status, mis. COMPLETED")
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        started = time.perf_counter()
+        days = export_partitions(args.db, args.root, force=args.force)
+        print(f"✓ {days} partisi hari ditulis ke {args.root} ({time.perf_counter() - started:.2f} s)")
+        return
+
+    analytics = SalesAnalytics(args.root)
+    started = time.perf_counter()
+    yoy = analytics.year_over_year(args.year, args.status)
+    year_start, year_end = date(args.year, 1, 1), date(args.year, 12, 31)
+    products = analytics.per_product(year_start, year_end, args.status, limit=10)
+    hours = analytics.per_hour(year_start, year_end, args.status)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n📊 Year-over-Year {args.year} vs {args.year - 1}")
+    print("=" * 60)
+    for r in yoy:
+        growth = f"{r['growth_pct']:+.1f}%" if r['growth_pct'] is not None else "-"
+        print(f"{r['month']:>2}  Rp {r['sales']:>15,.0f}  Rp {r['sales_prev']:>15,.0f}  {growth:>8}")
+    print(f"\n⭐ Top produk {args.year}")
+    for p in products:
+        print(f"   {p['name'][:20]:<20} {p['qty']:>8} pcs")
+    busiest = max(hours, key=lambda h: h['transactions'])
+    print(f"\n🕒 Jam tersibuk: {busiest['hour']:02d}:00 ({busiest['transactions']} transaksi)")
+    print(f"\n✓ Laporan dihitung dalam {elapsed * 1000:.0f} ms\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+OWNER MONITORING SYSTEM - PRODUCTION SERVER
+Menjalankan monitoring_app.py di WSGI server produksi (bukan Flask dev server)
+
+Pemakaian:
+    pip install waitress            (Windows / Linux)
+    pip install gunicorn            (Linux, multi-proses)
+
+    python serve_monitoring.py                         # auto: gunicorn jika ada, selain itu waitress
+    python serve_monitoring.py --server waitress --threads 16
+    python serve_monitoring.py --server gunicorn --workers 4 --threads 8
+
+Catatan:
+    - Setiap koneksi /api/stream (SSE) memegang satu thread selama dashboard
+      terbuka, jadi --threads harus lebih besar dari jumlah dashboard aktif.
+    - Koneksi SQLite baca dibuat per thread di dalam worker (setelah fork),
+      sehingga tidak ada koneksi yang dibagi antar proses.
+"""
+
+import argparse
+import os
+import platform
+
+from monitoring_app import app, logger
+
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 5000
+DEFAULT_THREADS = 16
+
+def default_workers():
+    """Jumlah proses worker default: (2 x CPU) + 1, dibatasi 8"""
+    return min((os.cpu_count() or 1) * 2 + 1, 8)
+
+def serve_waitress(host, port, threads):
+    """Waitress - satu proses, banyak thread, jalan di Windows"""
+    from waitress import serve
+
+    logger.info(f"Waitress: http://{host}:{port} ({threads} threads)")
+    serve(app, host=host, port=port, threads=threads,
+          channel_timeout=120, ident='monitoring')
+
+def serve_gunicorn(host, port, workers, threads):
+    """Gunicorn - beberapa proses worker gthread (Linux/macOS)"""
+    from gunicorn.app.base import BaseApplication
+
+    class MonitoringApplication(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    options = {
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': threads,
+        # SSE menahan koneksi lama - jangan dianggap worker hang
+        'timeout': 0,
+        'keepalive': 5,
+        'accesslog': None,
+    }
+    logger.info(f"Gunicorn: http://{host}:{port} ({workers} workers x {threads} threads)")
+    MonitoringApplication(app, options).run()
+
+def pick_server():
+    """gunicorn jika tersedia dan bukan Windows, selain itu waitress"""
+    if platform.system() != 'Windows':
+        try:
+            import gunicorn  # noqa: F401
+            return 'gunicorn'
+        except ImportError:
+            pass
+    return 'waitress'
+
+def main():
+    parser = argparse.ArgumentParser(description="Production server untuk Owner Monitoring")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--server', choices=['auto', 'waitress', 'gunicorn'], default='auto')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help="Jumlah proses (gunicorn saja)")
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help="Thread per proses")
+    args = parser.parse_args()
+
+    server = pick_server() if args.server == 'auto' else args.server
+    if server == 'gunicorn':
+        serve_gunicorn(args.host, args.port, args.workers, args.threads)
+    else:
+        serve_waitress(args.host, args.port, args.threads)
+
+if __name__ == '__main__':
+    main()
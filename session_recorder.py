@@ -0,0 +1,132 @@
+"""
+SESSION RECORDER
+Rekam sesi kamera (frame + timestamp) untuk diputar ulang tanpa hardware.
+
+Format dipilih dari ekstensi file:
+    .mp4 / .avi - video terkompresi (cv2.VideoWriter), kecil tapi lossy
+    .frames     - frame mentah BGR berurutan, dibaca lewat numpy memmap (lossless)
+Metadata (ukuran frame, fps, timestamp per frame) disimpan di <path>.json.
+
+Pemakaian:
+    python session_recorder.py --source 0 --out sessions/pagi.frames --seconds 30
+"""
+
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi')
+
+def meta_path(path):
+    return path + '.json'
+
+class SessionRecorder:
+    """Tulis frame ke file sesi; close() wajib dipanggil untuk menyimpan metadata"""
+
+    def __init__(self, path, fps=30.0):
+        self.path = path
+        self.fps = fps
+        self.timestamps = []
+        self.shape = None
+        self._raw = None
+        self._video = None
+        self._start = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    @property
+    def is_video(self):
+        return self.path.lower().endswith(VIDEO_EXTENSIONS)
+
+    def write(self, frame, timestamp=None):
+        now = time.time() if timestamp is None else timestamp
+        if self._start is None:
+            self._start = now
+            self.shape = frame.shape
+            if self.is_video:
+                fourcc = cv2.VideoWriter_fourcc(*('mp4v' if self.path.lower().endswith('.mp4') else 'MJPG'))
+                self._video = cv2.VideoWriter(self.path, fourcc, self.fps, (frame.shape[1], frame.shape[0]))
+            else:
+                self._raw = open(self.path, 'wb')
+        if frame.shape != self.shape:
+            frame = cv2.resize(frame, (self.shape[1], self.shape[0]))
+        if self._video is not None:
+            self._video.write(frame)
+        else:
+            self._raw.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+        self.timestamps.append(round(now - self._start, 6))
+
+    def close(self):
+        if self._video is not None:
+            self._video.release()
+        if self._raw is not None:
+            self._raw.close()
+        with open(meta_path(self.path), 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': 'video' if self.is_video else 'raw',
+                'shape': list(self.shape) if self.shape else None,
+                'fps': self.fps,
+                'frames': len(self.timestamps),
+                'timestamps': self.timestamps
+            }, f)
+
+class SessionReader:
+    """Baca ulang sesi rekaman sebagai (timestamp, frame)"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(meta_path(path), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.timestamps = self.meta['timestamps']
+        self._frames = None
+        if self.meta['format'] == 'raw' and self.meta['frames']:
+            shape = (self.meta['frames'],) + tuple(self.meta['shape'])
+            self._frames = np.memmap(path, dtype=np.uint8, mode='r', shape=shape)
+
+    def __len__(self):
+        return self.meta['frames']
+
+    def __iter__(self):
+        if self.meta['format'] == 'raw':
+            for i, ts in enumerate(self.timestamps):
+                # Salin dari memmap - pipeline deteksi boleh menulis ke frame
+                yield ts, np.array(self._frames[i])
+            return
+        cap = cv2.VideoCapture(self.path)
+        try:
+            for ts in self.timestamps:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield ts, frame
+        finally:
+            cap.release()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rekam sesi kamera kasir")
+    parser.add_argument('--source', default='0', help="index kamera atau path video")
+    parser.add_argument('--out', required=True, help="file tujuan (.frames, .mp4 atau .avi)")
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--fps', type=float, default=30)
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    cap = cv2.VideoCapture(source)
+    recorder = SessionRecorder(args.out, args.fps)
+    deadline = time.time() + args.seconds
+    try:
+        while time.time() < deadline:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            recorder.write(frame)
+    finally:
+        cap.release()
+        recorder.close()
+    print(f"✓ {len(recorder.timestamps)} frame direkam ke {args.out}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+SNAPSHOT WRITER
+Simpan frame beranotasi sebagai bukti transaksi (sengketa) dan data
+retraining. capture() hanya memasukkan frame ke antrean (tanpa copy, tanpa
+encode) sehingga loop kamera tidak pernah menunggu; pool thread encoder
+menulis JPEG/WebP + sidecar JSON berisi deteksi dan metadata.
+
+    kasir_snapshots/2026-10-19/20261019_101530_123456_add.jpg
+    kasir_snapshots/2026-10-19/20261019_101530_123456_add.json
+
+Total ukuran snapshot dibatasi max_bytes: file terlama dihapus lebih dulu.
+"""
+
+import json
+import os
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+
+import cv2
+
+import kasir_metrics
+
+FORMATS = {'jpg': cv2.IMWRITE_JPEG_QUALITY, 'webp': cv2.IMWRITE_WEBP_QUALITY}
+
+class SnapshotWriter:
+    """Antrean snapshot + pool thread encoder dengan rotasi berdasarkan ukuran folder"""
+
+    def __init__(self, folder, fmt='jpg', quality=85, workers=2, queue_size=32, max_bytes=2 * 1024 ** 3):
+        self.folder = folder
+        self.fmt = fmt
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._files = deque()  # (path gambar, ukuran gambar + sidecar), terlama di kiri
+        self._total = 0
+        self._scan()
+        self._workers = [threading.Thread(target=self._run, name=f"SnapshotWriter-{i}", daemon=True)
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def _scan(self):
+        """Muat snapshot yang sudah ada supaya batas ukuran berlaku lintas restart"""
+        found = []
+        if os.path.isdir(self.folder):
+            for day in os.listdir(self.folder):
+                day_path = os.path.join(self.folder, day)
+                if not os.path.isdir(day_path):
+                    continue
+                for name in os.listdir(day_path):
+                    if name.endswith(('.jpg', '.webp')):
+                        path = os.path.join(day_path, name)
+                        found.append((name, path, self._size(path)))
+        found.sort()  # Nama file diawali timestamp -> urut waktu
+        self._files.extend((path, size) for _, path, size in found)
+        self._total = sum(size for _, _, size in found)
+
+    @staticmethod
+    def _size(image_path):
+        size = 0
+        for path in (image_path, os.path.splitext(image_path)[0] + '.json'):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def capture(self, frame, event, detections=(), **meta):
+        """Antrekan snapshot. Tidak blocking: jika antrean penuh snapshot dibuang.
+
+        frame tidak disalin - jangan ubah array setelah capture().
+        """
+        if frame is None:
+            return False
+        try:
+            self._queue.put_nowait((datetime.now(), frame, event, list(detections), meta))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            kasir_metrics.inc('snapshot_dropped')
+            return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                with kasir_metrics.timer('snapshot_write'):
+                    self._write(*item)
+            except Exception as e:
+                kasir_metrics.log('ERROR', 'SNAPSHOT', f"Gagal menyimpan snapshot: {e}")
+
+    def _write(self, ts, frame, event, detections, meta):
+        ok, encoded = cv2.imencode('.' + self.fmt, frame, [FORMATS[self.fmt], self.quality])
+        if not ok:
+            raise ValueError(f"encode {self.fmt} gagal")
+        day_folder = os.path.join(self.folder, ts.strftime('%Y-%m-%d'))
+        os.makedirs(day_folder, exist_ok=True)
+        base = os.path.join(day_folder, f"{ts.strftime('%Y%m%d_%H%M%S_%f')}_{event}")
+        image_path = f"{base}.{self.fmt}"
+        with open(image_path, 'wb') as f:
+            f.write(encoded.tobytes())
+
+        sidecar = {
+            'ts': ts.isoformat(),
+            'event': event,
+            'image': os.path.basename(image_path),
+            'shape': list(frame.shape),
+            'detections': [
+                {'name': d['name'], 'conf': round(float(d['conf']), 4), 'box': [int(v) for v in d['box']]}
+                for d in detections
+            ],
+            **meta
+        }
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(sidecar, f, ensure_ascii=False)
+
+        with self._lock:
+            size = self._size(image_path)
+            self._files.append((image_path, size))
+            self._total += size
+            self.written += 1
+            self._rotate()
+
+    def _rotate(self):
+        while self._total > self.max_bytes and len(self._files) > 1:
+            image_path, size = self._files.popleft()
+            self._total -= size
+            for path in (image_path, os.path.splitext(image_path)[0] + '.json'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            kasir_metrics.inc('snapshot_rotated')
+
+    def close(self, timeout=5):
+        """Tulis sisa antrean lalu hentikan worker"""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
@@ -48,6 +48,11 @@ self.addEventListener('fetch', (event) => {
         return;
     }
 
+    // Live feed (SSE) - biarkan browser yang menangani koneksi streaming
+    if (url.pathname === '/api/stream') {
+        return;
+    }
+
     // API calls - network first
     if (url.pathname.startsWith('/api/')) {
         event.respondWith(
@@ -0,0 +1,218 @@
+"""
+STOCK GRID
+Tabel stock tervirtualisasi untuk katalog besar: hanya baris yang terlihat
+yang punya widget, dan widget yang sama dipakai ulang saat scroll. Pencarian
+memakai indeks in-memory (teks pencarian dihitung sekali per produk).
+"""
+
+import customtkinter as ctk
+
+ROW_HEIGHT = 44
+
+class ProductIndex:
+    """Indeks pencarian produk: teks lowercase per produk + daftar per kategori.
+
+    Query yang memperpanjang query sebelumnya (user sedang mengetik) hanya
+    menyaring hasil sebelumnya, bukan seluruh katalog.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.rebuild()
+
+    def rebuild(self):
+        self._entries = []
+        self._by_category = {}
+        for product in sorted(self.catalog, key=lambda p: (p.kategori, p.nama)):
+            text = ' '.join((product.key, product.nama, product.kategori) + product.barcodes).lower()
+            self._entries.append((text, product))
+            self._by_category.setdefault(product.kategori, []).append((text, product))
+        self._last = None
+
+    def categories(self):
+        return sorted(self._by_category)
+
+    def search(self, query='', kategori=None):
+        """Produk yang cocok dengan semua kata di query (substring), opsional per kategori"""
+        query = query.strip().lower()
+        source = self._by_category.get(kategori, []) if kategori else self._entries
+        if self._last is not None:
+            last_query, last_kategori, last_result = self._last
+            if last_kategori == kategori and last_query and query.startswith(last_query):
+                source = last_result
+        terms = query.split()
+        result = [entry for entry in source if all(t in entry[0] for t in terms)] if terms else source
+        self._last = (query, kategori, result)
+        return [product for _, product in result]
+
+class _StockRow:
+    """Satu baris widget yang dipakai ulang untuk produk berbeda saat scroll"""
+
+    def __init__(self, grid, colors):
+        self.product = None
+        self.frame = ctk.CTkFrame(grid.body, corner_radius=0, border_width=0, height=ROW_HEIGHT)
+        self.frame.grid_propagate(False)
+        self.frame.grid_rowconfigure(0, weight=1)
+        for col, (weight, minsize) in enumerate(grid.COLUMNS):
+            self.frame.grid_columnconfigure(col, weight=weight, minsize=minsize)
+
+        self.name = ctk.CTkLabel(self.frame, text="", font=ctk.CTkFont(size=10, weight="bold"),
+                                 text_color=colors["text_primary"], anchor="w")
+        self.name.grid(row=0, column=0, sticky="w", padx=12)
+        self.category = ctk.CTkLabel(self.frame, text="", font=ctk.CTkFont(size=9, weight="bold"), anchor="w")
+        self.category.grid(row=0, column=1, sticky="w", padx=8)
+        self.price = ctk.CTkLabel(self.frame, text="", font=ctk.CTkFont(size=9, weight="bold"),
+                                  text_color=colors["accent_pass"], anchor="w")
+        self.price.grid(row=0, column=2, sticky="w", padx=8)
+        self.stock = ctk.CTkLabel(self.frame, text="", font=ctk.CTkFont(size=10, weight="bold"), anchor="w")
+        self.stock.grid(row=0, column=3, sticky="w", padx=8)
+
+        # Action buttons frame
+        action_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        action_frame.grid(row=0, column=4, sticky="ew", padx=8)
+        action_frame.grid_columnconfigure((0, 1), weight=1)
+        # Tombol kurang (-) / tambah (+) - produk dibaca saat klik, bukan di-capture per baris
+        ctk.CTkButton(action_frame, text="−", width=30, height=28,
+                      fg_color=colors["accent_secondary"],
+                      hover_color=colors["accent_secondary"][:-2] + "dd",
+                      text_color=colors["bg_primary"],
+                      font=ctk.CTkFont(size=14, weight="bold"),
+                      corner_radius=4,
+                      command=lambda: grid.adjust(self, -1)).grid(row=0, column=0, padx=2)
+        ctk.CTkButton(action_frame, text="+", width=30, height=28,
+                      fg_color=colors["accent_pass"],
+                      hover_color=colors["accent_pass"][:-2] + "dd",
+                      text_color=colors["bg_primary"],
+                      font=ctk.CTkFont(size=14, weight="bold"),
+                      corner_radius=4,
+                      command=lambda: grid.adjust(self, 1)).grid(row=0, column=1, padx=2)
+        self._shown = None
+
+class VirtualStockGrid(ctk.CTkFrame):
+    """Grid stock dengan pool widget sebanyak baris yang terlihat"""
+
+    COLUMNS = [(2, 150), (1, 80), (1, 100), (0, 80), (0, 110)]
+
+    def __init__(self, master, colors, icons, category_colors, on_adjust, **kwargs):
+        super().__init__(master, fg_color=colors["bg_tertiary"], corner_radius=0, **kwargs)
+        self.colors = colors
+        self.icons = icons
+        self.category_colors = category_colors
+        self.on_adjust = on_adjust
+        self._items = []
+        self._first = 0
+        self._rows = []
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.body = ctk.CTkFrame(self, fg_color=colors["bg_tertiary"], corner_radius=0)
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.body.bind("<Configure>", lambda e: self._layout())
+        self._bind_wheel(self.body)
+
+    # ----- data -----
+    def set_items(self, products):
+        """Ganti isi grid (mis. hasil pencarian) dan kembali ke atas"""
+        self._items = list(products)
+        self._first = 0
+        self._render()
+
+    def refresh_visible(self):
+        """Perbarui baris terlihat (setelah stock/harga berubah) - hanya label yang berubah"""
+        self._render()
+
+    def adjust(self, row, delta):
+        if row.product is not None:
+            self.on_adjust(row.product, delta)
+            self._render()
+
+    # ----- scrolling -----
+    def visible_rows(self):
+        return max(1, self.body.winfo_height() // ROW_HEIGHT)
+
+    def scroll_to(self, first):
+        first = max(0, min(first, len(self._items) - self.visible_rows()))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(value) * len(self._items)))
+        elif action == 'scroll':
+            step = int(value) * (self.visible_rows() if unit == 'pages' else 1)
+            self.scroll_to(self._first + step)
+
+    def _on_wheel(self, event):
+        if getattr(event, 'num', None) == 4:
+            step = -3
+        elif getattr(event, 'num', None) == 5:
+            step = 3
+        elif abs(event.delta) >= 120:
+            step = -3 * int(event.delta / 120)  # Windows
+        else:
+            step = -event.delta  # macOS
+        self.scroll_to(self._first + step)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel, add="+")
+        widget.bind("<Button-4>", self._on_wheel, add="+")
+        widget.bind("<Button-5>", self._on_wheel, add="+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    # ----- rendering -----
+    def _layout(self):
+        """Sesuaikan jumlah widget baris dengan tinggi area (dipanggil saat resize)"""
+        needed = self.visible_rows() + 1
+        while len(self._rows) < needed:
+            # Belum di-place: _render_row menampilkan baris hanya jika ada produknya
+            row = _StockRow(self, self.colors)
+            self._bind_wheel(row.frame)
+            self._rows.append(row)
+        self._render()
+
+    def _render(self):
+        for i, row in enumerate(self._rows):
+            self._render_row(row, self._first + i)
+        total = len(self._items)
+        if total:
+            self.scrollbar.set(self._first / total, min(1.0, (self._first + len(self._rows)) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _render_row(self, row, index):
+        if index >= len(self._items):
+            if row.product is not None:
+                row.product = None
+                row._shown = None
+                row.frame.place_forget()
+            return
+        product = self._items[index]
+        if row.product is None:
+            row.frame.place(x=0, y=self._rows.index(row) * ROW_HEIGHT, relwidth=1, height=ROW_HEIGHT)
+        row.product = product
+
+        # Alternating row colors (per baris data, stabil saat scroll)
+        row_bg = self.colors["bg_secondary"] if index % 2 == 0 else self.colors["bg_tertiary"]
+        stock_qty = product.stock
+        if stock_qty > 10:
+            stock_color = self.colors["accent_pass"]
+        elif stock_qty > 0:
+            stock_color = self.colors["accent_warning"]
+        else:
+            stock_color = self.colors["accent_secondary"]
+
+        shown = (product.key, product.nama, product.kategori, product.harga, stock_qty, row_bg)
+        if shown == row._shown:
+            return  # Tidak ada yang berubah - lewati configure
+        row._shown = shown
+        row.frame.configure(fg_color=row_bg)
+        row.name.configure(text=f"{self.icons.get(product.kategori, '📦')} {product.nama}", fg_color=row_bg)
+        row.category.configure(text=product.kategori, fg_color=row_bg,
+                               text_color=self.category_colors.get(product.kategori, self.colors["text_tertiary"]))
+        row.price.configure(text=f"Rp {product.harga:,}", fg_color=row_bg)
+        row.stock.configure(text=f"{stock_qty}", text_color=stock_color, fg_color=row_bg)
@@ -0,0 +1,315 @@
+"""
+STOCK LEDGER
+Stock disimpan sebagai mutasi append-only (stock_movements) di SQLite, dengan
+stock terkini per produk (stock_levels) yang diperbarui dalam transaksi yang
+sama. Setiap perubahan adalah satu transaksi SQLite - atomik, O(1) per item,
+dan beberapa kasir yang memakai file yang sama saling menambah mutasi, bukan
+saling menimpa.
+
+StockWriter menyimpan mutasi di thread background: klik +/- beruntun digabung
+(debounce) menjadi satu transaksi, UI langsung memakai stock di memori.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import kasir_metrics
+from kasir_schema import init_schema
+
+class StockLedger:
+    """Akses ledger stock untuk satu kasir"""
+
+    def __init__(self, db_path, store_id=None, cashier_id=None, timeout=10):
+        self.store_id = store_id
+        self.cashier_id = cashier_id
+        self._lock = threading.Lock()
+        # isolation_level=None: transaksi diatur manual dengan BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False,
+                                     isolation_level=None)
+        init_schema(self._conn)
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE - ambil write lock di awal supaya baca-lalu-tulis aman antar kasir"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+
+    def _apply_one(self, cursor, product, delta, reason, ref, timestamp):
+        row = cursor.execute("SELECT qty FROM stock_levels WHERE product = ?", (product,)).fetchone()
+        current = row[0] if row else 0
+        # Stock tidak pernah negatif - mutasi dicatat sebesar yang benar-benar diterapkan
+        applied = max(delta, -current)
+        if applied == 0 and row is not None:
+            return current
+        cursor.execute('''
+            INSERT INTO stock_movements (timestamp, product, delta, reason, ref, store_id, cashier_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (timestamp, product, applied, reason, ref, self.store_id, self.cashier_id))
+        cursor.execute('''
+            INSERT INTO stock_levels (product, qty, last_movement_id) VALUES (?, ?, ?)
+            ON CONFLICT(product) DO UPDATE SET qty = excluded.qty, last_movement_id = excluded.last_movement_id
+        ''', (product, current + applied, cursor.lastrowid))
+        return current + applied
+
+    def apply(self, deltas, reason, ref=None):
+        """Terapkan {produk: delta} dalam satu transaksi, return {produk: stock baru}"""
+        return self.apply_ops([('add', deltas, reason, ref)])
+
+    def set_levels(self, quantities, reason, ref=None):
+        """Set stock {produk: qty} (stock opname) - dicatat sebagai mutasi selisihnya"""
+        return self.apply_ops([('set', quantities, reason, ref)])
+
+    def apply_ops(self, ops):
+        """Terapkan beberapa operasi (mode 'add'/'set', {produk: nilai}, reason, ref)
+        berurutan dalam satu transaksi, return {produk: stock baru}"""
+        timestamp = datetime.now().isoformat()
+        levels = {}
+        with self._transaction() as cursor:
+            for mode, values, reason, ref in ops:
+                ref = None if ref is None else str(ref)
+                for product, value in values.items():
+                    delta = int(value)
+                    if mode == 'set':
+                        row = cursor.execute("SELECT qty FROM stock_levels WHERE product = ?", (product,)).fetchone()
+                        delta -= row[0] if row else 0
+                    levels[product] = self._apply_one(cursor, product, delta, reason, ref, timestamp)
+        return levels
+
+    def levels(self):
+        """Stock terkini {produk: qty} - dibaca dari stock_levels, bukan dari seluruh mutasi"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT product, qty FROM stock_levels").fetchall())
+
+    def seed(self, defaults, legacy_file=None):
+        """Isi stock awal untuk produk yang belum ada di ledger.
+
+        Saat ledger masih kosong, stock dari file JSON lama (produk_kasir.json)
+        diimpor sekali sebagai mutasi OPENING; produk lain memakai nilai default.
+        Return jumlah produk yang diisi.
+        """
+        initial = dict(defaults)
+        with self._transaction() as cursor:
+            existing = {row[0] for row in cursor.execute("SELECT product FROM stock_levels")}
+            if not existing and legacy_file and os.path.exists(legacy_file):
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    initial.update({k: v for k, v in json.load(f).items() if k in initial})
+            timestamp = datetime.now().isoformat()
+            missing = {k: v for k, v in initial.items() if k not in existing}
+            for product, qty in missing.items():
+                self._apply_one(cursor, product, int(qty), 'OPENING', None, timestamp)
+        return len(missing)
+
+    def rebuild_levels(self):
+        """Hitung ulang stock_levels dari seluruh mutasi (perbaikan jika tabel rusak/dihapus)"""
+        with self._transaction() as cursor:
+            cursor.execute("DELETE FROM stock_levels")
+            cursor.execute('''
+                INSERT INTO stock_levels (product, qty, last_movement_id)
+                SELECT product, SUM(delta), MAX(id) FROM stock_movements GROUP BY product
+            ''')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def read_stock_csv(path):
+    """Baca CSV terima barang / stock opname -> ({produk: tambah}, {produk: set}).
+
+    Kolom: key, qty (jumlah diterima, ditambahkan) dan/atau stock (jumlah
+    hasil hitung, menggantikan stock). Baris dengan stock terisi memakai set.
+    """
+    receive, counted = {}, {}
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            key = (row.get('key') or '').strip().lower()
+            if not key:
+                continue
+            if (row.get('stock') or '').strip():
+                counted[key] = int(float(row['stock']))
+            elif (row.get('qty') or '').strip():
+                receive[key] = receive.get(key, 0) + int(float(row['qty']))
+    return receive, counted
+
+class StockWriter(threading.Thread):
+    """Layanan simpan stock di background.
+
+    adjust() menggabungkan klik +/- per produk dan menulisnya setelah tidak ada
+    klik selama `delay` detik (paling lambat `max_delay`). submit() dan
+    set_quantities() (penjualan, terima barang, stock opname) ditulis secepatnya
+    dengan urutan terjaga. Semua method langsung memperbarui stock di memori dan
+    mengembalikannya, jadi UI tidak menunggu SQLite. Batch yang gagal ditulis
+    (mis. database is locked) dicoba ulang dengan backoff, tidak dibuang.
+    close() menjamin flush terakhir.
+    """
+
+    def __init__(self, ledger, on_change=None, delay=0.5, max_delay=2.0,
+                 retry_delay=1.0, max_retry_delay=30.0):
+        super().__init__(daemon=True)
+        self.ledger = ledger
+        self.on_change = on_change
+        self.delay = delay
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.writes = 0
+        self._cond = threading.Condition()
+        self._levels = ledger.levels()
+        self._pending = {}
+        self._pending_since = None
+        self._last_change = None
+        self._ops = []
+        self._retry_at = None
+        self._backoff = retry_delay
+        self._stopping = False
+
+    def levels(self):
+        """Stock di memori {produk: qty} - termasuk mutasi yang belum tersimpan"""
+        with self._cond:
+            return dict(self._levels)
+
+    def seed(self, defaults, legacy_file=None):
+        """StockLedger.seed lalu muat stock produk baru ke memori"""
+        seeded = self.ledger.seed(defaults, legacy_file)
+        with self._cond:
+            for product, qty in self.ledger.levels().items():
+                self._levels.setdefault(product, qty)
+        return seeded
+
+    def _add_local(self, deltas):
+        changed = {}
+        for product, delta in deltas.items():
+            current = self._levels.get(product, 0)
+            changed[product] = self._levels[product] = max(0, current + int(delta))
+        return changed
+
+    def adjust(self, deltas):
+        """Koreksi manual (ADJUST) yang digabung per produk sebelum ditulis"""
+        with self._cond:
+            before = {product: self._levels.get(product, 0) for product in deltas}
+            changed = self._add_local(deltas)
+            for product, qty in changed.items():
+                self._pending[product] = self._pending.get(product, 0) + qty - before[product]
+            now = time.monotonic()
+            if self._pending_since is None:
+                self._pending_since = now
+            self._last_change = now
+            self._cond.notify()
+        return changed
+
+    def _queue_pending(self):
+        if self._pending:
+            self._ops.append(('add', self._pending, 'ADJUST', None))
+            self._pending = {}
+            self._pending_since = None
+
+    def _enqueue(self, op):
+        # Klik yang sudah ada ditulis lebih dulu supaya urutan mutasi terjaga
+        self._queue_pending()
+        self._ops.append(op)
+        self._cond.notify()
+
+    def submit(self, deltas, reason, ref=None):
+        """Mutasi {produk: delta} yang ditulis secepatnya (mis. SALE, RECEIVE)"""
+        with self._cond:
+            changed = self._add_local(deltas)
+            self._enqueue(('add', dict(deltas), reason, ref))
+        return changed
+
+    def set_quantities(self, quantities, reason='COUNT', ref=None):
+        """Set stock {produk: qty} (stock opname), ditulis secepatnya"""
+        with self._cond:
+            changed = {product: max(0, int(qty)) for product, qty in quantities.items()}
+            self._levels.update(changed)
+            self._enqueue(('set', changed, reason, ref))
+        return changed
+
+    def run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    if self._ops:
+                        # Batch gagal menunggu backoff (saat stop langsung dicoba lagi)
+                        if self._stopping or self._retry_at is None or now >= self._retry_at:
+                            break
+                        self._cond.wait(self._retry_at - now)
+                    elif self._pending:
+                        due = min(self._last_change + self.delay, self._pending_since + self.max_delay)
+                        if self._stopping or now >= due:
+                            self._queue_pending()
+                            break
+                        self._cond.wait(due - now)
+                    elif self._stopping:
+                        return
+                    else:
+                        self._cond.wait()
+                ops, self._ops = self._ops, []
+            if not self._write(ops) and self._stopping:
+                return  # Percobaan terakhir dilakukan close()
+
+    def _write(self, ops):
+        """Tulis ops ke ledger. Jika gagal, ops dikembalikan ke depan antrean - return False"""
+        try:
+            with kasir_metrics.timer('stock_write'):
+                levels = self.ledger.apply_ops(ops)
+        except Exception as e:
+            kasir_metrics.inc('stock_write_errors')
+            with self._cond:
+                # Stock di memori tetap berisi mutasi ini; ditulis ulang setelah backoff
+                self._ops[:0] = ops
+                self._retry_at = time.monotonic() + self._backoff
+                kasir_metrics.log('ERROR', 'STOCK', f"Error saving stock: {e} - coba lagi dalam {self._backoff:.1f} s")
+                self._backoff = min(self._backoff * 2, self.max_retry_delay)
+            return False
+        with self._cond:
+            self._retry_at = None
+            self._backoff = self.retry_delay
+            # Stock ledger + klik yang masuk selama penulisan
+            for product, qty in levels.items():
+                self._levels[product] = max(0, qty + self._pending.get(product, 0))
+            self.writes += 1
+        if self.on_change is not None:
+            self.on_change(set(levels))
+        return True
+
+    def close(self, timeout=15):
+        """Stop thread setelah flush terakhir, lalu tutup ledger.
+
+        Return daftar ops yang tetap gagal ditulis (kosong jika semua tersimpan).
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self.is_alive():
+            self.join(timeout)
+        if self.is_alive():
+            # Masih menunggu SQLite - jangan tutup koneksi yang sedang dipakai
+            with self._cond:
+                failed = list(self._ops)
+            kasir_metrics.log('ERROR', 'STOCK', f"Stock writer belum selesai setelah {timeout} s")
+            return failed
+        with self._cond:
+            self._queue_pending()
+            ops, self._ops = self._ops, []
+        # Thread tidak pernah distart atau flush terakhir gagal - satu percobaan lagi
+        if ops and not self._write(ops):
+            with self._cond:
+                ops, self._ops = self._ops, []
+            kasir_metrics.log('ERROR', 'STOCK', f"{len(ops)} mutasi stock tidak tersimpan: {ops}")
+        else:
+            ops = []
+        self.ledger.close()
+        return ops
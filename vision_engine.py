@@ -0,0 +1,456 @@
+"""
+VISION ENGINE
+Deteksi produk YOLOv5, logika presence/cooldown yang memutuskan kapan
+deteksi menjadi item di cart, dan CameraEngine (loop kamera -> deteksi -> cart)
+dengan callback. Tidak bergantung pada Tkinter, sehingga bisa dipakai kasir,
+benchmark offline maupun runner headless (kasir_headless.py).
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import kasir_metrics
+
+VERBOSE = True  # Log deteksi (per frame di level DEBUG: KASIR_LOG_LEVEL=DEBUG), matikan untuk benchmark
+
+PRESENCE_FRAMES_REQUIRED = 2
+ABSENCE_FRAMES_REQUIRED = 8
+COOLDOWN_FRAMES = 600  # Frame tunggu sebelum item yang sama bisa ditambah lagi
+DETECT_EVERY = 3  # Jalankan model setiap 3 frame, frame lain memakai hasil terakhir
+
+def get_color(idx):
+    """Generate warna unik berdasarkan index"""
+    np.random.seed(idx)
+    return tuple(int(x) for x in np.random.randint(80, 255, 3))
+
+def load_model(name='yolov5n', conf=0.25, iou=0.45):
+    """Load model YOLOv5 dari torch hub, None jika gagal"""
+    try:
+        import torch
+        # Ganti ke yolov5n (Nano) - 5x lebih cepat, akurasi cukup untuk deteksi produk
+        print("[MODEL] Loading YOLOv5 model...")
+        model = torch.hub.load('ultralytics/yolov5', name, pretrained=True)
+        model.eval()
+        model.conf = conf  # Lower confidence threshold untuk deteksi lebih banyak
+        model.iou = iou    # NMS threshold
+        print("[MODEL] ✓ YOLOv5 model loaded successfully")
+        return model
+    except Exception as e:
+        print(f"[MODEL] ✗ WARNING: YOLOv5 model not loaded - {e}")
+        return None
+
+class Tiling:
+    """Konfigurasi tiled inference: ROI tray dipotong jadi grid tile yang saling
+    overlap, semua tile (+ opsional frame penuh) dijalankan sebagai satu batch.
+    Benda kecil (pulpen, kartu) tetap cukup besar di input model."""
+
+    def __init__(self, grid=(2, 2), overlap=0.2, roi=None, include_full=True, iou=0.45, contain=0.85):
+        self.grid = tuple(grid)          # (kolom, baris)
+        self.overlap = overlap           # Fraksi overlap antar tile
+        self.roi = roi                   # (x1, y1, x2, y2) area tray, None = seluruh frame
+        self.include_full = include_full  # Tambah seluruh ROI (tanpa dipotong) ke batch untuk benda besar
+        self.iou = iou                   # NMS antar tile
+        self.contain = contain           # Buang box potongan yang hampir seluruhnya di dalam box lain
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def region(self, width, height):
+        """(x1, y1, x2, y2) ROI tray yang dipotong ke ukuran frame (seluruh frame jika roi None)"""
+        rx1, ry1, rx2, ry2 = self.roi or (0, 0, width, height)
+        return max(0, rx1), max(0, ry1), min(rx2, width), min(ry2, height)
+
+    def tiles(self, width, height):
+        """Daftar (x1, y1, x2, y2) tile untuk frame berukuran width x height"""
+        rx1, ry1, rx2, ry2 = self.region(width, height)
+        cols, rows = self.grid
+        tile_w = (rx2 - rx1) / (cols - (cols - 1) * self.overlap)
+        tile_h = (ry2 - ry1) / (rows - (rows - 1) * self.overlap)
+        step_x, step_y = tile_w * (1 - self.overlap), tile_h * (1 - self.overlap)
+        return [(int(rx1 + c * step_x), int(ry1 + r * step_y),
+                 int(min(rx2, rx1 + c * step_x + tile_w)), int(min(ry2, ry1 + r * step_y + tile_h)))
+                for r in range(rows) for c in range(cols)]
+
+def merge_boxes(boxes, iou=0.45, contain=0.85):
+    """NMS per kelas atas box gabungan semua tile. Box dibuang jika IoU > iou atau
+    > contain bagiannya berada di dalam box lain yang confidence-nya lebih tinggi
+    (potongan benda di tepi tile)."""
+    if not boxes:
+        return []
+    arr = np.array(boxes, dtype=np.float64)
+    keep = []
+    for cls in np.unique(arr[:, 5]):
+        idx = np.where(arr[:, 5] == cls)[0]
+        idx = idx[np.argsort(-arr[idx, 4])]
+        while len(idx):
+            best, rest = idx[0], idx[1:]
+            keep.append(best)
+            if not len(rest):
+                break
+            x1 = np.maximum(arr[best, 0], arr[rest, 0])
+            y1 = np.maximum(arr[best, 1], arr[rest, 1])
+            x2 = np.minimum(arr[best, 2], arr[rest, 2])
+            y2 = np.minimum(arr[best, 3], arr[rest, 3])
+            inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+            area_best = (arr[best, 2] - arr[best, 0]) * (arr[best, 3] - arr[best, 1])
+            area_rest = (arr[rest, 2] - arr[rest, 0]) * (arr[rest, 3] - arr[rest, 1])
+            overlap_iou = inter / np.maximum(area_best + area_rest - inter, 1e-9)
+            overlap_small = inter / np.maximum(np.minimum(area_best, area_rest), 1e-9)
+            idx = rest[(overlap_iou <= iou) & (overlap_small <= contain)]
+    return [boxes[i] for i in sorted(keep, key=lambda i: -boxes[i][4])]
+
+def infer(frame, model, timings=None, size=None, tiling=None):
+    """Jalankan model pada frame BGR, return list (x1, y1, x2, y2, conf, cls) tipe Python.
+
+    size: ukuran input model (sisi terpanjang, mis. 416) - None = default model (640).
+    tiling: Tiling untuk tiled inference (satu batch), None = satu pass frame penuh.
+    """
+    t0 = time.perf_counter()
+    # Gunakan frame original size untuk deteksi lebih akurat
+    img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    if tiling is not None:
+        tiles = tiling.tiles(img.shape[1], img.shape[0])
+        images = [img[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+        if tiling.include_full:
+            # "Penuh" = seluruh ROI, bukan seluruh frame - barang di luar tray tidak ikut terdeteksi
+            x1, y1, x2, y2 = tiling.region(img.shape[1], img.shape[0])
+            tiles.append((x1, y1, x2, y2))
+            images.append(img[y1:y2, x1:x2])
+    t1 = time.perf_counter()
+    # Inference - confidence sudah set di model initialization
+    if tiling is not None:
+        results = model(images, size=size or 640)  # Satu batch untuk semua tile
+    else:
+        results = model(img, size=size) if size else model(img)  # conf=0.25 dan iou=0.45 dari model config
+    if timings is not None:
+        timings['preprocess'] = t1 - t0
+        timings['inference'] = time.perf_counter() - t1
+    if tiling is None:
+        tiles = [(0, 0, img.shape[1], img.shape[0])]
+    boxes = []
+    for (ox, oy, _, _), dets in zip(tiles, results.xyxy):
+        for det in dets:
+            x1, y1, x2, y2, conf, cls = det[:6]
+            # Koordinat tile -> koordinat frame
+            boxes.append((int(x1) + ox, int(y1) + oy, int(x2) + ox, int(y2) + oy, float(conf), int(cls)))
+    if tiling is not None:
+        boxes = merge_boxes(boxes, tiling.iou, tiling.contain)
+    return boxes
+
+def draw_detections(image, boxes, names):
+    """Gambar kotak + label deteksi langsung pada image (in-place)"""
+    for x1, y1, x2, y2, conf, cls in boxes:
+        label = f"{names[cls]} {conf:.2f}"
+        color = get_color(cls)
+
+        # Kotak deteksi tebal
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 4, cv2.LINE_AA)
+
+        # Label transparan rounded
+        (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+        label_bg = image[max(0, y1-th-16):y1, x1:x1+tw+16]
+        if label_bg.shape[0] > 0 and label_bg.shape[1] > 0:
+            overlay_label = label_bg.copy()
+            cv2.rectangle(overlay_label, (0, 0), (tw+16, th+16), color, -1, cv2.LINE_AA)
+            cv2.addWeighted(overlay_label, 0.5, label_bg, 0.5, 0, label_bg)
+        # Shadow
+        cv2.putText(image, label, (x1+9, y1-7), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,0,0), 4, cv2.LINE_AA)
+        # Teks label
+        cv2.putText(image, label, (x1+8, y1-8), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2, cv2.LINE_AA)
+
+def build_detections(boxes, names, catalog):
+    """Box mentah -> dict deteksi dengan produk katalog (lookup class id O(1))"""
+    detected = []
+    for x1, y1, x2, y2, conf, cls in boxes:
+        product = catalog.by_class_id(cls)
+        detected.append({
+            'name': product.key if product else names[cls],
+            'product': product,  # None jika kelas tidak ada di katalog
+            'conf': conf,
+            'box': (x1, y1, x2, y2)
+        })
+        if VERBOSE:
+            kasir_metrics.log('DEBUG', 'DETECT', f"Found: {names[cls]} (conf: {conf:.2f})")
+    if VERBOSE and len(detected) > 0:
+        kasir_metrics.log('DEBUG', 'DETECT', f"Total detections: {len(detected)}")
+    return detected
+
+def detect_products(frame, model, catalog, timings=None, size=None, tiling=None, cache=None):
+    """Deteksi produk menggunakan YOLOv5 dengan visualisasi modern - optimized untuk performa
+
+    Jika timings (dict) diberikan, durasi preprocess/inference/postprocess
+    (detik) ditulis ke sana. Dengan cache (detect_cache.DetectionCache) model
+    dilewati jika scene hampir sama dengan scene yang sudah dideteksi.
+    """
+    if model is None:
+        return [], frame
+
+    try:
+        key = cache.key(frame) if cache is not None else None
+        boxes = cache.get(key, size) if key is not None else None
+        if boxes is None:
+            boxes = infer(frame, model, timings, size, tiling)
+            if key is not None:
+                cache.put(key, size, boxes)
+        t1 = time.perf_counter()
+
+        annotated = frame.copy()
+        draw_detections(annotated, boxes, model.names)
+        detected = build_detections(boxes, model.names, catalog)
+
+        if timings is not None:
+            timings['postprocess'] = time.perf_counter() - t1
+        return detected, annotated
+    except Exception as e:
+        kasir_metrics.inc('detect_errors')
+        kasir_metrics.log('ERROR', 'DETECT', f"Detection error: {e}")
+        return [], frame
+
+class CartTracker:
+    """Ubah deteksi per frame menjadi item cart.
+
+    Produk baru masuk cart setelah terlihat PRESENCE_FRAMES_REQUIRED frame
+    berturut-turut, lalu produk yang sama ditahan COOLDOWN_FRAMES frame supaya
+    satu benda tidak terhitung berkali-kali.
+    """
+
+    def __init__(self, presence_frames=PRESENCE_FRAMES_REQUIRED, absence_frames=ABSENCE_FRAMES_REQUIRED,
+                 cooldown_frames=COOLDOWN_FRAMES):
+        self.presence_frames = presence_frames
+        self.absence_frames = absence_frames
+        self.cooldown_frames = cooldown_frames
+        self.presence_count = 0
+        self.absence_count = 0
+        self.cooldown = {}
+
+    def update(self, valid_detected):
+        """Proses deteksi valid satu frame, return list key produk yang ditambahkan ke cart"""
+        added = []
+        if valid_detected:
+            self.presence_count += 1
+            self.absence_count = 0
+
+            # Tambah ke cart HANYA setelah presence threshold terpenuhi
+            if self.presence_count >= self.presence_frames:
+                for det in valid_detected:
+                    product_name = det['name']
+                    # Cek apakah produk masih dalam cooldown
+                    if self.cooldown.get(product_name, 0) <= 0:
+                        added.append(product_name)
+                        self.cooldown[product_name] = self.cooldown_frames  # Set cooldown untuk produk ini
+                    elif VERBOSE:
+                        kasir_metrics.log('DEBUG', 'DETECTION', f"{product_name} in cooldown ({self.cooldown[product_name]} frames), skipping", every=30)
+        else:
+            self.absence_count += 1
+            self.presence_count = 0
+
+        # Decrement cooldown untuk semua item yang sedang dalam cooldown
+        for item in list(self.cooldown):
+            if self.cooldown[item] > 0:
+                self.cooldown[item] -= 1
+            else:
+                del self.cooldown[item]
+        return added
+
+class CameraEngine(threading.Thread):
+    """Loop kamera/video -> deteksi -> cart, tanpa UI.
+
+    Callback (dipanggil dari thread engine):
+        on_raw_frame(frame)                - setiap frame mentah (barcode, dsb.)
+        on_frame(annotated, valid_detected) - setelah deteksi, untuk ditampilkan
+    Item yang masuk cart dilaporkan lewat event Cart (cart.subscribe).
+    Sumber berupa file video berhenti sendiri di akhir file; src=None berarti
+    frame dipasok sendiri lewat process_frame() (tanpa thread).
+
+    Dengan detector (vision_process.ProcessDetector) deteksi berjalan di proses
+    lain secara asinkron: frame dikirim tanpa menunggu, hasil diambil saat siap.
+    Dengan rate (adaptive_rate.AdaptiveRate) interval deteksi dan ukuran input
+    model mengikuti beban, bukan detect_every tetap. tiling (Tiling) mengaktifkan
+    tiled inference dan cache (DetectionCache) cache hasil untuk scene diam, untuk
+    deteksi di thread ini (detector punya tiling/cache sendiri). snapshots
+    (SnapshotWriter) menyimpan frame beranotasi dan event_log (EventLog) mencatat
+    event 'detect' setiap item masuk cart.
+    """
+
+    def __init__(self, src, model, catalog, cart, on_frame=None, on_raw_frame=None, recorder=None,
+                 detect_every=DETECT_EVERY, idle_sleep=0.0, detector=None, rate=None, tiling=None,
+                 cache=None, snapshots=None, event_log=None):
+        super().__init__(daemon=True)
+        self.src = src
+        self.model = model
+        self.catalog = catalog
+        self.cart = cart
+        self.on_frame = on_frame
+        self.on_raw_frame = on_raw_frame
+        self.recorder = recorder
+        self.detect_every = detect_every
+        self.idle_sleep = idle_sleep
+        self.detector = detector
+        self.rate = rate
+        if rate is not None and detector is not None:
+            # Inference di proses detektor - CPU-nya ikut dihitung
+            rate.extra_cpu = lambda: detector.cpu_time
+        self.tiling = tiling
+        self.cache = cache
+        self.snapshots = snapshots
+        self.event_log = event_log
+        self.tracker = CartTracker()  # presence + cooldown: deteksi -> item cart
+        self.cap = None
+        self.running = True
+        self.frame_count = 0
+        self.current_fps = 0
+        self.current_frame = None
+        self._fps_counter = 0
+        self._fps_time = time.time()
+        self._last_detected = []
+        self._last_annotated = None
+        self.last_result = (None, [])  # (annotated, valid_detected) terakhir, dibaca thread lain
+        self._since_detect = 0
+        self._open_source()
+
+    @property
+    def is_file(self):
+        return isinstance(self.src, str) and not self.src.isdigit()
+
+    def _open_source(self):
+        if self.src is None:
+            return
+        try:
+            self.cap = cv2.VideoCapture(self.src)
+            # Set camera properties untuk performa optimal
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            if self.rate is not None:
+                # Kamera 25 fps tidak boleh dianggap "overload" terhadap target 30
+                camera_fps = self.cap.get(cv2.CAP_PROP_FPS)
+                if 0 < camera_fps < self.rate.target_fps:
+                    self.rate.target_fps = camera_fps
+            # Jangan force resolution - biarkan kamera gunakan native resolution untuk deteksi lebih akurat
+        except Exception as e:
+            print("Failed to open source:", e)
+            self.cap = None
+
+    def stop(self):
+        self.running = False
+        try:
+            if isinstance(self.cap, cv2.VideoCapture):
+                self.cap.release()
+        except:
+            pass
+
+    def process_frame(self, frame):
+        """Satu langkah pipeline (bisa dipanggil langsung tanpa thread). Return (annotated, valid_detected)"""
+        started = time.perf_counter()
+        self.current_frame = frame
+        self.frame_count += 1
+        if self.recorder is not None:
+            self.recorder.write(frame)
+        if self.on_raw_frame:
+            self.on_raw_frame(frame)
+
+        # Process deteksi HANYA setiap N frame untuk mengurangi beban CPU
+        if self.rate is not None:
+            self.rate.frame()
+            detect_every, size = self.rate.detect_every, self.rate.size
+        else:
+            detect_every, size = self.detect_every, None
+        self._since_detect += 1
+        due = self._since_detect >= detect_every
+        if due:
+            self._since_detect = 0
+        if self.detector is not None:
+            submitted = False
+            if due:
+                submitted = self.detector.submit(frame, size)
+                if not submitted and self.is_file and not self.detector.ready:
+                    # File video: tunggu detektor siap supaya frame awal tidak terlewat
+                    if self.detector.wait_ready():
+                        submitted = self.detector.submit(frame, size)
+                    else:
+                        # Detektor mati / timeout - hentikan engine daripada menggantung selamanya
+                        kasir_metrics.log('ERROR', 'VISION', "Detektor tidak tersedia, engine dihentikan")
+                        self.stop()
+            # File video diproses lengkap (hasil sama setiap diputar): tunggu hasil frame ini
+            result = self.detector.poll(5.0 if submitted and self.is_file else 0)
+            if result is not None:
+                self._last_detected, self._last_annotated = result
+                if self.rate is not None:
+                    self.rate.record(self.detector.last_latency, len(self._last_detected))
+        elif due:
+            timings = {}
+            self._last_detected, self._last_annotated = detect_products(frame, self.model, self.catalog,
+                                                                        timings, size, self.tiling, self.cache)
+            for stage, seconds in timings.items():
+                kasir_metrics.observe(stage, seconds)
+            kasir_metrics.inc('detections')
+            if self.rate is not None:
+                self.rate.record(sum(timings.values()), len(self._last_detected))
+        # Frame lain memakai hasil deteksi sebelumnya (reuse)
+        annotated = self._last_annotated if self._last_annotated is not None else frame
+
+        # Filter hanya produk yang ada di katalog
+        valid_detected = [d for d in self._last_detected if d['product'] is not None]
+        if VERBOSE and valid_detected:
+            kasir_metrics.log('DEBUG', 'DETECTION', f"Found {len(valid_detected)} valid products: {[d['name'] for d in valid_detected]}", every=30)
+
+        # Tambah ke cart HANYA setelah presence threshold terpenuhi dan di luar cooldown
+        for product_name in self.tracker.update(valid_detected):
+            self.cart.add(product_name)
+            kasir_metrics.inc('cart_added')
+            if self.event_log is not None:
+                conf = max(float(d['conf']) for d in valid_detected if d['name'] == product_name)
+                self.event_log.emit('detect', product=product_name, conf=round(conf, 3), frame=self.frame_count)
+            if self.snapshots is not None:
+                # Hanya antre (tanpa encode) - frame beranotasi tidak diubah lagi setelah ini
+                self.snapshots.capture(annotated, 'add', valid_detected, product=product_name,
+                                       qty=self.cart.qty(product_name))
+            if VERBOSE:
+                kasir_metrics.log('INFO', 'DETECTION', f"✓ Added {product_name} to cart, qty now: {self.cart.qty(product_name)}")
+
+        # Hitung FPS
+        self._fps_counter += 1
+        now = time.time()
+        if now - self._fps_time >= 1.0:
+            self.current_fps = self._fps_counter
+            kasir_metrics.set_gauge('camera_fps', self.current_fps)
+            self._fps_counter = 0
+            self._fps_time = now
+        kasir_metrics.inc('frames')
+        kasir_metrics.observe('frame', time.perf_counter() - started)
+        self.last_result = (annotated, valid_detected)
+        return annotated, valid_detected
+
+    def run(self):
+        try:
+            while self.running:
+                if self.cap is None:
+                    time.sleep(0.2)
+                    continue
+
+                try:
+                    t0 = time.perf_counter()
+                    ret, frame = self.cap.read()
+                    kasir_metrics.observe('capture', time.perf_counter() - t0)
+                    if not ret:
+                        if self.is_file:
+                            break  # Akhir file video
+                        time.sleep(0.01)
+                        continue
+
+                    annotated, valid_detected = self.process_frame(frame)
+                    if self.on_frame:
+                        self.on_frame(annotated, valid_detected)
+                    if self.idle_sleep:
+                        time.sleep(self.idle_sleep)
+
+                except Exception as e:
+                    kasir_metrics.inc('camera_errors')
+                    kasir_metrics.log('ERROR', 'CAMERA', f"Camera worker error: {e}")
+                    time.sleep(0.05)
+                    continue
+        finally:
+            self.running = False
+            if self.recorder is not None:
+                self.recorder.close()
@@ -0,0 +1,293 @@
+"""
+VISION PROCESS
+Detektor YOLOv5 di proses terpisah supaya preprocess, inference, loop box
+dan menggambar tidak berebut GIL dengan UI kasir.
+
+    proses kasir                          proses detektor
+    ------------                          ---------------
+    submit(frame) -> salin ke slot ring   baca slot (tanpa copy / pickle frame)
+    (slot, seq, size) -- connection ----> infer + gambar box in-place di slot
+    poll() <-------- (slot, seq, boxes) -- kirim box (beberapa ratus byte)
+
+Frame dioper lewat multiprocessing.shared_memory (ring beberapa slot), yang
+lewat koneksi hanya nomor slot dan hasil box. Proses detektor dijalankan
+sebagai "python -m vision_process" (bukan multiprocessing spawn) supaya
+modul UI tidak ikut dieksekusi ulang di proses anak.
+"""
+
+import argparse
+import json
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+
+import cv2
+import numpy as np
+
+import kasir_metrics
+import vision_engine
+
+AUTHKEY_ENV = 'KASIR_VISION_AUTHKEY'
+START_TIMEOUT = 120  # Detik maksimal menunggu proses detektor memuat model
+
+class ProcessDetector:
+    """Sisi kasir: kirim frame ke proses detektor dan ambil hasilnya tanpa blocking"""
+
+    def __init__(self, catalog, model_name='yolov5n', slots=4, tiling=None, cache=None):
+        self.catalog = catalog
+        self.model_name = model_name
+        self.tiling = tiling
+        self.cache = cache  # DetectionCache: scene diam tidak dikirim ke proses detektor
+        self.slots = slots
+        self.names = None
+        self.shape = None
+        self.completed = 0
+        self.last_latency = 0.0
+        self.cpu_time = 0.0  # Detik CPU proses detektor sejak model siap (dilaporkan bersama hasil)
+        self._shm = None
+        self._frames = None
+        self._proc = None
+        self._conn = None
+        self._free = []
+        self._submitted_at = {}
+        self._slot_keys = {}
+        self._seq = 0
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._ready_event = threading.Event()
+        self._closed = False
+
+    @property
+    def ready(self):
+        return self._conn is not None and self.names is not None
+
+    def wait_ready(self, timeout=START_TIMEOUT):
+        """Tunggu proses detektor selesai memuat model (setelah submit pertama).
+        False jika timeout atau proses detektor mati sebelum terhubung/siap."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._ready_event.wait(0.2):
+            # Anak mati sebelum connect: accept() tidak pernah kembali, event tidak pernah di-set
+            if self._proc is not None and self._proc.poll() is not None:
+                kasir_metrics.log('ERROR', 'VISION', f"Proses detektor berhenti (exit {self._proc.returncode}) "
+                                                     f"sebelum siap")
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                kasir_metrics.log('ERROR', 'VISION', f"Proses detektor belum siap setelah {timeout} s")
+                break
+        return self.ready
+
+    def _start(self, shape):
+        self.shape = shape
+        size = int(np.prod(shape)) * self.slots
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._frames = np.ndarray((self.slots,) + shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._free = list(range(self.slots))
+
+        authkey = secrets.token_bytes(16)
+        listener = Listener(('127.0.0.1', 0), authkey=authkey)
+        host, port = listener.address
+        env = dict(os.environ, **{AUTHKEY_ENV: authkey.hex()})
+        args = [
+            sys.executable, '-m', 'vision_process',
+            '--address', f"{host}:{port}",
+            '--shm', self._shm.name,
+            '--shape', ','.join(str(n) for n in shape),
+            '--slots', str(self.slots),
+            '--model', self.model_name
+        ]
+        if self.tiling is not None:
+            args += ['--tiling', json.dumps(self.tiling.to_dict())]
+        self._proc = subprocess.Popen(args, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+        # accept() menunggu proses anak start - jangan tahan loop kamera
+        threading.Thread(target=self._receive, args=(listener,), daemon=True).start()
+
+    def _receive(self, listener):
+        try:
+            conn = listener.accept()
+        finally:
+            listener.close()
+        self._conn = conn
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+            if msg[0] == 'ready':
+                if msg[1] is None:
+                    print("[VISION] ✗ Model gagal dimuat di proses detektor")
+                    break
+                self.names = msg[1]
+                # Class id -> produk dihitung sekali, bukan model.names[cls].lower() per deteksi
+                self.catalog.bind_classes(self.names)
+                print(f"[VISION] ✓ Proses detektor siap (pid {self._proc.pid})")
+                self._ready_event.set()
+            else:
+                _, slot, seq, boxes, self.cpu_time = msg
+                self._results.put((slot, seq, boxes, None))
+        self._conn = None
+        self._ready_event.set()
+
+    def submit(self, frame, size=None):
+        """Salin frame ke slot kosong dan kirim ke detektor. False jika semua slot sibuk (frame dilewati).
+
+        size: ukuran input model untuk frame ini (None = default model).
+        """
+        if self._closed:
+            return False
+        key = None
+        if self.cache is not None and self.ready:
+            key = self.cache.key(frame)
+            boxes = self.cache.get(key, size)
+            if boxes is not None:
+                # Cache hit - hasil langsung tersedia di poll(), proses detektor tidak dipakai
+                with self._lock:
+                    self._seq += 1
+                    self._results.put((None, self._seq, boxes, frame))
+                return True
+        with self._lock:
+            if self._shm is None:
+                self._start(frame.shape)
+            if not self.ready or not self._free:
+                kasir_metrics.inc('detect_skipped')
+                return False
+            slot = self._free.pop()
+            self._seq += 1
+            seq = self._seq
+        target = self._frames[slot]
+        if frame.shape == self.shape:
+            np.copyto(target, frame)
+        else:
+            # Kamera diganti dengan resolusi lain - sesuaikan ke ukuran ring
+            target[:] = cv2.resize(frame, (self.shape[1], self.shape[0]))
+        self._submitted_at[slot] = time.perf_counter()
+        self._slot_keys[slot] = (key, size)
+        try:
+            self._conn.send((slot, seq, size))
+        except (AttributeError, OSError):
+            with self._lock:
+                self._free.append(slot)
+            return False
+        return True
+
+    def poll(self, timeout=0):
+        """Hasil terbaru yang sudah selesai: (detected, annotated) atau None.
+
+        timeout > 0: tunggu hasil pertama maksimal timeout detik.
+        """
+        latest = None
+        block = timeout > 0
+        while True:
+            try:
+                slot, seq, boxes, frame = self._results.get(block, timeout if block else None)
+            except queue.Empty:
+                break
+            block = False
+            kasir_metrics.inc('detections')
+            self.completed += 1
+            if slot is None:
+                # Hasil dari cache - gambar box di frame saat ini (hanya untuk hasil terbaru)
+                self.last_latency = 0.0
+                if latest is None or seq > latest[0]:
+                    latest = (seq, boxes, frame, True)
+                continue
+            # Waktu submit -> hasil diterima (antre + infer + gambar di proses detektor)
+            self.last_latency = time.perf_counter() - self._submitted_at.pop(slot)
+            kasir_metrics.observe('detect_roundtrip', self.last_latency)
+            key, size = self._slot_keys.pop(slot)
+            if key is not None:
+                self.cache.put(key, size, boxes)
+            if latest is None or seq > latest[0]:
+                # Salin frame beranotasi keluar dari slot sebelum slot dipakai ulang
+                latest = (seq, boxes, np.array(self._frames[slot]), False)
+            with self._lock:
+                self._free.append(slot)
+        if latest is None:
+            return None
+        _, boxes, annotated, from_cache = latest
+        if from_cache:
+            annotated = annotated.copy()
+            vision_engine.draw_detections(annotated, boxes, self.names)
+        return vision_engine.build_detections(boxes, self.names, self.catalog), annotated
+
+    def close(self):
+        self._closed = True
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass
+        if self._proc is not None:
+            try:
+                self._proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+        if self._shm is not None:
+            self._frames = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+def serve(address, shm_name, shape, slots, model_name, tiling=None):
+    """Sisi proses detektor: loop terima slot -> infer -> gambar -> kirim box"""
+    host, port = address.rsplit(':', 1)
+    conn = Client((host, int(port)), authkey=bytes.fromhex(os.environ[AUTHKEY_ENV]))
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # Segmen milik proses kasir - jangan dihapus resource tracker saat proses ini keluar
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=shm.buf)
+
+    vision_engine.VERBOSE = False
+    model = vision_engine.load_model(model_name)
+    names = None
+    if model is not None:
+        names = model.names if isinstance(model.names, dict) else dict(enumerate(model.names))
+    conn.send(('ready', names))
+    # CPU dihitung sejak model siap - waktu load model bukan beban deteksi
+    cpu_start = time.process_time()
+    try:
+        while model is not None:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                break
+            if msg is None:
+                break
+            slot, seq, size = msg
+            frame = frames[slot]
+            try:
+                boxes = vision_engine.infer(frame, model, size=size, tiling=tiling)
+                vision_engine.draw_detections(frame, boxes, model.names)
+            except Exception as e:
+                print(f"[VISION] Detection error: {e}")
+                boxes = []
+            conn.send(('result', slot, seq, boxes, time.process_time() - cpu_start))
+    finally:
+        del frames
+        shm.close()
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Proses detektor (dijalankan oleh ProcessDetector)")
+    parser.add_argument('--address', required=True)
+    parser.add_argument('--shm', required=True)
+    parser.add_argument('--shape', required=True)
+    parser.add_argument('--slots', type=int, default=4)
+    parser.add_argument('--model', default='yolov5n')
+    parser.add_argument('--tiling', help="JSON Tiling.to_dict() untuk tiled inference")
+    args = parser.parse_args()
+    shape = tuple(int(n) for n in args.shape.split(','))
+    tiling = vision_engine.Tiling(**json.loads(args.tiling)) if args.tiling else None
+    serve(args.address, args.shm, shape, args.slots, args.model, tiling)
+
+if __name__ == '__main__':
+    main()